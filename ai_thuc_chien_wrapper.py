@@ -13,15 +13,185 @@ Version: 1.0.0
 
 
 import requests
+from urllib3.exceptions import NewConnectionError
 import base64
+import hashlib
+import os
 import time
+import unicodedata
 import random
 import json
+import threading
 from typing import List, Dict, Optional, Union, Tuple
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import io
 
 
+# Method gửi lại được an toàn: các method khác (POST) chỉ thử lại khi request chắc chắn chưa được xử lý
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _not_sent(error: requests.RequestException) -> bool:
+    """True nếu lỗi xảy ra khi mở kết nối (request chưa tới server, gửi lại không bị tạo trùng)"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.ConnectionError) or not error.args:
+        return False
+    reason = getattr(error.args[0], "reason", error.args[0])
+    return isinstance(reason, NewConnectionError)
+
+
+# Model ảnh nhận tham số `seed` trong request (kết quả lặp lại được với cùng seed và prompt)
+IMAGE_SEED_MODEL_PREFIXES = ("imagen-",)
+
+
+# Preset chèn chữ: vị trí, cỡ chữ (tỉ lệ chiều cao ảnh), viền và bóng (tỉ lệ cỡ chữ), nền mờ sau chữ
+TEXT_OVERLAY_PRESETS = {
+    "title_center": {"position": "center", "font_scale": 0.10, "outline": 0.07, "shadow": 0.05, "box": None},
+    "title_bottom": {"position": "bottom", "font_scale": 0.08, "outline": 0.06, "shadow": 0.04, "box": None},
+    "banner_top": {"position": "top", "font_scale": 0.07, "outline": 0.05, "shadow": 0.03, "box": None},
+    "caption_box": {"position": "bottom", "font_scale": 0.05, "outline": 0.0, "shadow": 0.0, "box": (0, 0, 0, 150)},
+}
+
+
+# Font có đủ dấu tiếng Việt thường có sẵn trên Linux / Windows / macOS (dùng font đầu tiên tìm thấy)
+VIETNAMESE_FONT_CANDIDATES = [
+    "/usr/share/fonts/truetype/noto/NotoSans-Bold.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSans-Bold.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/roboto/unhinted/RobotoTTF/Roboto-Bold.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+    "C:/Windows/Fonts/arialbd.ttf",
+    "C:/Windows/Fonts/segoeuib.ttf",
+    "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
+    "/Library/Fonts/Arial Bold.ttf",
+]
+
+
+class PoolMember:
+    """Một cặp (API key, endpoint) trong pool, kèm trạng thái tải và sức khỏe"""
+
+
+    def __init__(self, api_key: str, base_url: str, weight: float = 1.0):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.weight = max(float(weight), 0.001)
+        self.outstanding = 0          # Số request đang chạy
+        self.failures = 0             # Số lỗi liên tiếp
+        self.ejected_until = 0.0      # Bị loại tạm thời tới thời điểm này (time.monotonic)
+        self.requests = 0
+        self.errors = 0
+        self.spend = None             # Chi tiêu theo check_spending
+        self.max_budget = None
+
+
+    @property
+    def name(self) -> str:
+        """Tên hiển thị (không lộ toàn bộ key)"""
+        return f"...{self.api_key[-4:]}@{self.base_url}"
+
+
+    @property
+    def over_budget(self) -> bool:
+        return self.spend is not None and self.max_budget is not None and self.spend >= self.max_budget
+
+
+    def headers(self, gemini: bool = False) -> Dict[str, str]:
+        if gemini:
+            return {"x-goog-api-key": self.api_key, "Content-Type": "application/json"}
+        return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+
+
+class EndpointPool:
+    """
+    Pool nhiều API key / endpoint
+
+    - Chọn member theo weighted least-outstanding-requests: (đang chạy + 1) / weight nhỏ nhất
+    - Member lỗi (mất kết nối, 429, 5xx) bị loại tạm thời, thời gian loại tăng gấp đôi
+      theo số lỗi liên tiếp; key sai (401/403) hoặc hết ngân sách bị loại lâu
+    - Ghim một thao tác nhiều bước (video) vào đúng member đã bắt đầu nó
+    """
+
+
+    def __init__(self, members: List[PoolMember], base_ejection: float = 5.0, max_ejection: float = 300.0):
+        if not members:
+            raise ValueError("Pool cần ít nhất một API key")
+        self.members = members
+        self.base_ejection = base_ejection
+        self.max_ejection = max_ejection
+        self._pins = {}
+        self._lock = threading.Lock()
+
+
+    def acquire(self, exclude: Tuple = (), preferred: Optional[PoolMember] = None) -> PoolMember:
+        """Chọn member cho một request (tăng số request đang chạy của nó)"""
+        with self._lock:
+            member = preferred
+            if member is None:
+                now = time.monotonic()
+                candidates = [m for m in self.members if m not in exclude] or self.members
+                healthy = [m for m in candidates if m.ejected_until <= now and not m.over_budget]
+                if healthy:
+                    best = min((m.outstanding + 1) / m.weight for m in healthy)
+                    member = random.choice([m for m in healthy if (m.outstanding + 1) / m.weight == best])
+                else:
+                    # Mọi member đều đang bị loại: dùng member sắp được nhận lại sớm nhất
+                    member = min(candidates, key=lambda m: m.ejected_until)
+            member.outstanding += 1
+            member.requests += 1
+            return member
+
+
+    def release(self, member: PoolMember, ok: bool, long_ejection: bool = False):
+        """Trả member về pool sau request, loại tạm thời nếu lỗi"""
+        with self._lock:
+            member.outstanding -= 1
+            if ok:
+                member.failures = 0
+                return
+            member.errors += 1
+            member.failures += 1
+            if long_ejection:
+                duration = self.max_ejection
+            else:
+                duration = min(self.base_ejection * 2 ** (member.failures - 1), self.max_ejection)
+            member.ejected_until = time.monotonic() + duration
+            print(f"⚠️ Tạm loại {member.name} trong {duration:.0f}s ({member.failures} lỗi liên tiếp)")
+
+
+    def pin(self, token: str, member: PoolMember):
+        with self._lock:
+            self._pins[token] = member
+
+
+    def pinned(self, token: str) -> Optional[PoolMember]:
+        with self._lock:
+            return self._pins.get(token)
+
+
+    def unpin(self, *tokens: str):
+        """Bỏ ghim khi thao tác nhiều bước đã xong"""
+        with self._lock:
+            for token in tokens:
+                self._pins.pop(token, None)
+
+
+    def stats(self) -> List[Dict]:
+        """Trạng thái từng member (số request, lỗi, đang chạy, chi tiêu)"""
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                "member": m.name,
+                "weight": m.weight,
+                "requests": m.requests,
+                "errors": m.errors,
+                "outstanding": m.outstanding,
+                "ejected_for": max(0.0, round(m.ejected_until - now, 1)),
+                "spend": m.spend,
+                "max_budget": m.max_budget,
+            } for m in self.members]
+
 
 
 class AIThucChienAPI:
@@ -32,10 +202,25 @@ class AIThucChienAPI:
     Usage:
         api = AIThucChienAPI(api_key="your_api_key")
         response = api.generate_text("Hello world")
+
+
+        # Nhiều key / endpoint (tăng throughput khi chạy hàng loạt)
+        api = AIThucChienAPI(pool=[
+            {"api_key": "key_1"},
+            {"api_key": "key_2", "weight": 2},
+            {"api_key": "key_3", "base_url": "https://backup-gateway.example"},
+        ])
     """
 
 
-    def __init__(self, api_key: str, base_url: str = "https://api.thucchien.ai"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = "https://api.thucchien.ai",
+        image_cache_dir: Optional[str] = ".ai_cache/images",
+        pool: Optional[List[Dict]] = None,
+        max_attempts: int = 3
+    ):
         """
         Khởi tạo API client
 
@@ -43,17 +228,85 @@ class AIThucChienAPI:
         Args:
             api_key: API key từ AI Thực Chiến
             base_url: Base URL của API (default: https://api.thucchien.ai)
+            image_cache_dir: Thư mục cache ảnh của generate_image khi có seed (None để tắt)
+            pool: Danh sách {"api_key", "base_url" (tùy chọn), "weight" (tùy chọn)} để chia tải
+                  nhiều key / endpoint (thay cho api_key)
+            max_attempts: Số member tối đa được thử cho một request khi gặp lỗi tạm thời
         """
-        self.api_key = api_key
-        self.base_url = base_url.rstrip('/')
-        self.headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        self.gemini_headers = {
-            "x-goog-api-key": api_key,
-            "Content-Type": "application/json"
-        }
+        if pool:
+            members = [
+                PoolMember(m["api_key"], m.get("base_url", base_url), m.get("weight", 1.0)) for m in pool
+            ]
+        elif api_key:
+            members = [PoolMember(api_key, base_url)]
+        else:
+            raise ValueError("Cần api_key hoặc pool")
+        self.pool = EndpointPool(members)
+        self.max_attempts = max_attempts
+
+
+        # Key / endpoint đầu tiên (tương thích với code cũ dùng trực tiếp các thuộc tính này)
+        self.api_key = members[0].api_key
+        self.base_url = members[0].base_url
+        self.image_cache_dir = image_cache_dir
+        self.headers = members[0].headers()
+        self.gemini_headers = members[0].headers(gemini=True)
+        # Cache bản tóm tắt của analyze_and_summarize_web_content (hash prompt -> tóm tắt)
+        self._summary_cache = {}
+
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        gemini: bool = False,
+        affinity: Optional[str] = None,
+        member: Optional[PoolMember] = None,
+        **kwargs
+    ):
+        """
+        Gửi request qua pool key / endpoint
+
+
+        - Chọn member theo weighted least-outstanding-requests
+        - Lỗi kết nối, 429, 5xx: loại tạm member đó và thử lại trên member khác (tối đa max_attempts)
+        - POST (không idempotent): chỉ thử lại khi không mở được kết nối hoặc 429; sau 5xx hay
+          timeout khi chờ phản hồi thì không gửi lại, vì gateway có thể đã xử lý (và tính phí) request
+        - affinity: gửi tới member đã được ghim cho token này (thao tác video nhiều bước)
+        - member: gửi tới đúng member này (ví dụ kiểm tra chi tiêu của từng key)
+
+
+        Returns:
+            requests.Response (đã raise_for_status), kèm thuộc tính pool_member
+        """
+        preferred = member or (self.pool.pinned(affinity) if affinity else None)
+        attempts = 1 if preferred is not None else max(1, min(self.max_attempts, len(self.pool.members)))
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        tried = []
+        for attempt in range(attempts):
+            chosen = self.pool.acquire(exclude=tuple(tried), preferred=preferred)
+            tried.append(chosen)
+            try:
+                response = requests.request(
+                    method, f"{chosen.base_url}{path}", headers=chosen.headers(gemini), **kwargs
+                )
+            except requests.RequestException as e:
+                self.pool.release(chosen, ok=False)
+                if attempt == attempts - 1 or not (idempotent or _not_sent(e)):
+                    raise
+                continue
+
+
+            status = response.status_code
+            transient = status == 429 or status >= 500
+            denied = status in (401, 403)
+            self.pool.release(chosen, ok=not (transient or denied), long_ejection=denied)
+            retryable = denied or status == 429 or (transient and idempotent)
+            if retryable and attempt < attempts - 1:
+                continue
+            response.raise_for_status()
+            response.pool_member = chosen
+            return response
 
 
     # =============================================
@@ -83,9 +336,6 @@ class AIThucChienAPI:
         Returns:
             Dict chứa response từ API
         """
-        url = f"{self.base_url}/chat/completions"
-
-
         data = {
             "model": model,
             "messages": [{"role": "user", "content": prompt}],
@@ -100,8 +350,7 @@ class AIThucChienAPI:
         data.update(kwargs)
 
 
-        response = requests.post(url, headers=self.headers, json=data)
-        response.raise_for_status()
+        response = self._request("POST", "/chat/completions", json=data)
         return response.json()
 
 
@@ -125,9 +374,6 @@ class AIThucChienAPI:
         Returns:
             Dict chứa response
         """
-        url = f"{self.base_url}/chat/completions"
-
-
         data = {
             "model": model,
             "messages": messages,
@@ -136,8 +382,7 @@ class AIThucChienAPI:
         data.update(kwargs)
 
 
-        response = requests.post(url, headers=self.headers, json=data)
-        response.raise_for_status()
+        response = self._request("POST", "/chat/completions", json=data)
         return response.json()
 
 
@@ -147,27 +392,49 @@ class AIThucChienAPI:
         model: str = "imagen-4",
         n: int = 1,
         aspect_ratio: str = "1:1",
+        seed: Optional[int] = None,
+        force_refresh: bool = False,
         **kwargs
     ) -> List[str]:
         """
         Sinh hình ảnh từ prompt (trả về list base64 data URLs)
 
 
+        TRICK: Cache ảnh theo seed
+        - Không có seed: thêm seed ngẫu nhiên vào prompt để tránh cache (mỗi lần là ảnh mới)
+        - Có seed: kết quả được lưu vào cache cục bộ theo (model, prompt, seed, aspect_ratio, n),
+          gọi lại cùng tham số trả về ngay ảnh đã lưu, không tốn request; với model hỗ trợ
+          (IMAGE_SEED_MODEL_PREFIXES), seed còn được gửi làm trường `seed` của request
+        - force_refresh=True: luôn tạo lại và ghi đè cache (prompt gửi đi có thêm nonce ngẫu nhiên
+          để gateway không trả lại ảnh cũ; khóa cache vẫn theo seed)
+
+
         Args:
             prompt: Mô tả hình ảnh
             model: Tên model (imagen-4)
             n: Số lượng ảnh cần tạo (1-4)
             aspect_ratio: Tỷ lệ khung hình (1:1, 3:4, 4:3, 16:9, 9:16)
+            seed: Seed cố định (bật cache), None để mỗi lần một ảnh khác
+            force_refresh: Bỏ qua cache và tạo ảnh mới
 
 
         Returns:
             List các data URL của ảnh (data:image/png;base64,...)
         """
-        # Thêm random seed để tránh cache (TRICK từ docs)
-        prompt_with_seed = f"{prompt} {random.randint(1, 10000)}"
+        cache_key = None
+        if seed is not None and self.image_cache_dir:
+            cache_key = self._image_cache_key(model, prompt, seed, aspect_ratio, n, kwargs)
+            if not force_refresh:
+                cached = self._read_image_cache(cache_key)
+                if cached is not None:
+                    print(f"♻️ Dùng ảnh đã cache (seed={seed})")
+                    return cached
 
 
-        url = f"{self.base_url}/images/generations"
+        # Thêm seed vào prompt để tránh cache của gateway (TRICK từ docs): ngẫu nhiên nếu không chỉ định
+        prompt_with_seed = f"{prompt} {seed if seed is not None else random.randint(1, 10000)}"
+        if force_refresh:
+            prompt_with_seed = f"{prompt_with_seed} {random.randint(1, 10 ** 9)}"
 
 
         data = {
@@ -176,11 +443,12 @@ class AIThucChienAPI:
             "n": n,
             "aspect_ratio": aspect_ratio
         }
+        if seed is not None and model.startswith(IMAGE_SEED_MODEL_PREFIXES):
+            data["seed"] = seed
         data.update(kwargs)
 
 
-        response = requests.post(url, headers=self.headers, json=data)
-        response.raise_for_status()
+        response = self._request("POST", "/images/generations", json=data)
 
 
         result = response.json()
@@ -192,9 +460,59 @@ class AIThucChienAPI:
                 images.append(f"data:image/png;base64,{b64_data}")
 
 
+        if cache_key is not None and images:
+            self._write_image_cache(cache_key, images)
         return images
 
 
+    def _image_cache_key(self, model: str, prompt: str, seed: int, aspect_ratio: str, n: int, extra: Dict) -> str:
+        """Khóa cache: hash của mọi tham số quyết định kết quả"""
+        params = json.dumps([model, prompt, seed, aspect_ratio, n, extra], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(params.encode("utf-8")).hexdigest()
+
+
+    def _read_image_cache(self, cache_key: str) -> Optional[List[str]]:
+        """
+        Đọc ảnh đã cache. Cache dạng content-addressed:
+        index/<khóa>.json liệt kê hash các ảnh, blobs/<hash>.png chứa ảnh (ảnh trùng chỉ lưu một lần)
+        """
+        index_path = Path(self.image_cache_dir) / "index" / f"{cache_key}.json"
+        try:
+            digests = json.loads(index_path.read_text(encoding="utf-8"))
+            images = []
+            for digest in digests:
+                image_bytes = (Path(self.image_cache_dir) / "blobs" / f"{digest}.png").read_bytes()
+                images.append(f"data:image/png;base64,{base64.b64encode(image_bytes).decode('utf-8')}")
+            return images
+        except (OSError, ValueError):
+            return None
+
+
+    def _write_image_cache(self, cache_key: str, images: List[str]):
+        """Ghi ảnh vào cache (ghi file tạm rồi đổi tên để không bao giờ để lại file dở)"""
+        cache_dir = Path(self.image_cache_dir)
+        (cache_dir / "blobs").mkdir(parents=True, exist_ok=True)
+        (cache_dir / "index").mkdir(parents=True, exist_ok=True)
+
+
+        digests = []
+        for image in images:
+            image_bytes = base64.b64decode(image.split(",", 1)[1])
+            digest = hashlib.sha256(image_bytes).hexdigest()
+            blob_path = cache_dir / "blobs" / f"{digest}.png"
+            if not blob_path.exists():
+                tmp_path = blob_path.with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_bytes(image_bytes)
+                os.replace(tmp_path, blob_path)
+            digests.append(digest)
+
+
+        index_path = cache_dir / "index" / f"{cache_key}.json"
+        tmp_path = index_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(digests), encoding="utf-8")
+        os.replace(tmp_path, index_path)
+
+
     def generate_image_chat(
         self,
         prompt: str,
@@ -215,9 +533,6 @@ class AIThucChienAPI:
         Returns:
             Data URL của ảnh (data:image/png;base64,...)
         """
-        url = f"{self.base_url}/chat/completions"
-
-
         if messages is None:
             messages = []
 
@@ -232,8 +547,7 @@ class AIThucChienAPI:
         }
 
 
-        response = requests.post(url, headers=self.headers, json=data)
-        response.raise_for_status()
+        response = self._request("POST", "/chat/completions", json=data)
 
 
         result = response.json()
@@ -262,9 +576,6 @@ class AIThucChienAPI:
         Returns:
             Bytes của file âm thanh
         """
-        url = f"{self.base_url}/audio/speech"
-
-
         data = {
             "model": model,
             "input": text,
@@ -272,8 +583,7 @@ class AIThucChienAPI:
         }
 
 
-        response = requests.post(url, headers=self.headers, json=data, stream=True)
-        response.raise_for_status()
+        response = self._request("POST", "/audio/speech", json=data, stream=True)
 
 
         return response.content
@@ -301,9 +611,6 @@ class AIThucChienAPI:
         Returns:
             Bytes của file âm thanh
         """
-        url = f"{self.base_url}/gemini/v1beta/models/{model}:generateContent"
-
-
         data = {
             "contents": [{
                 "parts": [{"text": text}]
@@ -342,8 +649,7 @@ class AIThucChienAPI:
             }
 
 
-        response = requests.post(url, headers=self.gemini_headers, json=data)
-        response.raise_for_status()
+        response = self._request("POST", f"/gemini/v1beta/models/{model}:generateContent", gemini=True, json=data)
 
 
         result = response.json()
@@ -354,22 +660,36 @@ class AIThucChienAPI:
         return base64.b64decode(audio_b64)
 
 
-    def check_spending(self) -> Dict:
+    def check_spending(self, all_keys: bool = False) -> Union[Dict, List[Dict]]:
         """
         Kiểm tra chi tiêu API key
 
 
-        Returns:
-            Dict chứa thông tin chi tiêu
-        """
-        url = f"{self.base_url}/key/info"
+        Args:
+            all_keys: Kiểm tra mọi key trong pool. Chi tiêu / ngân sách của từng key được lưu
+                      lại, key đã hết ngân sách không được chọn cho request mới
 
 
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
+        Returns:
+            Dict chứa thông tin chi tiêu (List theo từng key nếu all_keys=True)
+        """
+        results = []
+        for member in (self.pool.members if all_keys else self.pool.members[:1]):
+            try:
+                response = self._request("GET", "/key/info", member=member)
+            except requests.RequestException as e:
+                if not all_keys:
+                    raise
+                results.append({"member": member.name, "error": str(e)})
+                continue
+            result = response.json()
+            info = result.get("info", result) if isinstance(result, dict) else {}
+            member.spend = info.get("spend", member.spend)
+            member.max_budget = info.get("max_budget", member.max_budget)
+            results.append(result)
 
 
-        return response.json()
+        return results if all_keys else results[0]
 
 
     # =============================================
@@ -401,9 +721,6 @@ class AIThucChienAPI:
         Returns:
             operation_name để tracking
         """
-        url = f"{self.base_url}/gemini/v1beta/models/{model}:predictLongRunning"
-
-
         instance = {"prompt": prompt}
 
 
@@ -427,12 +744,15 @@ class AIThucChienAPI:
         data["parameters"].update(kwargs)
 
 
-        response = requests.post(url, headers=self.gemini_headers, json=data)
-        response.raise_for_status()
+        response = self._request("POST", f"/gemini/v1beta/models/{model}:predictLongRunning", gemini=True, json=data)
 
 
         result = response.json()
-        return result.get("name")
+        operation_name = result.get("name")
+        # Các bước sau phải gọi đúng key đã tạo video
+        if operation_name:
+            self.pool.pin(operation_name, response.pool_member)
+        return operation_name
 
 
     def check_video_status(self, operation_name: str) -> Tuple[bool, Optional[str]]:
@@ -447,11 +767,7 @@ class AIThucChienAPI:
         Returns:
             (is_done, video_uri)
         """
-        url = f"{self.base_url}/gemini/v1beta/{operation_name}"
-
-
-        response = requests.get(url, headers=self.gemini_headers)
-        response.raise_for_status()
+        response = self._request("GET", f"/gemini/v1beta/{operation_name}", gemini=True, affinity=operation_name)
 
 
         result = response.json()
@@ -464,6 +780,8 @@ class AIThucChienAPI:
                 video_uri = result["response"]["generateVideoResponse"]["generatedSamples"][0]["video"]["uri"]
             except (KeyError, IndexError):
                 pass
+        if video_uri:
+            self.pool.pin(video_uri, response.pool_member)
 
 
         return is_done, video_uri
@@ -486,14 +804,13 @@ class AIThucChienAPI:
         video_id = video_uri.split('/files/')[1].split(':')[0]
 
 
-        url = f"{self.base_url}/gemini/download/v1beta/files/{video_id}:download?alt=media"
+        response = self._request("GET", f"/gemini/download/v1beta/files/{video_id}:download?alt=media", gemini=True, stream=True, affinity=video_uri)
 
 
-        response = requests.get(url, headers=self.gemini_headers, stream=True)
-        response.raise_for_status()
-
-
-        return response.content
+        content = response.content
+        # Đã tải xong: không cần ghim video_uri nữa (lỗi thì giữ để có thể tải lại đúng key)
+        self.pool.unpin(video_uri)
+        return content
 
 
     # =============================================
@@ -534,29 +851,34 @@ class AIThucChienAPI:
         # Bước 2: Poll until done
         start_time = time.time()
         current_interval = poll_interval
+        video_uri = None
 
 
-        while time.time() - start_time < max_wait_time:
-            print(f"⏳ Đang kiểm tra... ({int(time.time() - start_time)}s)")
+        try:
+            while time.time() - start_time < max_wait_time:
+                print(f"⏳ Đang kiểm tra... ({int(time.time() - start_time)}s)")
 
 
-            is_done, video_uri = self.check_video_status(operation_name)
+                is_done, video_uri = self.check_video_status(operation_name)
 
 
-            if is_done and video_uri:
-                print("🎉 Video đã hoàn thành!")
-                # Bước 3: Download
-                video_bytes = self.download_video(video_uri)
-                print(f"📥 Đã tải xong: {len(video_bytes)} bytes")
-                return video_bytes
+                if is_done and video_uri:
+                    print("🎉 Video đã hoàn thành!")
+                    # Bước 3: Download
+                    video_bytes = self.download_video(video_uri)
+                    print(f"📥 Đã tải xong: {len(video_bytes)} bytes")
+                    return video_bytes
 
 
-            time.sleep(current_interval)
-            # Exponential backoff
-            current_interval = min(current_interval * 1.2, 30)
+                time.sleep(current_interval)
+                # Exponential backoff
+                current_interval = min(current_interval * 1.2, 30)
 
 
-        raise TimeoutError(f"Timeout after {max_wait_time} seconds")
+            raise TimeoutError(f"Timeout after {max_wait_time} seconds")
+        finally:
+            # Thao tác đã kết thúc (thành công, lỗi hay timeout): bỏ ghim để pool không giữ mãi
+            self.pool.unpin(operation_name, *([video_uri] if video_uri else []))
 
 
     def create_consistent_character_images(
@@ -610,13 +932,15 @@ class AIThucChienAPI:
         background_prompt: str,
         vietnamese_text: str,
         text_color: str = "yellow",
-        model: str = "gemini-2.5-flash-image-preview"
+        model: str = "gemini-2.5-flash-image-preview",
+        preset: str = "title_center",
+        font_path: Optional[str] = None
     ) -> bytes:
         """
         TRICK: Tạo ảnh có chữ tiếng Việt không bị lỗi font
-        1. Tạo ảnh nền không có chữ
-        2. Tạo ảnh chữ riêng
-        3. Dùng AI merge 2 ảnh
+        1. Tạo ảnh nền không có chữ (AI)
+        2. Vẽ chữ tiếng Việt lên ảnh nền ngay trên máy (Pillow + font có dấu)
+        -> Không cần Canva/Photoshop và không tốn thêm request merge ảnh
 
 
         Args:
@@ -624,27 +948,31 @@ class AIThucChienAPI:
             vietnamese_text: Chữ tiếng Việt cần thêm
             text_color: Màu chữ
             model: Model multimodal
+            preset: Kiểu chèn chữ (xem TEXT_OVERLAY_PRESETS)
+            font_path: File font .ttf/.otf (mặc định tự tìm font có dấu tiếng Việt)
 
 
         Returns:
-            Bytes của ảnh hoàn chỉnh
+            Bytes của ảnh hoàn chỉnh (PNG)
+
+
+        Raises:
+            FileNotFoundError: Không có font_path và không tìm thấy font có dấu nào trên máy
         """
+        # Tìm font trước để không tốn request tạo ảnh nền khi không vẽ được chữ
+        font_path = self._find_overlay_font(font_path)
+
         # Bước 1: Tạo ảnh nền không có chữ
         print("🎨 Bước 1: Tạo ảnh nền...")
         background_prompt_no_text = f"{background_prompt}. Do not include any text. Leave a clear, empty space for the title text."
         background_img = self.generate_image_chat(background_prompt_no_text, model)
 
 
-        # Bước 2: Người dùng tự tạo ảnh chữ bằng tool (Canva, Photoshop...)
-        # Ở đây chỉ hướng dẫn
-        print(f"📝 Bước 2: Tạo ảnh chữ '{vietnamese_text}' bằng Canva/Photoshop")
-        print("   - Nền trắng")
-        print("   - Font đẹp")
-        print("   - Lưu thành PNG/JPG")
-        print("   - Chuyển sang base64 và truyền vào merge_vietnamese_text_to_image()")
-
-
-        return background_img
+        # Bước 2: Vẽ chữ trực tiếp lên ảnh nền
+        print(f"📝 Bước 2: Chèn chữ '{vietnamese_text}' ({preset})")
+        return self.render_vietnamese_text_overlay(
+            background_img, vietnamese_text, preset=preset, text_color=text_color, font_path=font_path
+        )
 
 
     def merge_vietnamese_text_to_image(
@@ -656,6 +984,7 @@ class AIThucChienAPI:
     ) -> bytes:
         """
         TRICK: Merge chữ tiếng Việt vào ảnh nền bằng AI
+        (tốn một request multimodal; render_vietnamese_text_overlay làm việc này ngay trên máy)
 
 
         Args:
@@ -668,9 +997,6 @@ class AIThucChienAPI:
         Returns:
             Bytes của ảnh đã merge
         """
-        url = f"{self.base_url}/gemini/v1beta/models/{model}:generateContent"
-
-
         data = {
             "contents": [{
                 "parts": [
@@ -699,8 +1025,7 @@ class AIThucChienAPI:
         }
 
 
-        response = requests.post(url, headers=self.gemini_headers, json=data)
-        response.raise_for_status()
+        response = self._request("POST", f"/gemini/v1beta/models/{model}:generateContent", gemini=True, json=data)
 
 
         result = response.json()
@@ -710,6 +1035,192 @@ class AIThucChienAPI:
         return base64.b64decode(image_data)
 
 
+    def render_vietnamese_text_overlay(
+        self,
+        background: Union[bytes, str],
+        text: str,
+        preset: str = "title_bottom",
+        text_color: str = "white",
+        outline_color: str = "black",
+        shadow_color: str = "black",
+        font_path: Optional[str] = None,
+        font_size: Optional[int] = None,
+        output_format: str = "PNG"
+    ) -> bytes:
+        """
+        Vẽ chữ tiếng Việt lên ảnh ngay trên máy (thay cho merge_vietnamese_text_to_image)
+        Chữ được chuẩn hóa NFC để dấu hiển thị đúng, tự xuống dòng theo chiều rộng ảnh,
+        có viền / bóng / nền mờ theo preset.
+
+
+        Args:
+            background: Bytes ảnh, data URL / base64, hoặc đường dẫn file
+            text: Chữ cần chèn (có thể nhiều dòng)
+            preset: Kiểu chèn chữ (xem TEXT_OVERLAY_PRESETS)
+            text_color, outline_color, shadow_color: Màu chữ, viền, bóng
+            font_path: File font .ttf/.otf (mặc định tự tìm font có dấu tiếng Việt)
+            font_size: Cỡ chữ (px), mặc định theo preset
+            output_format: PNG hoặc JPEG
+
+
+        Returns:
+            Bytes của ảnh đã chèn chữ
+
+
+        Raises:
+            FileNotFoundError: Không có font_path và không tìm thấy font có dấu nào trên máy
+        """
+        from PIL import Image, ImageDraw, ImageFilter
+
+
+        style = TEXT_OVERLAY_PRESETS[preset]
+        image = self._open_image(background).convert("RGBA")
+        width, height = image.size
+        size = font_size or max(12, int(height * style["font_scale"]))
+        font = self._load_overlay_font(font_path, size)
+        outline = int(round(size * style["outline"]))
+        shadow = int(round(size * style["shadow"]))
+        margin = int(min(width, height) * 0.05)
+
+
+        layer = Image.new("RGBA", image.size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(layer)
+        text = self._wrap_text(draw, unicodedata.normalize("NFC", text), font, width - 2 * margin, outline)
+        spacing = size // 4
+        left, top, right, bottom = draw.multiline_textbbox(
+            (0, 0), text, font=font, spacing=spacing, align="center", stroke_width=outline
+        )
+        text_w, text_h = right - left, bottom - top
+        x = (width - text_w) // 2 - left
+        if style["position"] == "top":
+            y = margin - top
+        elif style["position"] == "center":
+            y = (height - text_h) // 2 - top
+        else:
+            y = height - margin - text_h - top
+
+
+        if style["box"]:
+            pad = size // 3
+            draw.rectangle(
+                (x + left - pad, y + top - pad, x + right + pad, y + bottom + pad), fill=tuple(style["box"])
+            )
+        if shadow:
+            shadow_layer = Image.new("RGBA", image.size, (0, 0, 0, 0))
+            ImageDraw.Draw(shadow_layer).multiline_text(
+                (x + shadow, y + shadow), text, font=font, fill=shadow_color, spacing=spacing,
+                align="center", stroke_width=outline, stroke_fill=shadow_color
+            )
+            image = Image.alpha_composite(image, shadow_layer.filter(ImageFilter.GaussianBlur(max(1, shadow // 2))))
+        draw.multiline_text(
+            (x, y), text, font=font, fill=text_color, spacing=spacing, align="center",
+            stroke_width=outline, stroke_fill=outline_color
+        )
+        image = Image.alpha_composite(image, layer)
+
+
+        buffer = io.BytesIO()
+        if output_format.upper() in ("JPEG", "JPG"):
+            image.convert("RGB").save(buffer, "JPEG", quality=90)
+        else:
+            image.save(buffer, "PNG")
+        return buffer.getvalue()
+
+
+    def render_text_overlays_batch(
+        self,
+        jobs: List[Dict],
+        max_workers: int = 4,
+        output_dir: Optional[str] = None
+    ) -> List[bytes]:
+        """
+        Chèn chữ cho nhiều ảnh song song (banner, poster hàng loạt)
+
+
+        Args:
+            jobs: List dict tham số của render_vietnamese_text_overlay
+                  (background, text, preset, ...), thêm "filename" để lưu ra file
+            max_workers: Số ảnh xử lý song song
+            output_dir: Thư mục lưu các ảnh có "filename"
+
+
+        Returns:
+            List bytes ảnh theo đúng thứ tự jobs
+        """
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+
+        def render(job: Dict) -> bytes:
+            options = dict(job)
+            filename = options.pop("filename", None)
+            image_bytes = self.render_vietnamese_text_overlay(**options)
+            if filename:
+                path = os.path.join(output_dir, filename) if output_dir else filename
+                with open(path, "wb") as f:
+                    f.write(image_bytes)
+            return image_bytes
+
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs)))) as executor:
+            results = list(executor.map(render, jobs))
+        print(f"✅ Đã chèn chữ cho {len(results)} ảnh")
+        return results
+
+
+    def _open_image(self, image: Union[bytes, str]):
+        """Mở ảnh từ bytes, data URL / base64 hoặc đường dẫn file"""
+        from PIL import Image
+
+
+        if isinstance(image, str):
+            if os.path.exists(image):
+                return Image.open(image)
+            encoded = image.split(",", 1)[1] if image.startswith("data:") else image
+            image = base64.b64decode(encoded)
+        return Image.open(io.BytesIO(image))
+
+
+    @staticmethod
+    def _find_overlay_font(font_path: Optional[str]) -> str:
+        """Font chỉ định, hoặc font có dấu tiếng Việt đầu tiên tìm thấy trên máy"""
+        if font_path is not None:
+            return font_path
+        font_path = next((path for path in VIETNAMESE_FONT_CANDIDATES if os.path.exists(path)), None)
+        if font_path is None:
+            # Font mặc định của Pillow không có đủ dấu tiếng Việt: chữ sẽ bị lỗi thay vì báo lỗi
+            raise FileNotFoundError(
+                "Không tìm thấy font có dấu tiếng Việt trên máy, hãy truyền font_path tới file .ttf/.otf "
+                f"(đã tìm: {', '.join(VIETNAMESE_FONT_CANDIDATES)})"
+            )
+        return font_path
+
+
+    def _load_overlay_font(self, font_path: Optional[str], size: int):
+        """Font để vẽ chữ tiếng Việt: font chỉ định hoặc font có dấu tìm thấy trên máy"""
+        from PIL import ImageFont
+
+
+        return ImageFont.truetype(self._find_overlay_font(font_path), size)
+
+
+    @staticmethod
+    def _wrap_text(draw, text: str, font, max_width: int, stroke_width: int = 0) -> str:
+        """Tự xuống dòng theo từ để mỗi dòng không rộng hơn max_width"""
+        lines = []
+        for paragraph in text.split("\n"):
+            line = ""
+            for word in paragraph.split():
+                candidate = f"{line} {word}".strip()
+                if line and draw.textlength(candidate, font=font) + 2 * stroke_width > max_width:
+                    lines.append(line)
+                    line = word
+                else:
+                    line = candidate
+            lines.append(line)
+        return "\n".join(lines)
+
+
     def create_comic_consistent(
         self,
         title: str,
@@ -822,27 +1333,161 @@ class AIThucChienAPI:
         return video
 
 
+    def translate_batch(
+        self,
+        texts: List[str],
+        target_language: str,
+        source_language: str = "vi",
+        model: str = "gemini-2.5-flash",
+        temperature: float = 0.2
+    ) -> List[Optional[str]]:
+        """
+        TRICK: Dịch nhiều chuỗi trong MỘT request (prompt packing)
+        Gói các chuỗi thành JSON {"0": "...", "1": "..."} và yêu cầu model trả về
+        JSON cùng khóa -> hàng chục chuỗi chỉ tốn một lần gọi API thay vì mỗi chuỗi một lần.
+
+
+        Args:
+            texts: Danh sách chuỗi cần dịch
+            target_language: Mã ngôn ngữ đích (en, fr, ...)
+            source_language: Mã ngôn ngữ nguồn
+            model: Model LLM
+            temperature: Độ ngẫu nhiên (thấp để bản dịch ổn định)
+
+
+        Returns:
+            List bản dịch đúng thứ tự đầu vào (None nếu model bỏ sót chuỗi đó)
+        """
+        language_names = {"vi": "Vietnamese", "en": "English", "fr": "French"}
+        source_name = language_names.get(source_language, source_language)
+        target_name = language_names.get(target_language, target_language)
+
+
+        packed = {str(i): text for i, text in enumerate(texts)}
+        messages = [
+            {
+                "role": "system",
+                "content": (
+                    f"You translate tourism website content from {source_name} to {target_name}. "
+                    "The user message is a JSON object mapping ids to texts. "
+                    "Reply with ONLY a JSON object with exactly the same ids, each mapped to its translation. "
+                    "Keep proper names of places, villages and dishes (e.g. Yên Hòa, Mỹ Lý) unchanged, "
+                    "keep line breaks, list markers and 'Label: text' structure."
+                )
+            },
+            {"role": "user", "content": json.dumps(packed, ensure_ascii=False)}
+        ]
+
+
+        response = self.chat_completion(
+            messages,
+            model=model,
+            temperature=temperature,
+            response_format={"type": "json_object"}
+        )
+        content = response['choices'][0]['message']['content'] or ""
+
+
+        # Một số model vẫn bọc JSON trong ```json ... ```
+        content = content.strip()
+        if content.startswith("```"):
+            content = content.split("\n", 1)[-1].rsplit("```", 1)[0]
+        try:
+            translated = json.loads(content)
+        except ValueError:
+            print(f"⚠️ Không đọc được JSON bản dịch ({len(texts)} chuỗi)")
+            translated = {}
+        if not isinstance(translated, dict):
+            translated = {}
+
+
+        results = []
+        for i in range(len(texts)):
+            value = translated.get(str(i))
+            results.append(value if isinstance(value, str) and value.strip() else None)
+        return results
+
+
     def analyze_and_summarize_web_content(
         self,
         topic: str,
         web_sources: List[str],
-        model: str = "gemini-2.5-pro"
+        model: str = "gemini-2.5-pro",
+        mode: str = "auto",
+        max_chunk_tokens: int = 8000,
+        max_workers: int = 4,
+        map_model: Optional[str] = None,
+        cache_dir: Optional[str] = None
     ) -> str:
         """
         Phân tích và tổng hợp nội dung từ web
         (User cần crawl data trước, hàm này chỉ summarize)
 
 
+        TRICK: Map-reduce khi dữ liệu vượt quá context của model
+        1. Map: chia từng nguồn thành các đoạn ~max_chunk_tokens, tóm tắt song song
+        2. Reduce: gộp các bản tóm tắt theo nhóm vừa context, lặp lại tới khi còn một nhóm
+        3. Phân tích cuối cùng trên các bản tóm tắt
+        Bản tóm tắt được cache theo nội dung đoạn -> thêm một nguồn mới chỉ tốn thêm
+        request cho các đoạn của nguồn đó (và các bước reduce phía trên).
+
+
         Args:
             topic: Chủ đề cần phân tích
             web_sources: List nội dung đã crawl từ web
             model: Model LLM
+            mode: "auto" (map-reduce khi dữ liệu lớn), "single" (một prompt) hoặc "map_reduce"
+            max_chunk_tokens: Số tokens (ước lượng) tối đa của mỗi đoạn / mỗi prompt reduce
+            max_workers: Số request tóm tắt chạy song song
+            map_model: Model cho bước map/reduce (mặc định dùng `model`, nên dùng flash cho rẻ)
+            cache_dir: Thư mục lưu cache tóm tắt giữa các lần chạy (mặc định chỉ cache trong RAM)
 
 
         Returns:
             Bản tổng hợp
         """
-        combined_content = "\n\n---\n\n".join(web_sources)
+        total_tokens = sum(self._estimate_tokens(source) for source in web_sources)
+        if mode == "single" or (mode == "auto" and total_tokens <= max_chunk_tokens):
+            return self._final_analysis(topic, web_sources, model)
+
+
+        map_model = map_model or model
+        chunks = []
+        for source in web_sources:
+            chunks.extend(self._split_text(source, max_chunk_tokens))
+        print(f"🧩 Map: {len(web_sources)} nguồn -> {len(chunks)} đoạn (~{total_tokens} tokens)")
+
+
+        map_prompt = (
+            "Tóm tắt đoạn tài liệu sau, chỉ giữ các thông tin liên quan đến chủ đề: {topic}. "
+            "Giữ nguyên số liệu, tên riêng, địa danh. Trình bày dạng gạch đầu dòng.\n\n{text}"
+        )
+        summaries = self._summarize_concurrently(topic, chunks, map_prompt, map_model, max_workers, cache_dir)
+
+
+        # Reduce theo tầng: mỗi nhóm tóm tắt vừa một prompt, lặp lại tới khi còn một nhóm
+        reduce_prompt = (
+            "Gộp các bản tóm tắt sau về chủ đề: {topic} thành một bản tóm tắt duy nhất, "
+            "loại bỏ thông tin trùng lặp, giữ số liệu và tên riêng.\n\n{text}"
+        )
+        level = 1
+        while sum(self._estimate_tokens(summary) for summary in summaries) > max_chunk_tokens and len(summaries) > 1:
+            groups = self._group_by_tokens(summaries, max_chunk_tokens)
+            if len(groups) == len(summaries):
+                # Mỗi bản tóm tắt đã tự chiếm trọn một nhóm: gộp từng cặp để chắc chắn tiến triển
+                groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+            print(f"🔁 Reduce tầng {level}: {len(summaries)} bản tóm tắt -> {len(groups)} nhóm")
+            texts = ["\n\n---\n\n".join(group) for group in groups]
+            summaries = self._summarize_concurrently(topic, texts, reduce_prompt, map_model, max_workers, cache_dir)
+            level += 1
+
+
+        return self._final_analysis(topic, summaries, model)
+
+
+    def _final_analysis(self, topic: str, sources: List[str], model: str) -> str:
+        """Prompt phân tích cuối cùng trên toàn bộ nguồn (hoặc các bản tóm tắt)"""
+        combined_content = "\n\n---\n\n".join(sources)
 
 
         prompt = f"""
@@ -867,6 +1512,81 @@ class AIThucChienAPI:
         return response['choices'][0]['message']['content']
 
 
+    def _summarize_concurrently(
+        self,
+        topic: str,
+        texts: List[str],
+        prompt_template: str,
+        model: str,
+        max_workers: int,
+        cache_dir: Optional[str]
+    ) -> List[str]:
+        """Tóm tắt nhiều đoạn song song, dùng lại bản tóm tắt đã cache (RAM và thư mục cache_dir)"""
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+
+        def summarize(text: str) -> str:
+            prompt = prompt_template.format(topic=topic, text=text)
+            key = hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).hexdigest()
+            cached = self._summary_cache.get(key)
+            cache_path = os.path.join(cache_dir, f"{key}.txt") if cache_dir else None
+            if cached is None and cache_path and os.path.exists(cache_path):
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    cached = f.read()
+            if cached is not None:
+                self._summary_cache[key] = cached
+                return cached
+
+
+            response = self.generate_text(prompt, model=model, temperature=0.3)
+            summary = response['choices'][0]['message']['content'] or ""
+            self._summary_cache[key] = summary
+            if cache_path:
+                with open(cache_path, "w", encoding="utf-8") as f:
+                    f.write(summary)
+            return summary
+
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(texts)))) as executor:
+            return list(executor.map(summarize, texts))
+
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Ước lượng số tokens (~3 ký tự/token với tiếng Việt, không cần tokenizer)"""
+        return len(text) // 3 + 1
+
+
+    def _split_text(self, text: str, max_tokens: int) -> List[str]:
+        """
+        Chia một nguồn thành các đoạn theo đoạn văn (dòng trống), mỗi đoạn <= max_tokens.
+        Mỗi nguồn được chia độc lập nên ranh giới đoạn ổn định khi thêm/bớt nguồn khác.
+        """
+        paragraphs = []
+        for paragraph in text.split("\n\n"):
+            paragraph = paragraph.strip()
+            # Đoạn văn quá dài: cắt cứng theo số ký tự
+            step = max_tokens * 3
+            paragraphs.extend(paragraph[i:i + step] for i in range(0, len(paragraph), step))
+        return ["\n\n".join(group) for group in self._group_by_tokens(paragraphs, max_tokens)]
+
+
+    def _group_by_tokens(self, texts: List[str], max_tokens: int) -> List[List[str]]:
+        """Gom các đoạn liên tiếp thành nhóm có tổng tokens <= max_tokens"""
+        groups, group, size = [], [], 0
+        for text in texts:
+            tokens = self._estimate_tokens(text)
+            if group and size + tokens > max_tokens:
+                groups.append(group)
+                group, size = [], 0
+            group.append(text)
+            size += tokens
+        if group:
+            groups.append(group)
+        return groups
+
+
     # =============================================
     # PHẦN 4: UTILITY FUNCTIONS
     # =============================================
@@ -0,0 +1,385 @@
+import asyncio
+import functools
+import io
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote_to_bytes
+
+from itsdangerous import BadSignature
+from werkzeug.http import dump_cookie, http_date, parse_etags, parse_range_header
+from werkzeug.utils import get_content_type
+
+from backend.app.core.config import settings
+from backend.app.services.content_service import PAGE_PAYLOADS
+from api.security.session_manager import SESSION_USER_ID_KEY
+
+# Các endpoint nội dung được phục vụ trực tiếp (không qua Flask): đường dẫn -> tên payload
+_PAYLOAD_ROUTES = {
+    '/api/content': 'content',
+    '/api/about': 'about',
+    '/api/attractions': 'attractions',
+    '/api/gallery': 'gallery',
+}
+
+
+class _Request:
+    """Thông tin tối thiểu của một request ASGI mà các handler cần."""
+    __slots__ = ('method', 'path', 'args', 'headers')
+
+    def __init__(self, scope):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.args = {k: v[0] for k, v in parse_qs(scope['query_string'].decode('latin-1')).items()}
+        headers = {}
+        for name, value in scope['headers']:
+            key = name.decode('latin-1').lower()
+            value = value.decode('latin-1')
+            if key in headers:
+                value = f"{headers[key]}{'; ' if key == 'cookie' else ', '}{value}"
+            headers[key] = value
+        self.headers = headers
+
+    def etag_matches(self, etag):
+        value = self.headers.get('if-none-match')
+        return value is not None and parse_etags(value).contains(etag)
+
+
+class AsgiApp:
+    """
+    Ứng dụng ASGI chạy song song với create_app() (ví dụ: uvicorn asgi:app).
+
+    Các đường nóng được xử lý bằng handler async: payload JSON của content_bp
+    (stream từ ContentService của ngôn ngữ được chọn, `content` là LocalizedContent),
+    trang HTML render sẵn, asset frontend và media trong /data (đọc file từng khối trong thread pool, không chặn event loop).
+    Client chậm chỉ giữ một coroutine đang chờ `send`, không giữ cả một worker.
+
+    Mọi request còn lại (Range nhiều khoảng, ảnh thu nhỏ ?w=, /api/_debug,
+    OPTIONS...) được chuyển cho app Flask chạy trong thread pool nên hành vi
+    không đổi. Session dùng chung cookie đã ký với Flask.
+    """
+
+    def __init__(self, flask_app, content, max_workers=None, chunk_size=None):
+        self.flask_app = flask_app
+        self.content = content
+        self.assets = flask_app.extensions['frontend_assets']
+        self.media = flask_app.extensions['media_index']
+        self.renderer = flask_app.extensions.get('page_renderer')
+        self.timings = flask_app.extensions.get('route_timings')
+        self.chunk_size = chunk_size or settings.CONTENT_STREAM_CHUNK_BYTES
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='asgi')
+
+        interface = flask_app.session_interface
+        self._serializer = interface.get_signing_serializer(flask_app)
+        self._cookie_name = interface.get_cookie_name(flask_app)
+        self._cookie_options = {
+            'domain': interface.get_cookie_domain(flask_app),
+            'path': interface.get_cookie_path(flask_app),
+            'httponly': interface.get_cookie_httponly(flask_app),
+            'secure': interface.get_cookie_secure(flask_app),
+            'samesite': interface.get_cookie_samesite(flask_app),
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        # Tải lại snapshot (stat, mmap, có thể giải mã JSON) không được chặn event loop
+        if settings.CONTENT_SHARED_SNAPSHOT and self.content.reload_due():
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.content.maybe_reload)
+        if scope['method'] in ('GET', 'HEAD'):
+            request = _Request(scope)
+            handler, route = self._route(request)
+            if handler is not None:
+                started = time.perf_counter()
+                await handler(request, send, started)
+                if self.timings is not None:
+                    self.timings.record(f"ASGI {route}", (time.perf_counter() - started) * 1000, {})
+                return
+        await self._call_wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self._executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # --- Routing ---
+    def _route(self, request):
+        """Trả về (handler, tên route) cho các đường được xử lý async, hoặc (None, None)."""
+        path = request.path
+        name = _PAYLOAD_ROUTES.get(path)
+        if name is not None:
+            if name == 'attractions' and request.args.get('featured', 'false').lower() == 'true':
+                name = 'featured'
+            return functools.partial(self._serve_payload, name=name), path
+        if path == '/api/bootstrap':
+            page = request.args.get('page', 'home')
+            if page not in PAGE_PAYLOADS:
+                return None, None
+            return functools.partial(self._serve_payload, name=f"page:{page}"), path
+        if path.startswith('/api/'):
+            return None, None
+        if path.startswith('/data/'):
+            if 'w' in request.args or ',' in request.headers.get('range', ''):
+                return None, None
+            return functools.partial(self._serve_media, filename=path[len('/data/'):]), '/data/<path:filename>'
+        if 'range' in request.headers:
+            return None, None
+        return functools.partial(self._serve_frontend, path=path.lstrip('/') or 'index.html'), '/<path:path>'
+
+    # --- Handlers ---
+    async def _serve_payload(self, request, send, started, name):
+        loop = asyncio.get_running_loop()
+        # Chọn locale, tính xếp hạng và nén payload có thể đọc đĩa hoặc tốn CPU: chạy trong thread pool
+        locale, content, name = await loop.run_in_executor(
+            self._executor, self._resolve_payload, name,
+            request.args.get('lang'), request.headers.get('accept-language'))
+        etag = f"{content.version}-{name}"
+        if request.etag_matches(etag):
+            await self._send_empty(request, send, 304, [('etag', f'"{etag}"'), ('vary', 'Accept-Language')], started)
+            return
+
+        length = await loop.run_in_executor(self._executor, content.payload_length, name)
+        headers = [
+            ('content-type', 'application/json'), ('etag', f'"{etag}"'),
+            ('content-language', locale), ('vary', 'Accept-Language'),
+        ]
+        if length is not None:
+            headers.append(('content-length', str(length)))
+        await self._start(request, send, 200, headers, started)
+        if request.method == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        chunks = content.iter_payload_chunks(name, self.chunk_size)
+        if length is None:
+            # Chế độ mã hóa từng phần (CONTENT_PRECOMPUTE_PAYLOADS=0): mã hóa JSON trong thread pool
+            while True:
+                chunk = await loop.run_in_executor(self._executor, next, chunks, None)
+                if chunk is None:
+                    break
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        else:
+            for chunk in chunks:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    def _resolve_payload(self, name, lang, accept_language):
+        locale, content = self.content.resolve(lang, accept_language)
+        return locale, content, content.payload_name(name)
+
+    async def _serve_frontend(self, request, send, started, path):
+        renderer = self.renderer
+        if renderer is not None and (renderer.handles(path) or self.assets.lookup(path)[0] is None):
+            page = path if renderer.handles(path) else 'index.html'
+            locale = renderer.negotiate(request.args.get('lang'), request.headers.get('accept-language'))
+            body, etag = await asyncio.get_running_loop().run_in_executor(self._executor, renderer.render, page, locale)
+            await self._send_bytes(request, send, started, body, get_content_type('text/html', 'utf-8'), etag, 'no-cache',
+                                   headers=[('content-language', locale), ('vary', 'Accept-Language')])
+            return
+
+        asset, immutable = self.assets.lookup(path)
+        if asset is None:
+            asset, immutable = self.assets.lookup(self.assets.spa_fallback)
+        if immutable:
+            cache_control = f"public, max-age={self.assets.immutable_max_age}, immutable"
+        else:
+            cache_control = 'no-cache'
+        mimetype = get_content_type(asset.mimetype, 'utf-8')
+
+        if asset.body is not None:
+            await self._send_bytes(request, send, started, asset.body, mimetype, asset.etag, cache_control,
+                                   last_modified=asset.mtime)
+            return
+        if request.etag_matches(asset.etag):
+            await self._send_empty(request, send, 304, [('etag', f'"{asset.etag}"')], started)
+            return
+        headers = [
+            ('content-type', mimetype), ('etag', f'"{asset.etag}"'), ('cache-control', cache_control),
+            ('last-modified', http_date(asset.mtime)), ('content-length', str(asset.size)),
+            ('accept-ranges', 'bytes'),
+        ]
+        await self._start(request, send, 200, headers, started)
+        await self._send_file(request, send, asset.abs_path, 0, asset.size)
+
+    async def _serve_media(self, request, send, started, filename):
+        entry = await asyncio.get_running_loop().run_in_executor(self._executor, self.media.lookup, filename)
+        if entry is None:
+            await self._send_empty(request, send, 404, [], started)
+            return
+
+        headers = [
+            ('etag', f'"{entry.etag}"'),
+            ('last-modified', http_date(entry.mtime)),
+            ('cache-control', f"public, max-age={self.media.max_age}"),
+            ('accept-ranges', 'bytes'),
+        ]
+        if request.etag_matches(entry.etag):
+            await self._send_empty(request, send, 304, headers, started)
+            return
+
+        start, stop, status = 0, entry.size, 200
+        byte_range = parse_range_header(request.headers.get('range'))
+        if_range = request.headers.get('if-range')
+        if byte_range is not None and entry.size and (if_range is None or if_range.strip('"') == entry.etag):
+            span = byte_range.range_for_length(entry.size)
+            if span is None:
+                headers.append(('content-range', f"bytes */{entry.size}"))
+                await self._send_empty(request, send, 416, headers, started)
+                return
+            start, stop = span
+            status = 206
+            headers.append(('content-range', f"bytes {start}-{stop - 1}/{entry.size}"))
+
+        headers += [('content-type', entry.mimetype), ('content-length', str(stop - start))]
+        await self._start(request, send, status, headers, started)
+        await self._send_file(request, send, entry.abs_path, start, stop - start)
+
+    # --- Sending ---
+    def _session_cookie(self, request):
+        """Header Set-Cookie cho người dùng mới (tương đương session_manager.create_user_session)."""
+        cookie = self._parse_cookie(request.headers.get('cookie', ''))
+        if cookie is not None:
+            try:
+                if SESSION_USER_ID_KEY in self._serializer.loads(cookie):
+                    return None
+            except (BadSignature, TypeError, ValueError):
+                pass
+        value = self._serializer.dumps({SESSION_USER_ID_KEY: str(uuid.uuid4())})
+        return dump_cookie(self._cookie_name, value, **self._cookie_options)
+
+    def _parse_cookie(self, header):
+        for part in header.split(';'):
+            name, _, value = part.strip().partition('=')
+            if name == self._cookie_name:
+                return value
+        return None
+
+    async def _start(self, request, send, status, headers, started):
+        vary = [value for name, value in headers if name == 'vary']
+        headers = [(name, value) for name, value in headers if name != 'vary']
+        set_cookie = self._session_cookie(request)
+        if set_cookie is not None:
+            headers.append(('set-cookie', set_cookie))
+        headers.append(('vary', ', '.join(vary + ['Cookie'])))
+        if 'origin' in request.headers:
+            headers.append(('access-control-allow-origin', '*'))
+        if settings.SERVER_TIMING_HEADER:
+            headers.append(('server-timing', f"handler;dur={(time.perf_counter() - started) * 1000:.2f}"))
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(k.encode('latin-1'), v.encode('latin-1')) for k, v in headers],
+        })
+
+    async def _send_empty(self, request, send, status, headers, started):
+        await self._start(request, send, status, headers, started)
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def _send_bytes(self, request, send, started, body, mimetype, etag, cache_control, last_modified=None,
+                          headers=None):
+        headers = [('etag', f'"{etag}"'), ('cache-control', cache_control)] + list(headers or ())
+        if last_modified is not None:
+            headers.append(('last-modified', http_date(last_modified)))
+        if request.etag_matches(etag):
+            await self._send_empty(request, send, 304, headers, started)
+            return
+        headers += [('content-type', mimetype), ('content-length', str(len(body)))]
+        await self._start(request, send, 200, headers, started)
+        await send({'type': 'http.response.body', 'body': b'' if request.method == 'HEAD' else body})
+
+    async def _send_file(self, request, send, path, start, length):
+        """Gửi một đoạn file theo từng khối; việc đọc đĩa chạy trong thread pool."""
+        if request.method == 'HEAD' or not length:
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        loop = asyncio.get_running_loop()
+        f = await loop.run_in_executor(self._executor, open, path, 'rb')
+        try:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                data = await loop.run_in_executor(self._executor, f.read, min(self.chunk_size, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                await send({'type': 'http.response.body', 'body': data, 'more_body': remaining > 0})
+            if remaining > 0:
+                await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            f.close()
+
+    # --- WSGI Fallback ---
+    async def _call_wsgi(self, scope, receive, send):
+        """Chạy app Flask cho request hiện tại trong thread pool và chuyển response sang ASGI."""
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        environ = self._wsgi_environ(scope, bytes(body))
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+
+        loop = asyncio.get_running_loop()
+        run = functools.partial(loop.run_in_executor, self._executor)
+        iterable = await run(self.flask_app, environ, start_response)
+        iterator = iter(iterable)
+        try:
+            chunk = await run(next, iterator, None)
+            await send({'type': 'http.response.start', 'status': started['status'], 'headers': started['headers']})
+            while chunk is not None:
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                chunk = await run(next, iterator, None)
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(iterable, 'close'):
+                await run(iterable.close)
+
+    def _wsgi_environ(self, scope, body):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        raw_path = scope.get('raw_path') or scope['path'].encode('utf-8')
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            # PATH_INFO trong WSGI là đường dẫn đã giải mã %XX, dạng latin-1
+            'PATH_INFO': unquote_to_bytes(raw_path.split(b'?', 1)[0]).decode('latin-1'),
+            'QUERY_STRING': scope['query_string'].decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope['headers']:
+            key = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if key == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+            elif key == 'CONTENT_LENGTH':
+                environ['CONTENT_LENGTH'] = value
+            else:
+                key = f"HTTP_{key}"
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
@@ -1,6 +1,6 @@
 import sys
 import os
-from flask import Flask, send_from_directory, request
+from flask import Flask, request
 from flask_cors import CORS
 
 # --- System Path Setup ---
@@ -13,7 +13,12 @@ if project_root not in sys.path:
 # --- Import Modules ---
 from backend.app.core.config import settings
 from api.routes.content import content_bp
+from api.routes.debug import debug_bp
+from api.routes.events import events_bp
+from api.middleware.timing import init_timing, phase
 from api.security import session_manager
+from api.static.media import MediaFileIndex
+from backend.app.services.image_variant_service import image_variant_service
 
 # --- App Initialization ---
 def create_app():
@@ -26,8 +31,21 @@ def create_app():
     # Thiết lập secret key cho session từ file config
     app.secret_key = settings.SECRET_KEY
 
+    # Chỉ mục hash của media trong thư mục data (dùng làm ETag mạnh, hỗ trợ Range)
+    media = MediaFileIndex(
+        settings.DATA_DIR,
+        max_age=settings.MEDIA_MAX_AGE,
+        max_ranges=settings.MEDIA_MAX_RANGES,
+    )
+    app.extensions['media_index'] = media
+    app.config['USE_X_SENDFILE'] = settings.MEDIA_USE_X_SENDFILE
+
     # Đăng ký Blueprint cho các content routes, với tiền tố /api
     app.register_blueprint(content_bp, url_prefix='/api')
+    # Endpoint chẩn đoán hiệu năng (chỉ truy cập được khi có DEBUG_TOKEN)
+    app.register_blueprint(debug_bp, url_prefix='/api/_debug')
+    # Thu thập sự kiện của khách (ghi nền xuống SQLite, không chặn request)
+    app.register_blueprint(events_bp, url_prefix='/api')
 
     # --- Request Hook ---
     @app.before_request
@@ -36,15 +54,25 @@ def create_app():
         Hàm này sẽ chạy trước mỗi request.
         Tự động tạo session cho người dùng mới.
         """
-        session_manager.create_user_session()
+        with phase('session'):
+            session_manager.create_user_session()
 
     # --- Static File Serving ---
     @app.route('/data/<path:filename>')
     def serve_data_files(filename):
         """
-        Phục vụ các file tĩnh (hình ảnh) từ thư mục data của backend.
+        Phục vụ các file tĩnh (hình ảnh, video, audio) từ thư mục data của backend.
+        Hỗ trợ Range (một và nhiều khoảng), ETag mạnh và request điều kiện.
+        Tham số `w` (và tùy chọn `fm`) trả về phiên bản ảnh đã thu nhỏ.
         """
-        return send_from_directory(settings.DATA_DIR, filename)
+        width = request.args.get('w', type=int)
+        if width:
+            # Phiên bản ảnh thu nhỏ cho srcset, ví dụ: /data/images/x.jpg?w=640
+            return media.serve_variant(filename, image_variant_service, width, request.args.get('fm'))
+        return media.serve(filename)
+
+    # Đo thời gian từng request (Server-Timing, histogram theo route)
+    init_timing(app, server_timing_header=settings.SERVER_TIMING_HEADER)
 
     return app
 
@@ -0,0 +1,66 @@
+import collections
+import sys
+import threading
+import time
+
+
+class ProfilerBusyError(RuntimeError):
+    """Đang có một phiên profile khác chạy."""
+
+
+class SamplingProfiler:
+    """
+    Profiler lấy mẫu cho traffic thật: một thread nền đọc stack của mọi thread khác
+    (sys._current_frames) theo chu kỳ cố định và đếm số lần gặp mỗi stack.
+
+    Không cài hook vào interpreter như cProfile nên chi phí gần như không đổi theo
+    tải, phù hợp để bật vài giây trên server đang chạy. Chỉ một phiên chạy cùng lúc.
+    """
+
+    def __init__(self, interval=0.005, max_seconds=30):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+
+    def profile(self, seconds):
+        """
+        Lấy mẫu trong `seconds` giây. Trả về (Counter stack -> số mẫu, tổng số lần lấy mẫu).
+        Mỗi stack là chuỗi 'module:hàm:dòng' từ ngoài vào trong, ngăn cách bằng ';'.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            return self._sample(min(max(seconds, 0.1), self.max_seconds))
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds):
+        stacks = collections.Counter()
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        rounds = 0
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stacks[self._stack_key(frame)] += 1
+            rounds += 1
+            time.sleep(self.interval)
+        return stacks, rounds
+
+    @staticmethod
+    def _stack_key(frame):
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        return ';'.join(reversed(parts))
+
+
+def format_collapsed(stacks):
+    """
+    Định dạng "collapsed stack" (mỗi dòng: stack số_mẫu), dùng trực tiếp được với
+    flamegraph.pl hoặc speedscope.
+    """
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
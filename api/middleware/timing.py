@@ -0,0 +1,161 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+# Giới hạn trên (ms) của các bucket histogram độ trễ, bucket cuối chứa mọi giá trị lớn hơn
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class LatencyHistogram:
+    """
+    Histogram độ trễ với các bucket cố định: bộ nhớ không đổi dù có bao nhiêu request.
+    """
+    __slots__ = ('counts', 'count', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p):
+        """Ước lượng phân vị p (0-100) bằng giới hạn trên của bucket chứa nó."""
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                if index == len(LATENCY_BUCKETS_MS):
+                    return round(self.max_ms, 3)
+                return min(float(LATENCY_BUCKETS_MS[index]), round(self.max_ms, 3))
+        return self.max_ms
+
+    def as_dict(self):
+        buckets = {f"le_{bound}": n for bound, n in zip(LATENCY_BUCKETS_MS, self.counts)}
+        buckets['inf'] = self.counts[-1]
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max_ms, 3),
+            'buckets': buckets,
+        }
+
+
+class RouteTimings:
+    """Histogram độ trễ theo từng route (method + rule) và theo từng giai đoạn của route."""
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, total_ms, phases):
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {'total': LatencyHistogram(), 'phases': {}}
+            entry['total'].add(total_ms)
+            for name, ms in phases.items():
+                histogram = entry['phases'].get(name)
+                if histogram is None:
+                    histogram = entry['phases'][name] = LatencyHistogram()
+                histogram.add(ms)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                route: {
+                    **entry['total'].as_dict(),
+                    'phases': {name: h.as_dict() for name, h in entry['phases'].items()},
+                }
+                for route, entry in sorted(self._routes.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+# --- Phase Recording ---
+@contextmanager
+def phase(name):
+    """
+    Đo thời gian của một giai đoạn trong request hiện tại (ví dụ 'json_encode', 'send_file').
+    Ngoài request (build, CLI) thì không làm gì.
+    """
+    if not has_request_context() or 'timing_phases' not in g:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases = g.timing_phases
+        phases[name] = phases.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+
+def _route_name():
+    rule = request.url_rule
+    return f"{request.method} {rule.rule if rule is not None else '<unmatched>'}"
+
+
+def init_timing(app, server_timing_header=True):
+    """
+    Gắn middleware đo thời gian vào app. Gọi sau khi đã đăng ký các before_request khác.
+
+    Mỗi request ghi lại: 'before' (các before_request hook, gồm session), 'handler'
+    (route), cùng các giai đoạn được đo bằng phase(). Kết quả được gửi về trong header
+    Server-Timing và cộng vào histogram theo route (app.extensions['route_timings']).
+    Thời gian tổng của histogram được tính khi response đã gửi xong (kể cả khi stream).
+    """
+    timings = RouteTimings()
+    app.extensions['route_timings'] = timings
+
+    def start_timer():
+        g.timing_started = time.perf_counter()
+        g.timing_phases = {}
+
+    def before_done():
+        now = time.perf_counter()
+        g.timing_phases['before'] = (now - g.timing_started) * 1000
+        g.timing_handler_started = now
+
+    def finish_timer(response):
+        if 'timing_started' not in g:
+            return response
+        now = time.perf_counter()
+        phases = g.timing_phases
+        if 'timing_handler_started' in g:
+            phases['handler'] = (now - g.timing_handler_started) * 1000
+        if server_timing_header:
+            entries = [f"{name};dur={ms:.2f}" for name, ms in phases.items()]
+            entries.append(f"total;dur={(now - g.timing_started) * 1000:.2f}")
+            response.headers['Server-Timing'] = ', '.join(entries)
+
+        route = _route_name()
+        started = g.timing_started
+        recorded = dict(phases)
+        response.call_on_close(
+            lambda: timings.record(route, (time.perf_counter() - started) * 1000, recorded)
+        )
+        return response
+
+    # start_timer chạy trước mọi before_request hook, before_done chạy sau cùng
+    hooks = app.before_request_funcs.setdefault(None, [])
+    hooks.insert(0, start_timer)
+    hooks.append(before_done)
+    app.after_request(finish_timer)
+    return timings
@@ -1,4 +1,5 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
+import math
 import sys
 import os
 
@@ -8,20 +9,58 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 # Import content_service từ backend
-from backend.app.services.content_service import content_service
+from backend.app.core.config import settings
+from backend.app.services.content_service import PAGE_PAYLOADS, localized_content
+from api.middleware.timing import phase
 
 # Tạo một Blueprint. Blueprint giống như một mini-app, giúp tổ chức các route.
 content_bp = Blueprint('content', __name__)
 
+def _localized_content():
+    """(ngôn ngữ, ContentService) của request: theo ?lang= hoặc header Accept-Language."""
+    return localized_content.resolve(request.args.get('lang'), request.headers.get('Accept-Language'))
+
+def _payload_response(name, localized=None):
+    """
+    Tạo response stream JSON đã mã hóa sẵn theo từng khối.
+    Byte đầu tiên được gửi ngay, bộ nhớ của mỗi request không phụ thuộc kích thước tài liệu.
+    ETag theo phiên bản nội dung (mỗi ngôn ngữ một phiên bản) nên client có thể nhận 304 khi dữ liệu không đổi.
+    """
+    locale, content_service = localized or _localized_content()
+    # Payload featured/trang chủ có thể phụ thuộc bảng xếp hạng phổ biến (FEATURED_MODE=popular)
+    name = content_service.payload_name(name)
+    etag = f"{content_service.version}-{name}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.vary.add('Accept-Language')
+        return response
+
+    # Mã hóa JSON (chỉ tốn thời gian ở request đầu tiên của mỗi phiên bản nội dung)
+    with phase('json_encode'):
+        length = content_service.payload_length(name)
+
+    # Không dùng make_conditional() vì nó sẽ đọc hết generator để tính Content-Length
+    response = Response(
+        content_service.iter_payload_chunks(name, settings.CONTENT_STREAM_CHUNK_BYTES),
+        mimetype='application/json',
+    )
+    if length is not None:
+        response.content_length = length
+    response.set_etag(etag)
+    response.content_language.add(locale)
+    response.vary.add('Accept-Language')
+    return response
+
 @content_bp.route('/content', methods=['GET'])
 def get_full_content():
     """API endpoint để lấy toàn bộ nội dung đã được xử lý."""
-    return jsonify(content_service.get_full_content())
+    return _payload_response('content')
 
 @content_bp.route('/about', methods=['GET'])
 def get_about():
     """API endpoint để lấy thông tin giới thiệu."""
-    return jsonify(content_service.get_about_content())
+    return _payload_response('about')
 
 @content_bp.route('/attractions', methods=['GET'])
 def get_attractions():
@@ -31,10 +70,86 @@ def get_attractions():
     """
     is_featured = request.args.get('featured', 'false').lower() == 'true'
     if is_featured:
-        return jsonify(content_service.get_featured_attractions())
-    return jsonify(content_service.get_all_attractions())
+        return _payload_response('featured')
+    return _payload_response('attractions')
+
+def _invalid_location():
+    return jsonify({'error': 'Query parameters lat and lon (or id) are required'}), 400
+
+@content_bp.route('/attractions/nearby', methods=['GET'])
+def get_nearby_attractions():
+    """
+    API endpoint trả về các điểm đến gần một vị trí, gần nhất trước (mỗi mục kèm distanceKm).
+    Vị trí là `lat` và `lon`, hoặc `id` của một điểm đến (điểm đó không nằm trong kết quả).
+    Tùy chọn: `radius` (km) và `limit` (số kết quả).
+    """
+    locale, content_service = _localized_content()
+    attraction_id = request.args.get('id')
+    if attraction_id is not None:
+        attraction = content_service.get_attraction(attraction_id)
+        if attraction is None:
+            return jsonify({'error': f"Unknown attraction '{attraction_id}'"}), 404
+        lat, lon = attraction.get('lat'), attraction.get('lon')
+        if lat is None or lon is None:
+            return jsonify({'error': f"Attraction '{attraction_id}' has no coordinates"}), 400
+    else:
+        lat = request.args.get('lat', type=float)
+        lon = request.args.get('lon', type=float)
+        # float('nan') / float('inf') đọc được từ query string nhưng không phải tọa độ
+        if lat is None or lon is None or not (math.isfinite(lat) and math.isfinite(lon)):
+            return _invalid_location()
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return _invalid_location()
+
+    radius = request.args.get('radius', settings.NEARBY_DEFAULT_RADIUS_KM, type=float)
+    if not math.isfinite(radius):
+        return _invalid_location()
+    radius = min(max(radius, 0.0), settings.NEARBY_MAX_RADIUS_KM)
+    limit = request.args.get('limit', settings.NEARBY_DEFAULT_LIMIT, type=int)
+    limit = min(max(limit, 1), settings.NEARBY_MAX_LIMIT)
+
+    with phase('nearby'):
+        results = content_service.nearby_attractions(lat, lon, radius, limit, exclude_id=attraction_id)
+    response = jsonify({'lat': lat, 'lon': lon, 'radius': radius, 'results': results})
+    response.content_language.add(locale)
+    response.vary.add('Accept-Language')
+    return response
+
+@content_bp.route('/attractions/<attraction_id>/related', methods=['GET'])
+def get_related_attractions(attraction_id):
+    """
+    API endpoint trả về các mục liên quan tới một điểm đến (điểm đến, bài viết, ảnh khác),
+    sắp xếp theo độ tương đồng nội dung. Bảng gợi ý được tính sẵn, request chỉ đọc lại.
+    """
+    localized = _localized_content()
+    name = localized[1].related_payload_name(attraction_id)
+    if name is None:
+        return jsonify({'error': f"Unknown attraction '{attraction_id}'"}), 404
+    return _payload_response(name, localized)
 
 @content_bp.route('/gallery', methods=['GET'])
 def get_gallery():
     """API endpoint để lấy danh sách thư viện."""
-    return jsonify(content_service.get_gallery_items())
+    return _payload_response('gallery')
+
+@content_bp.route('/bootstrap', methods=['GET'])
+def get_bootstrap():
+    """
+    API endpoint trả về trong một request toàn bộ dữ liệu một trang cần.
+    Query parameter `page`: home, attractions hoặc gallery.
+    """
+    page = request.args.get('page', 'home')
+    if page not in PAGE_PAYLOADS:
+        return jsonify({'error': f"Unknown page '{page}'", 'pages': sorted(PAGE_PAYLOADS)}), 400
+    return _payload_response(f"page:{page}")
+
+@content_bp.route('/changes', methods=['GET'])
+def get_changes():
+    """
+    API endpoint trả về thay đổi của nội dung kể từ phiên bản `since`
+    (các mục được thêm, sửa, xóa theo id). Nếu phiên bản đó không còn trong
+    lịch sử thì trả về toàn bộ nội dung với "full": true.
+    """
+    since = request.args.get('since', '')
+    localized = _localized_content()
+    return _payload_response(localized[1].changes_payload_name(since), localized)
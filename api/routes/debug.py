@@ -0,0 +1,52 @@
+import hmac
+
+from flask import Blueprint, Response, abort, current_app, jsonify, request
+
+from backend.app.core.config import settings
+from api.middleware.profiler import ProfilerBusyError, SamplingProfiler, format_collapsed
+
+# Các endpoint chẩn đoán hiệu năng, chỉ bật khi đặt DEBUG_TOKEN
+debug_bp = Blueprint('debug', __name__)
+
+profiler = SamplingProfiler(
+    interval=settings.PROFILE_SAMPLE_INTERVAL,
+    max_seconds=settings.PROFILE_MAX_SECONDS,
+)
+
+
+@debug_bp.before_request
+def require_debug_token():
+    """
+    Chỉ cho phép request có header X-Debug-Token đúng với DEBUG_TOKEN.
+    Khi chưa cấu hình token, các endpoint này coi như không tồn tại (404).
+    """
+    token = request.headers.get('X-Debug-Token', '')
+    if not settings.DEBUG_TOKEN or not hmac.compare_digest(token, settings.DEBUG_TOKEN):
+        abort(404)
+
+
+@debug_bp.route('/timings', methods=['GET'])
+def get_timings():
+    """Histogram độ trễ theo route và theo giai đoạn. Thêm ?reset=1 để xóa số liệu sau khi đọc."""
+    timings = current_app.extensions['route_timings']
+    data = timings.snapshot()
+    if request.args.get('reset') == '1':
+        timings.reset()
+    return jsonify(data)
+
+
+@debug_bp.route('/profile', methods=['GET'])
+def get_profile():
+    """
+    Lấy mẫu stack của server trong `seconds` giây (mặc định 5) và trả về
+    dạng collapsed stack để dựng flame graph.
+    """
+    seconds = request.args.get('seconds', 5.0, type=float)
+    try:
+        stacks, rounds = profiler.profile(seconds)
+    except ProfilerBusyError:
+        return jsonify({'error': 'A profile is already running'}), 409
+    response = Response(format_collapsed(stacks), mimetype='text/plain')
+    response.headers['X-Profile-Samples'] = str(rounds)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
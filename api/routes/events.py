@@ -0,0 +1,65 @@
+import hmac
+import json
+
+from flask import Blueprint, abort, jsonify, request
+
+from backend.app.core.config import settings
+from backend.app.services.analytics_service import analytics_service
+from backend.app.services.content_service import content_service
+from api.middleware.timing import phase
+from api.security import session_manager
+
+# Thu thập sự kiện của khách (page_view, click) theo lô
+events_bp = Blueprint('events', __name__)
+
+
+@events_bp.before_request
+def require_analytics_enabled():
+    """Khi tắt ANALYTICS_ENABLED, các endpoint này coi như không tồn tại (404)."""
+    if not settings.ANALYTICS_ENABLED:
+        abort(404)
+
+
+@events_bp.route('/events', methods=['POST'])
+def post_events():
+    """
+    Nhận một lô sự kiện: {"events": [{"type": "page_view", "page": "/attractions.html"},
+    {"type": "click", "target": "attraction-card", "attraction_id": "3"}]}.
+    Chỉ ghi vào buffer trong RAM rồi trả về 202 ngay; việc ghi xuống đĩa do thread nền đảm nhận.
+    Chấp nhận cả body text/plain vì navigator.sendBeacon không đặt được Content-Type JSON.
+    """
+    limit = settings.ANALYTICS_MAX_BODY_BYTES
+    if (request.content_length or 0) > limit:
+        return jsonify({'error': 'Payload too large'}), 413
+    # Body gửi kiểu chunked không có Content-Length: chỉ đọc tối đa limit + 1 byte trước khi parse
+    body = request.stream.read(limit + 1)
+    if len(body) > limit:
+        return jsonify({'error': 'Payload too large'}), 413
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = None
+    events = payload.get('events') if isinstance(payload, dict) else payload
+    if not isinstance(events, list):
+        return jsonify({'error': 'Expected a JSON object with an "events" list'}), 400
+
+    with phase('analytics'):
+        accepted, rejected = analytics_service.record(
+            session_manager.get_user_id(), events,
+            is_attraction=lambda attraction_id: content_service.get_attraction(attraction_id) is not None,
+        )
+    return jsonify({'accepted': accepted, 'rejected': rejected}), 202
+
+
+@events_bp.route('/events/stats', methods=['GET'])
+def get_event_stats():
+    """
+    Bộ đếm tổng hợp sẵn: tổng theo loại sự kiện, lượt xem theo trang, lượt xem/click theo địa điểm.
+    Cần header X-Debug-Token như các endpoint /api/_debug (404 khi chưa cấu hình DEBUG_TOKEN).
+    """
+    token = request.headers.get('X-Debug-Token', '')
+    if not settings.DEBUG_TOKEN or not hmac.compare_digest(token, settings.DEBUG_TOKEN):
+        abort(404)
+    response = jsonify(analytics_service.counters())
+    response.headers['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,227 @@
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+
+from flask import Response, request, send_file
+
+# Các file HTML tham chiếu asset bằng đường dẫn tương đối, ví dụ: href="assets/css/main.css"
+_ASSET_REF_PATTERN = re.compile(r'''(href|src)=(["'])(assets/[^"'?#]+)\2''')
+
+# Header Cache-Control cho file có thể thay đổi: luôn hỏi lại server (dùng ETag để trả 304)
+_REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+
+class StaticAsset:
+    """
+    Metadata của một file tĩnh trong thư mục frontend, được tính một lần khi quét.
+    """
+    __slots__ = ('path', 'abs_path', 'size', 'mtime', 'digest', 'mimetype', 'body', 'fingerprinted_path')
+
+    def __init__(self, path, abs_path, size, mtime, digest, mimetype, body=None, fingerprinted_path=None):
+        self.path = path
+        self.abs_path = abs_path
+        self.size = size
+        self.mtime = mtime
+        self.digest = digest
+        self.mimetype = mimetype
+        self.body = body
+        self.fingerprinted_path = fingerprinted_path
+
+    @property
+    def etag(self):
+        """ETag mạnh dựa trên hash nội dung."""
+        return self.digest[:32]
+
+
+def _fingerprint(path, digest):
+    """
+    Chèn hash nội dung vào tên file: assets/css/main.css -> assets/css/main.1a2b3c4d5e.css
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest[:10]}{ext}"
+
+
+class FrontendAssetCache:
+    """
+    Bảng metadata của toàn bộ file trong thư mục frontend.
+
+    Thư mục được quét một lần khi khởi động: kích thước, mtime, hash và content type
+    của từng file được lưu lại, file nhỏ được giữ luôn nội dung trong RAM. Nhờ vậy
+    mỗi request chỉ cần tra bảng, không phải gọi os.path.exists/stat lên ổ đĩa.
+    Các file HTML được viết lại để trỏ tới URL đã gắn fingerprint của asset.
+    """
+
+    def __init__(self, root, inline_max_bytes, immutable_max_age, spa_fallback='index.html', auto_reload=False):
+        self.root = os.path.abspath(root)
+        self.inline_max_bytes = inline_max_bytes
+        self.immutable_max_age = immutable_max_age
+        self.spa_fallback = spa_fallback
+        self.auto_reload = auto_reload
+        self._assets = {}
+        self._fingerprinted = {}
+        self._signature = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.scan()
+
+    # --- Scanning ---
+    def _walk(self):
+        """Liệt kê (đường dẫn tương đối, đường dẫn tuyệt đối, stat) của mọi file."""
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+            for name in sorted(filenames):
+                if name.startswith('.'):
+                    continue
+                abs_path = os.path.join(dirpath, name)
+                rel_path = os.path.relpath(abs_path, self.root).replace(os.sep, '/')
+                yield rel_path, abs_path, os.stat(abs_path)
+
+    def scan(self):
+        """
+        Quét lại toàn bộ thư mục frontend và dựng bảng metadata mới.
+        """
+        assets = {}
+        fingerprinted = {}
+        html_paths = []
+        signature = []
+
+        for rel_path, abs_path, st in self._walk():
+            signature.append((rel_path, st.st_mtime_ns, st.st_size))
+            hasher = hashlib.sha256()
+            body = None
+            with open(abs_path, 'rb') as f:
+                if st.st_size <= self.inline_max_bytes:
+                    body = f.read()
+                    hasher.update(body)
+                else:
+                    for block in iter(lambda: f.read(1024 * 1024), b''):
+                        hasher.update(block)
+
+            mimetype = mimetypes.guess_type(rel_path)[0] or 'application/octet-stream'
+            asset = StaticAsset(
+                path=rel_path,
+                abs_path=abs_path,
+                size=st.st_size,
+                mtime=st.st_mtime,
+                digest=hasher.hexdigest(),
+                mimetype=mimetype,
+                body=body,
+            )
+            if mimetype == 'text/html':
+                html_paths.append(rel_path)
+            else:
+                asset.fingerprinted_path = _fingerprint(rel_path, asset.digest)
+                fingerprinted[asset.fingerprinted_path] = asset
+            assets[rel_path] = asset
+
+        # HTML luôn được giữ trong RAM (đã viết lại link asset) vì là trang được truy cập nhiều nhất
+        for rel_path in html_paths:
+            asset = assets[rel_path]
+            if asset.body is None:
+                with open(asset.abs_path, 'rb') as f:
+                    asset.body = f.read()
+            asset.body = self._rewrite_html(asset.body, assets)
+            asset.size = len(asset.body)
+            asset.digest = hashlib.sha256(asset.body).hexdigest()
+
+        with self._lock:
+            self._assets = assets
+            self._fingerprinted = fingerprinted
+            self._signature = signature
+
+    def _rewrite_html(self, body, assets):
+        """Thay các tham chiếu assets/... trong HTML bằng URL đã gắn fingerprint."""
+        def replace(match):
+            asset = assets.get(match.group(3))
+            if asset is None or asset.fingerprinted_path is None:
+                return match.group(0)
+            return f"{match.group(1)}={match.group(2)}{asset.fingerprinted_path}{match.group(2)}"
+
+        text = body.decode('utf-8')
+        return _ASSET_REF_PATTERN.sub(replace, text).encode('utf-8')
+
+    def _maybe_reload(self):
+        """Chế độ phát triển: quét lại nếu có file thay đổi (kiểm tra tối đa 1 lần/giây)."""
+        now = time.monotonic()
+        if now - self._last_check < 1.0:
+            return
+        self._last_check = now
+        signature = [(rel_path, st.st_mtime_ns, st.st_size) for rel_path, _, st in self._walk()]
+        if signature != self._signature:
+            self.scan()
+
+    # --- Lookup ---
+    def lookup(self, path):
+        """
+        Tìm asset theo đường dẫn. Trả về (asset, immutable) hoặc (None, False).
+        `immutable` là True khi đường dẫn là URL đã gắn fingerprint.
+        """
+        if self.auto_reload:
+            self._maybe_reload()
+        asset = self._assets.get(path)
+        if asset is not None:
+            return asset, False
+        asset = self._fingerprinted.get(path)
+        if asset is not None:
+            return asset, True
+        return None, False
+
+    def all_assets(self):
+        """Danh sách toàn bộ asset đã quét (dùng khi build bản tĩnh)."""
+        return list(self._assets.values())
+
+    def fingerprinted_assets(self):
+        """Các asset có URL gắn fingerprint, sắp xếp theo đường dẫn."""
+        return [self._fingerprinted[path] for path in sorted(self._fingerprinted)]
+
+    def fingerprinted_paths(self):
+        return sorted(self._fingerprinted)
+
+    def asset_url(self, path):
+        """Trả về URL đã gắn fingerprint của một asset (hoặc chính path nếu không có)."""
+        asset = self._assets.get(path)
+        if asset is None or asset.fingerprinted_path is None:
+            return path
+        return asset.fingerprinted_path
+
+    def html_body(self, path):
+        """Nội dung HTML (đã viết lại link asset) của một trang, dùng cho prerender."""
+        asset, _ = self.lookup(path)
+        return asset.body.decode('utf-8') if asset is not None else None
+
+    # --- Serving ---
+    def serve(self, path):
+        """
+        Phục vụ một file theo đường dẫn; nếu không có thì trả về trang SPA fallback.
+        """
+        asset, immutable = self.lookup(path)
+        if asset is None:
+            asset, immutable = self.lookup(self.spa_fallback)
+        return self.make_response(asset, immutable)
+
+    def make_response(self, asset, immutable=False):
+        """Tạo response (có ETag, Last-Modified, Cache-Control) cho một asset."""
+        if asset.body is not None:
+            response = Response(asset.body, mimetype=asset.mimetype)
+            response.set_etag(asset.etag)
+            response.last_modified = asset.mtime
+        else:
+            response = send_file(
+                asset.abs_path,
+                mimetype=asset.mimetype,
+                etag=asset.etag,
+                last_modified=asset.mtime,
+                conditional=False,
+            )
+
+        if immutable:
+            response.cache_control.public = True
+            response.cache_control.max_age = self.immutable_max_age
+            response.cache_control.immutable = True
+        else:
+            response.headers['Cache-Control'] = _REVALIDATE_CACHE_CONTROL
+
+        return response.make_conditional(request, accept_ranges=True, complete_length=asset.size)
@@ -0,0 +1,322 @@
+import hashlib
+import json
+import mimetypes
+import os
+import stat
+import threading
+import uuid
+
+from flask import Response, request, send_file
+from werkzeug.exceptions import NotFound, RequestedRangeNotSatisfiable
+from werkzeug.security import safe_join
+
+from api.middleware.timing import phase
+
+# Tên file lưu chỉ mục hash giữa các lần khởi động (nằm ngay trong thư mục data)
+INDEX_FILENAME = '.media-index.json'
+
+_READ_BLOCK_SIZE = 64 * 1024
+
+
+class MediaFile:
+    """
+    Một mục trong chỉ mục media: kích thước, mtime và hash nội dung của file.
+    """
+    __slots__ = ('path', 'abs_path', 'size', 'mtime_ns', 'digest', 'mimetype')
+
+    def __init__(self, path, abs_path, size, mtime_ns, digest, mimetype):
+        self.path = path
+        self.abs_path = abs_path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.digest = digest
+        self.mimetype = mimetype
+
+    @property
+    def etag(self):
+        """ETag mạnh lấy từ hash nội dung đã tính sẵn."""
+        return self.digest[:32]
+
+    @property
+    def mtime(self):
+        return self.mtime_ns / 1e9
+
+
+def _hash_file(abs_path):
+    hasher = hashlib.sha256()
+    with open(abs_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+class MediaFileIndex:
+    """
+    Chỉ mục hash của các file media (ảnh, video, audio) trong thư mục data.
+
+    Hash được tính một lần và lưu vào file INDEX_FILENAME, lần khởi động sau chỉ
+    tính lại cho file có kích thước hoặc mtime thay đổi. File mới được thêm vào
+    sau khi khởi động (ví dụ video do AIThucChienAPI tạo ra) được lập chỉ mục
+    ngay ở lần truy cập đầu tiên.
+    """
+
+    def __init__(self, root, max_age, max_ranges=16, persist=True):
+        self.root = os.path.abspath(root)
+        self.max_age = max_age
+        self.max_ranges = max_ranges
+        self.persist = persist
+        self._files = {}
+        self._lock = threading.Lock()
+        self.scan()
+
+    # --- Indexing ---
+    def _load_saved_index(self):
+        try:
+            with open(os.path.join(self.root, INDEX_FILENAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self):
+        saved = {
+            path: {'size': entry.size, 'mtime_ns': entry.mtime_ns, 'digest': entry.digest}
+            for path, entry in self._files.items()
+        }
+        index_path = os.path.join(self.root, INDEX_FILENAME)
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(saved, f)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            # Thư mục data có thể chỉ đọc (ví dụ trên Vercel), khi đó chỉ giữ chỉ mục trong RAM
+            print(f"Warning: Could not write media index: {e}")
+
+    def _make_entry(self, rel_path, abs_path, st, saved=None):
+        if saved and saved.get('size') == st.st_size and saved.get('mtime_ns') == st.st_mtime_ns:
+            digest = saved['digest']
+        else:
+            digest = _hash_file(abs_path)
+        mimetype = mimetypes.guess_type(rel_path)[0] or 'application/octet-stream'
+        return MediaFile(rel_path, abs_path, st.st_size, st.st_mtime_ns, digest, mimetype)
+
+    def scan(self):
+        """
+        Quét thư mục data và cập nhật chỉ mục hash.
+        """
+        saved = self._load_saved_index()
+        files = {}
+        changed = False
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            for name in filenames:
+                if name.startswith('.'):
+                    continue
+                abs_path = os.path.join(dirpath, name)
+                rel_path = os.path.relpath(abs_path, self.root).replace(os.sep, '/')
+                entry = self._make_entry(rel_path, abs_path, os.stat(abs_path), saved.get(rel_path))
+                changed = changed or saved.get(rel_path, {}).get('digest') != entry.digest
+                files[rel_path] = entry
+
+        with self._lock:
+            self._files = files
+        if self.persist and (changed or len(files) != len(saved)):
+            self._save_index()
+
+    def lookup(self, filename):
+        """
+        Tìm file trong chỉ mục, lập chỉ mục ngay nếu là file mới. Trả về None nếu không tồn tại.
+
+        Khoá là đường dẫn tương đối đã chuẩn hoá, nên `images/./x.jpg` hay
+        `images//x.jpg` dùng chung một mục. Mỗi lần tra đều stat lại file và chỉ
+        hash lại khi kích thước hoặc mtime thay đổi; file đã bị xoá thì bị bỏ khỏi chỉ mục.
+        """
+        abs_path = safe_join(self.root, filename)
+        if abs_path is None:
+            return None
+        rel_path = os.path.relpath(abs_path, self.root).replace(os.sep, '/')
+        if any(part.startswith('.') for part in rel_path.split('/')):
+            return None
+
+        entry = self._files.get(rel_path)
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
+            if entry is not None:
+                with self._lock:
+                    self._files.pop(rel_path, None)
+            return None
+        if entry is not None and entry.size == st.st_size and entry.mtime_ns == st.st_mtime_ns:
+            return entry
+
+        try:
+            entry = self._make_entry(rel_path, abs_path, st)
+        except OSError:
+            return None
+        with self._lock:
+            self._files[rel_path] = entry
+        return entry
+
+    # --- Serving ---
+    def serve(self, filename):
+        """
+        Phục vụ một file media với ETag mạnh, request điều kiện và byte-range
+        (một hoặc nhiều khoảng).
+        """
+        entry = self.lookup(filename)
+        if entry is None:
+            raise NotFound()
+
+        byte_range = request.range if entry.size else None
+        if byte_range is not None and len(byte_range.ranges) > 1 and self._if_range_matches(entry):
+            # If-None-Match được xét trước Range: client đã có file thì không dựng body nhiều phần
+            if request.if_none_match.contains(entry.etag):
+                return self._not_modified(entry)
+            return self._multipart_response(entry, byte_range.ranges)
+
+        # Một khoảng hoặc không có Range: send_file (qua wsgi.file_wrapper) xử lý,
+        # cho phép server WSGI dùng sendfile để gửi file mà không cần copy.
+        with phase('send_file'):
+            response = send_file(
+                entry.abs_path,
+                mimetype=entry.mimetype,
+                etag=entry.etag,
+                last_modified=entry.mtime,
+                max_age=self.max_age,
+            )
+        response.cache_control.public = True
+        return response
+
+    def serve_variant(self, filename, variants, width, fmt=None):
+        """
+        Phục vụ phiên bản thu nhỏ của một ảnh. Định dạng (AVIF/WebP/JPEG) được chọn
+        theo tham số `fmt` hoặc header Accept; nếu không tạo được thì trả về ảnh gốc.
+        """
+        entry = self.lookup(filename)
+        if entry is None:
+            raise NotFound()
+
+        fmt = variants.negotiate_format(request.accept_mimetypes, fmt)
+        with phase('image_variant'):
+            variant = variants.get_variant(filename, variants.snap_width(width), fmt)
+        if variant is None:
+            return self.serve(filename)
+
+        path, mimetype, name = variant
+        with phase('send_file'):
+            response = send_file(path, mimetype=mimetype, etag=name, max_age=self.max_age)
+        response.cache_control.public = True
+        response.vary.add('Accept')
+        return response
+
+    def _if_range_matches(self, entry):
+        """If-Range không khớp nghĩa là file đã đổi: phải trả về toàn bộ file."""
+        if_range = request.if_range
+        if if_range.etag is not None:
+            return if_range.etag == entry.etag
+        if if_range.date is not None:
+            return int(entry.mtime) <= if_range.date.timestamp()
+        return True
+
+    def _not_modified(self, entry):
+        response = Response(status=304)
+        response.set_etag(entry.etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        return response
+
+    def _resolve_ranges(self, ranges, size):
+        """
+        Các khoảng [start, stop) hợp lệ, đã sắp xếp và gộp những khoảng chồng lên nhau
+        hoặc liền kề. Trả về (danh sách khoảng, tổng số byte được yêu cầu trước khi gộp).
+        """
+        resolved = []
+        for start, stop in ranges:
+            if start < 0:
+                start, stop = max(0, size + start), size
+            else:
+                stop = size if stop is None else min(stop, size)
+            if start < stop:
+                resolved.append((start, stop))
+        requested = sum(stop - start for start, stop in resolved)
+
+        merged = []
+        for start, stop in sorted(resolved):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+            else:
+                merged.append((start, stop))
+        return merged, requested
+
+    def _full_response(self, entry):
+        # RFC 7233 cho phép bỏ qua Range: trả về toàn bộ file (200)
+        return send_file(entry.abs_path, mimetype=entry.mimetype, etag=entry.etag,
+                         last_modified=entry.mtime, max_age=self.max_age, conditional=False)
+
+    def _multipart_response(self, entry, ranges):
+        """Tạo response multipart/byteranges cho request có nhiều khoảng."""
+        if len(ranges) > self.max_ranges:
+            return self._full_response(entry)
+
+        resolved, requested = self._resolve_ranges(ranges, entry.size)
+        if not resolved:
+            raise RequestedRangeNotSatisfiable(length=entry.size)
+        # Các khoảng chồng lên nhau đòi nhiều byte hơn cả file: không khuếch đại, trả về toàn bộ file
+        if requested > entry.size:
+            return self._full_response(entry)
+        if len(resolved) == 1:
+            start, stop = resolved[0]
+            response = Response(self._read_spans(entry, [(b'', start, stop)]), status=206, mimetype=entry.mimetype)
+            response.content_length = stop - start
+            response.headers['Content-Range'] = f"bytes {start}-{stop - 1}/{entry.size}"
+            return self._range_headers(entry, response)
+
+        boundary = uuid.uuid4().hex
+        headers = [
+            (
+                f"--{boundary}\r\n"
+                f"Content-Type: {entry.mimetype}\r\n"
+                f"Content-Range: bytes {start}-{stop - 1}/{entry.size}\r\n\r\n"
+            ).encode('ascii')
+            for start, stop in resolved
+        ]
+        closing = f"--{boundary}--\r\n".encode('ascii')
+        content_length = sum(len(h) + (stop - start) + 2 for h, (start, stop) in zip(headers, resolved))
+        content_length += len(closing)
+
+        def generate():
+            spans = [(header, start, stop) for header, (start, stop) in zip(headers, resolved)]
+            yield from self._read_spans(entry, spans, separator=b'\r\n')
+            yield closing
+
+        response = Response(generate(), status=206, content_type=f"multipart/byteranges; boundary={boundary}")
+        response.content_length = content_length
+        return self._range_headers(entry, response)
+
+    @staticmethod
+    def _read_spans(entry, spans, separator=b''):
+        """Đọc lần lượt các đoạn (header, start, stop) của file theo từng khối."""
+        with open(entry.abs_path, 'rb') as f:
+            for header, start, stop in spans:
+                if header:
+                    yield header
+                f.seek(start)
+                remaining = stop - start
+                while remaining > 0:
+                    block = f.read(min(_READ_BLOCK_SIZE, remaining))
+                    if not block:
+                        break
+                    remaining -= len(block)
+                    yield block
+                if separator:
+                    yield separator
+
+    def _range_headers(self, entry, response):
+        response.accept_ranges = 'bytes'
+        response.set_etag(entry.etag)
+        response.last_modified = entry.mtime
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        return response
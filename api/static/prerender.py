@@ -0,0 +1,161 @@
+import hashlib
+import re
+import threading
+from html import escape
+
+from flask import Response, request
+
+# Trang HTML được render sẵn và tên trang tương ứng trong ContentService.PAGE_PAYLOADS
+PAGES = {
+    'index.html': 'home',
+    'attractions.html': 'attractions',
+    'gallery.html': 'gallery',
+}
+
+# Kích thước hiển thị của ảnh, giống với main.js
+_CARD_SIZES = '(max-width: 768px) 100vw, 33vw'
+_SECTION_SIZES = '(max-width: 768px) 100vw, 50vw'
+_GALLERY_SIZES = '(max-width: 768px) 50vw, 25vw'
+
+# Vị trí chèn dữ liệu ban đầu: ngay trước script đầu tiên của trang
+_FIRST_SCRIPT_PATTERN = re.compile(r'(\s*)<script src=')
+_HTML_LANG_PATTERN = re.compile(r'(<html\b[^>]*\blang=")[^"]*(")')
+
+
+def _img(src, alt, srcset=None, sizes=None):
+    attrs = f'src="{escape(src or "")}" alt="{escape(alt or "")}"'
+    if srcset:
+        attrs += f' srcset="{escape(srcset)}" sizes="{sizes}"'
+    return f'<img {attrs} loading="lazy">'
+
+
+def render_attraction_card(attraction, with_description=False):
+    """Markup của một card điểm đến (giống createAttractionCard trong main.js)."""
+    details = f"<p>{escape(attraction.get('summary', ''))}</p>"
+    if with_description and attraction.get('description'):
+        details += f"<p class=\"attraction-description\">{escape(attraction['description'])}</p>"
+    # data-attraction-id để main.js ghi nhận lượt click vào từng điểm đến
+    attraction_id = attraction.get('id')
+    id_attr = f' data-attraction-id="{escape(str(attraction_id))}"' if attraction_id is not None else ''
+    return (
+        f'<div class="attraction-card"{id_attr}>'
+        f"{_img(attraction.get('imageUrl'), attraction.get('name'), attraction.get('imageSrcset'), _CARD_SIZES)}"
+        '<div class="attraction-card-content">'
+        f"<h3>{escape(attraction.get('name', ''))}</h3>{details}"
+        '</div></div>'
+    )
+
+
+def render_content_section(section, index):
+    """Markup của một section trang chủ (giống createContentSection trong main.js)."""
+    css_class = 'content-section reverse' if index % 2 else 'content-section'
+    return (
+        f'<div class="{css_class}">'
+        f"<div class=\"section-image\">{_img(section.get('imageUrl'), section.get('title'), section.get('imageSrcset'), _SECTION_SIZES)}</div>"
+        f"<div class=\"section-text\"><h3>{escape(section.get('title', ''))}</h3><p>{escape(section.get('content', ''))}</p></div>"
+        '</div>'
+    )
+
+
+def render_gallery_item(item):
+    """Markup của một ảnh trong thư viện (giống loadGalleryPage trong main.js)."""
+    return f"<div class=\"gallery-item\">{_img(item.get('url'), item.get('alt'), item.get('srcset'), _GALLERY_SIZES)}</div>"
+
+
+def fill_element(html, element_id, inner_html, prerendered=True):
+    """
+    Thay nội dung của phần tử có id cho trước bằng inner_html.
+    Phần tử được đánh dấu data-prerendered để main.js không dựng lại DOM.
+    """
+    pattern = re.compile(rf'(<(\w+)[^>]*\bid="{re.escape(element_id)}"[^>]*)>(.*?)(</\2>)', re.S)
+    marker = ' data-prerendered="true"' if prerendered else ''
+    return pattern.sub(lambda m: f"{m.group(1)}{marker}>{inner_html}{m.group(4)}", html, count=1)
+
+
+def embed_initial_data(html, payload):
+    """
+    Nhúng dữ liệu ban đầu của trang (JSON đã mã hóa) vào window.__INITIAL_DATA__
+    để main.js không cần gọi API lần đầu.
+    """
+    # Escape '<' để chuỗi JSON không thể đóng thẻ <script> sớm
+    data = payload.replace(b'<', b'\\u003c').decode('utf-8')
+    script = f"<script>window.__INITIAL_DATA__ = {data};</script>"
+    return _FIRST_SCRIPT_PATTERN.sub(lambda m: f"{m.group(1)}{script}{m.group(0)}", html, count=1)
+
+
+class PageRenderer:
+    """
+    Render sẵn index.html, attractions.html và gallery.html từ snapshot nội dung
+    của từng ngôn ngữ (LocalizedContent).
+
+    HTML đã render được cache theo ngôn ngữ, phiên bản nội dung và template, nên mỗi trang
+    chỉ render lại khi content.json (hoặc bản dịch) hay file HTML thay đổi.
+    """
+
+    def __init__(self, assets, localized):
+        self.assets = assets
+        self.localized = localized
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def handles(self, path):
+        return path in PAGES
+
+    def negotiate(self, lang=None, accept_language=None):
+        """Ngôn ngữ thực sự được phục vụ cho ?lang= / Accept-Language (có bản dịch hay không)."""
+        return self.localized.get(self.localized.negotiate(lang, accept_language))[0]
+
+    def render(self, path, locale=None):
+        """Trả về (body bytes, etag) của trang đã render bằng nội dung của ngôn ngữ `locale`."""
+        locale, content = self.localized.get(locale or self.localized.default_locale)
+        template = self.assets.html_body(path)
+        template_key = hashlib.sha256(template.encode('utf-8')).hexdigest()[:12]
+        # Tên payload của trang đổi theo bảng xếp hạng khi bật FEATURED_MODE=popular
+        key = (path, locale, content.version, content.payload_name(f"page:{PAGES[path]}"), template_key)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        body = self._render_page(content, locale, PAGES[path], template).encode('utf-8')
+        rendered = (body, hashlib.sha256(body).hexdigest()[:32])
+        with self._lock:
+            # Chỉ giữ bản render của phiên bản mới nhất cho mỗi (trang, ngôn ngữ)
+            for old_key in [k for k in self._cache if k[:2] == (path, locale)]:
+                del self._cache[old_key]
+            self._cache[key] = rendered
+        return rendered
+
+    def _render_page(self, content, locale, page, html):
+        html = _HTML_LANG_PATTERN.sub(lambda m: f"{m.group(1)}{locale}{m.group(2)}", html, count=1)
+        if page == 'home':
+            about = content.get_about_content()
+            html = fill_element(html, 'about-title', escape(about.get('title', '')))
+            html = fill_element(html, 'about-content', escape(about.get('text', '')))
+            sections = ''.join(
+                render_content_section(section, index)
+                for index, section in enumerate(content.snapshot.sections_dicts)
+            )
+            html = fill_element(html, 'content-sections', sections)
+            cards = ''.join(render_attraction_card(a) for a in content.get_featured_attractions())
+            html = fill_element(html, 'attractions-grid', cards)
+        elif page == 'attractions':
+            cards = ''.join(render_attraction_card(a, with_description=True) for a in content.get_all_attractions())
+            html = fill_element(html, 'attractions-list', cards)
+        elif page == 'gallery':
+            items = ''.join(render_gallery_item(item) for item in content.get_gallery_items())
+            html = fill_element(html, 'gallery-grid', items)
+        return embed_initial_data(html, content.get_page_payload(page))
+
+    def serve(self, path):
+        """
+        Response cho trang đã render theo ngôn ngữ của khách (?lang= hoặc Accept-Language);
+        ETag theo nội dung, luôn kiểm tra lại với server.
+        """
+        locale = self.negotiate(request.args.get('lang'), request.headers.get('Accept-Language'))
+        body, etag = self.render(path, locale)
+        response = Response(body, mimetype='text/html')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.content_language.add(locale)
+        response.vary.add('Accept-Language')
+        return response.make_conditional(request)
@@ -1,6 +1,9 @@
+import time
+_started = time.perf_counter()
+
 import sys
 import os
-from flask import Flask, send_from_directory
+from flask import Flask, request
 from flask_cors import CORS
 
 # --- System Path Setup ---
@@ -10,9 +13,27 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 # --- Import Modules ---
+from backend.app.core.startup import StartupTimer
+startup_timer = StartupTimer(_started)
+startup_timer.mark('flask_import')
+
 from backend.app.core.config import settings
+startup_timer.mark('config')
+
+# Import blueprint sẽ khởi tạo ContentService (tải snapshot hoặc content.json)
 from api.routes.content import content_bp
+from api.routes.debug import debug_bp
+from api.routes.events import events_bp
+from api.middleware.timing import init_timing, phase
+startup_timer.mark('content_load')
+
 from api.security import session_manager
+from api.static.media import MediaFileIndex
+from backend.app.services.image_variant_service import image_variant_service
+from api.static.asset_cache import FrontendAssetCache
+from api.static.prerender import PAGES, PageRenderer
+from backend.app.services.content_service import content_service, localized_content
+startup_timer.mark('imports')
 
 # --- App Initialization ---
 def create_app():
@@ -20,47 +41,112 @@ def create_app():
     Hàm khởi tạo và cấu hình ứng dụng Flask.
     Ứng dụng này sẽ phục vụ cả frontend tĩnh và backend API.
     """
-    # Thiết lập thư mục 'frontend' làm thư mục chứa file tĩnh
-    app = Flask(__name__, static_folder='frontend', static_url_path='')
+    # Thiết lập thư mục 'frontend' làm thư mục chứa file tĩnh.
+    # Route static mặc định của Flask bị tắt, việc phục vụ file do FrontendAssetCache đảm nhận.
+    app = Flask(__name__, static_folder=None)
     CORS(app)
 
+    # Quét thư mục frontend một lần khi khởi động thành bảng metadata trong RAM
+    assets = FrontendAssetCache(
+        settings.FRONTEND_DIR,
+        inline_max_bytes=settings.STATIC_INLINE_MAX_BYTES,
+        immutable_max_age=settings.STATIC_IMMUTABLE_MAX_AGE,
+        auto_reload=settings.STATIC_AUTO_RELOAD,
+    )
+    app.extensions['frontend_assets'] = assets
+
+    # Render sẵn các trang HTML từ snapshot nội dung (tắt bằng PRERENDER_PAGES=0)
+    renderer = PageRenderer(assets, localized_content) if settings.PRERENDER_PAGES else None
+    app.extensions['page_renderer'] = renderer
+
     # Thiết lập secret key cho session
     app.secret_key = settings.SECRET_KEY
 
+    # Chỉ mục hash của media trong thư mục data (dùng làm ETag mạnh, hỗ trợ Range)
+    media = MediaFileIndex(
+        settings.DATA_DIR,
+        max_age=settings.MEDIA_MAX_AGE,
+        max_ranges=settings.MEDIA_MAX_RANGES,
+    )
+    app.extensions['media_index'] = media
+    app.config['USE_X_SENDFILE'] = settings.MEDIA_USE_X_SENDFILE
+
     # Đăng ký API blueprint với tiền tố /api
     app.register_blueprint(content_bp, url_prefix='/api')
+    # Endpoint chẩn đoán hiệu năng (chỉ truy cập được khi có DEBUG_TOKEN)
+    app.register_blueprint(debug_bp, url_prefix='/api/_debug')
+    # Thu thập sự kiện của khách (ghi nền xuống SQLite, không chặn request)
+    app.register_blueprint(events_bp, url_prefix='/api')
+
+    # Chế độ nhiều worker: dựng sẵn model và HTML trước khi fork để các trang bộ nhớ được dùng chung
+    if settings.CONTENT_SHARED_SNAPSHOT:
+        localized_content.preload()
+        if renderer is not None:
+            for locale in localized_content.locales:
+                for path in PAGES:
+                    renderer.render(path, locale)
 
     # --- Request Hook ---
     @app.before_request
     def before_request_func():
         """Chạy trước mỗi request để tạo session cho người dùng mới."""
-        session_manager.create_user_session()
+        if settings.CONTENT_SHARED_SNAPSHOT:
+            # Mỗi worker tự ánh xạ lại snapshot khi nội dung được cập nhật
+            localized_content.maybe_reload()
+        with phase('session'):
+            session_manager.create_user_session()
 
     # --- Route cho Frontend ---
     @app.route('/')
     def serve_index():
         """Phục vụ file index.html chính."""
-        return send_from_directory(app.static_folder, 'index.html')
+        return serve_frontend_files('index.html')
 
     @app.route('/<path:path>')
     def serve_frontend_files(path):
-        """Phục vụ các file khác của frontend (attractions.html, assets/*, etc.)."""
-        if os.path.exists(os.path.join(app.static_folder, path)):
-            return send_from_directory(app.static_folder, path)
-        # Nếu không tìm thấy file, trả về trang chủ (hữu ích cho Single Page Apps)
-        return send_from_directory(app.static_folder, 'index.html')
+        """
+        Phục vụ các file khác của frontend (attractions.html, assets/*, etc.).
+        URL đã gắn fingerprint (assets/css/main.<hash>.css) được cache 1 năm (immutable).
+        Nếu không tìm thấy file, trả về trang chủ (hữu ích cho Single Page Apps).
+        Các trang HTML chính được render sẵn với dữ liệu từ ContentService.
+        """
+        if renderer is not None:
+            if renderer.handles(path):
+                return renderer.serve(path)
+            asset, _ = assets.lookup(path)
+            if asset is None:
+                return renderer.serve('index.html')
+        return assets.serve(path)
 
     # --- Route cho Dữ liệu Backend (Hình ảnh) ---
     @app.route('/data/<path:filename>')
     def serve_data_files(filename):
-        """Phục vụ các file tĩnh (hình ảnh) từ thư mục backend/data."""
-        return send_from_directory(settings.DATA_DIR, filename)
+        """
+        Phục vụ các file tĩnh (hình ảnh, video, audio) từ thư mục backend/data.
+        Hỗ trợ Range (một và nhiều khoảng), ETag mạnh và request điều kiện.
+        Tham số `w` (và tùy chọn `fm`) trả về phiên bản ảnh đã thu nhỏ.
+        """
+        width = request.args.get('w', type=int)
+        if width:
+            # Phiên bản ảnh thu nhỏ cho srcset, ví dụ: /data/images/x.jpg?w=640
+            return media.serve_variant(filename, image_variant_service, width, request.args.get('fm'))
+        return media.serve(filename)
+
+    # Đo thời gian từng request (Server-Timing, histogram theo route)
+    init_timing(app, server_timing_header=settings.SERVER_TIMING_HEADER)
 
     return app
 
 # --- Vercel Deployment ---
 # Vercel cần một biến 'app' toàn cục để chạy ứng dụng
 app = create_app()
+startup_timer.mark('app_init')
+app.extensions['startup_report'] = startup_timer.as_dict()
+if settings.STARTUP_REPORT:
+    print(startup_timer.report({
+        'content_source': content_service.load_source,
+        'content_version': content_service.version,
+    }))
 
 # --- Main Execution (for local development) ---
 if __name__ == '__main__':
@@ -0,0 +1,14 @@
+"""
+Điểm vào ASGI, chạy song song với app WSGI trong app.py.
+
+    pip install uvicorn
+    uvicorn asgi:app --port 8000
+
+Dùng chung app Flask (create_app) và các service: payload nội dung, trang render sẵn,
+asset và media được phục vụ bằng handler async; các route còn lại chạy qua Flask.
+"""
+from app import app as flask_app
+from api.asgi_app import AsgiApp
+from backend.app.services.content_service import localized_content
+
+app = AsgiApp(flask_app, localized_content)
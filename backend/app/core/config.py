@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 class Config:
     """
@@ -7,12 +8,147 @@ class Config:
     # Đường dẫn gốc của dự án
     BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 
+    # Thư mục gốc của toàn bộ repo (chứa app.py, frontend/, backend/)
+    PROJECT_ROOT = os.path.abspath(os.path.join(BASE_DIR, '..'))
+
     # Đường dẫn đến thư mục chứa dữ liệu
     DATA_DIR = os.path.join(BASE_DIR, 'data')
 
+    # File nội dung chính của website (có thể trỏ sang file khác, ví dụ khi chạy benchmark)
+    CONTENT_FILE = os.environ.get('CONTENT_FILE', os.path.join(DATA_DIR, 'content.json'))
+
+    # Snapshot nhị phân đã biên dịch của nội dung (tải bằng mmap khi khởi động, nhanh hơn JSON)
+    CONTENT_SNAPSHOT_FILE = os.environ.get('CONTENT_SNAPSHOT_FILE', os.path.join(DATA_DIR, 'content.snapshot'))
+
+    # Chế độ nhiều worker (gunicorn/uwsgi pre-fork): payload chỉ nằm trong file snapshot mmap,
+    # được biên dịch tự động nếu thiếu hoặc cũ, nên các worker dùng chung một bản trong RAM
+    CONTENT_SHARED_SNAPSHOT = os.environ.get('CONTENT_SHARED_SNAPSHOT', '0') == '1'
+    # Chu kỳ (giây) mỗi worker kiểm tra content.json/snapshot đã thay đổi để tải lại
+    CONTENT_RELOAD_INTERVAL = float(os.environ.get('CONTENT_RELOAD_INTERVAL', '2'))
+
+    # Lịch sử phiên bản nội dung cho /api/changes (chỉ lưu dấu vân tay của từng mục, không lưu nội dung)
+    CONTENT_HISTORY_FILE = os.environ.get('CONTENT_HISTORY_FILE', os.path.join(DATA_DIR, '.content-history.json'))
+    CONTENT_HISTORY_SIZE = 20
+
+    # Mã hóa sẵn JSON của các endpoint một lần cho mỗi phiên bản nội dung.
+    # Tắt để mã hóa từng phần ở mỗi request (tiết kiệm RAM thường trú, tốn CPU hơn).
+    CONTENT_PRECOMPUTE_PAYLOADS = os.environ.get('CONTENT_PRECOMPUTE_PAYLOADS', '1') == '1'
+    # Kích thước mỗi khối khi stream JSON về client
+    CONTENT_STREAM_CHUNK_BYTES = 64 * 1024
+
+    # --- Content Locales ---
+    # Ngôn ngữ của nội dung: content.json là ngôn ngữ mặc định, bản dịch nằm trong
+    # content.<ngôn ngữ>.json (và content.<ngôn ngữ>.snapshot), tạo bởi translate_content.py
+    DEFAULT_LOCALE = 'vi'
+    CONTENT_LOCALES = ('vi', 'en', 'fr')
+    # Model và cache của pipeline dịch (cache theo hash chuỗi nguồn, ngôn ngữ, model)
+    TRANSLATION_MODEL = os.environ.get('TRANSLATION_MODEL', 'gemini-2.5-flash')
+    TRANSLATION_CACHE_FILE = os.environ.get('TRANSLATION_CACHE_FILE', os.path.join(DATA_DIR, '.translation-cache.json'))
+    # Giới hạn của một request dịch: số chuỗi và tổng số ký tự được gói vào cùng một prompt
+    TRANSLATION_BATCH_ITEMS = 60
+    TRANSLATION_BATCH_CHARS = 12000
+    # Số request dịch chạy song song
+    TRANSLATION_MAX_WORKERS = 4
+
+    # In thời gian của từng giai đoạn khởi động (import, tải nội dung, tạo app)
+    STARTUP_REPORT = os.environ.get('STARTUP_REPORT', '0') == '1'
+
+    # Thư mục chứa các file tĩnh của frontend
+    FRONTEND_DIR = os.path.join(PROJECT_ROOT, 'frontend')
+
     # Cấu hình cho session (sẽ được sử dụng bởi API)
     # Trong một ứng dụng thực tế, key này nên được giữ bí mật và phức tạp hơn.
     SECRET_KEY = 'a-very-secret-key-for-session-management'
 
+    # --- Static File Cache ---
+    # File frontend nhỏ hơn ngưỡng này sẽ được giữ nguyên nội dung trong RAM
+    STATIC_INLINE_MAX_BYTES = 256 * 1024
+    # Thời gian cache (giây) cho các URL đã gắn fingerprint (1 năm)
+    STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+    # Bật khi phát triển local để tự quét lại frontend/ khi file thay đổi
+    STATIC_AUTO_RELOAD = os.environ.get('STATIC_AUTO_RELOAD', '0') == '1'
+
+    # Render sẵn index.html/attractions.html/gallery.html với dữ liệu nội dung (nhanh hơn cho FCP)
+    PRERENDER_PAGES = os.environ.get('PRERENDER_PAGES', '1') == '1'
+
+    # --- Media Files (/data) ---
+    # Thời gian cache (giây) cho ảnh/video/audio trong thư mục data
+    MEDIA_MAX_AGE = 24 * 3600
+    # Số khoảng tối đa trong một request Range nhiều khoảng (vượt quá sẽ trả toàn bộ file)
+    MEDIA_MAX_RANGES = 16
+    # Bật khi chạy sau nginx/Apache để server web gửi file qua header X-Sendfile
+    MEDIA_USE_X_SENDFILE = os.environ.get('MEDIA_USE_X_SENDFILE', '0') == '1'
+
+    # --- Image Variants ---
+    # Các mức chiều rộng (px) của phiên bản ảnh thu nhỏ dùng cho srcset
+    IMAGE_VARIANT_WIDTHS = (320, 640, 960, 1280, 1920)
+    # Chất lượng nén cho từng định dạng
+    IMAGE_VARIANT_QUALITY = {'jpeg': 78, 'webp': 75, 'avif': 55}
+    # Thư mục cache phiên bản ảnh (đặt sang /tmp khi thư mục data chỉ đọc)
+    IMAGE_VARIANT_CACHE_DIR = os.environ.get('IMAGE_VARIANT_CACHE_DIR', os.path.join(DATA_DIR, '.variants'))
+    # Dung lượng tối đa của cache trên đĩa, vượt quá sẽ xóa phiên bản ít dùng nhất
+    IMAGE_VARIANT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+    # --- Related Places ---
+    # /api/attractions/<id>/related: số mục gợi ý tối đa và độ tương đồng cosine (TF-IDF) tối thiểu
+    RELATED_TOP_K = 6
+    RELATED_MIN_SCORE = 0.05
+    # Khi nội dung được tải lại và tỉ lệ mục thay đổi (cộng dồn) không vượt quá ngưỡng này,
+    # chỉ tính lại các hàng bị ảnh hưởng thay vì toàn bộ chỉ mục
+    RELATED_INCREMENTAL_MAX_CHANGED = 0.2
+
+    # --- Nearby Places ---
+    # /api/attractions/nearby: kích thước ô của chỉ mục lưới không gian (km),
+    # bán kính (km) và số kết quả mặc định / tối đa của một truy vấn
+    NEARBY_GRID_CELL_KM = 1.0
+    NEARBY_DEFAULT_RADIUS_KM = 5.0
+    NEARBY_MAX_RADIUS_KM = 50.0
+    NEARBY_DEFAULT_LIMIT = 10
+    NEARBY_MAX_LIMIT = 50
+
+    # --- Analytics ---
+    # Thu thập sự kiện (page_view, click) của khách qua POST /api/events
+    ANALYTICS_ENABLED = os.environ.get('ANALYTICS_ENABLED', '1') == '1'
+    # File SQLite lưu sự kiện và bộ đếm; mặc định trong thư mục data, hoặc thư mục tạm
+    # của hệ thống khi thư mục data chỉ đọc (ví dụ trên Vercel)
+    ANALYTICS_DB_FILE = os.environ.get('ANALYTICS_DB_FILE', os.path.join(
+        DATA_DIR if os.access(DATA_DIR, os.W_OK) else tempfile.gettempdir(), '.analytics.sqlite3'))
+    # Sức chứa của ring buffer trong RAM (đầy thì sự kiện cũ nhất bị ghi đè, bộ đếm vẫn chính xác)
+    ANALYTICS_BUFFER_SIZE = 100_000
+    # Thread nền ghi buffer xuống đĩa mỗi chu kỳ này (giây), hoặc sớm hơn khi buffer đạt ANALYTICS_FLUSH_BATCH
+    ANALYTICS_FLUSH_INTERVAL = 1.0
+    ANALYTICS_FLUSH_BATCH = 5_000
+    # Khi ghi lỗi: thử lại sau flush_interval * 2^số lần lỗi (tối đa ANALYTICS_FLUSH_MAX_BACKOFF giây);
+    # sau ANALYTICS_FLUSH_MAX_FAILURES lần lỗi liên tiếp thì bỏ bộ đếm chưa ghi thay vì giữ lại
+    ANALYTICS_FLUSH_MAX_BACKOFF = 60.0
+    ANALYTICS_FLUSH_MAX_FAILURES = 5
+    # Giới hạn của một request: số sự kiện và kích thước body
+    ANALYTICS_MAX_BATCH_EVENTS = 200
+    ANALYTICS_MAX_BODY_BYTES = 64 * 1024
+
+    # --- Popularity Ranking ---
+    # 'static': điểm nổi bật theo cờ featured trong content.json;
+    # 'popular': top FEATURED_TOP_N điểm đến theo lượt xem/click gần đây (từ /api/events)
+    FEATURED_MODE = os.environ.get('FEATURED_MODE', 'static')
+    FEATURED_TOP_N = 3
+    # Trọng số của từng loại sự kiện và chu kỳ bán rã (giây) của điểm phổ biến
+    POPULARITY_WEIGHTS = {'page_view': 1.0, 'click': 3.0}
+    POPULARITY_HALF_LIFE = float(os.environ.get('POPULARITY_HALF_LIFE', str(3 * 24 * 3600)))
+    # Bảng xếp hạng được tính lại theo chu kỳ này (giây), không bao giờ trong request
+    POPULARITY_REFRESH_INTERVAL = 30.0
+    # Lưu điểm xuống đĩa theo chu kỳ này (giây) để khởi động lại không mất bảng xếp hạng
+    POPULARITY_SNAPSHOT_INTERVAL = 300.0
+    POPULARITY_SNAPSHOT_FILE = os.environ.get('POPULARITY_SNAPSHOT_FILE', os.path.join(DATA_DIR, '.popularity.json'))
+
+    # --- Instrumentation ---
+    # Gửi header Server-Timing (thời gian từng giai đoạn của request) về trình duyệt.
+    # Mặc định tắt: header tiết lộ thời gian xử lý nội bộ cho bất kỳ ai, chỉ bật khi cần đo
+    SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', '0') == '1'
+    # Token bảo vệ các endpoint /api/_debug (histogram, profiler). Để trống để tắt hẳn.
+    DEBUG_TOKEN = os.environ.get('DEBUG_TOKEN', '')
+    # Chu kỳ lấy mẫu (giây) và thời gian tối đa của một phiên profile
+    PROFILE_SAMPLE_INTERVAL = 0.005
+    PROFILE_MAX_SECONDS = 30
+
 # Tạo một instance của config để sử dụng trong toàn bộ ứng dụng
 settings = Config()
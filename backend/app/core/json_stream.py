@@ -0,0 +1,40 @@
+import json
+
+# Encoder dùng chung: giữ nguyên ký tự tiếng Việt (nhỏ hơn \uXXXX) và bỏ khoảng trắng thừa
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def encode_json(obj) -> bytes:
+    """
+    Mã hóa một đối tượng thành JSON (UTF-8, dạng gọn).
+    """
+    return _encoder.encode(obj).encode('utf-8')
+
+
+def iter_json_chunks(obj, chunk_size):
+    """
+    Mã hóa JSON từng phần: gom các mảnh của JSONEncoder.iterencode thành các
+    khối khoảng chunk_size byte. Bộ nhớ dùng cho mỗi lần gọi chỉ cỡ một khối,
+    không phụ thuộc kích thước tài liệu.
+    """
+    buffer = []
+    size = 0
+    for piece in _encoder.iterencode(obj):
+        data = piece.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def iter_bytes_chunks(data: bytes, chunk_size):
+    """
+    Phát lại một payload đã mã hóa sẵn theo từng khối chunk_size byte.
+    """
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield bytes(view[start:start + chunk_size])
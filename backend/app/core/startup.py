@@ -0,0 +1,36 @@
+import time
+
+
+class StartupTimer:
+    """
+    Đo thời gian của từng giai đoạn khởi động (import, tải nội dung, tạo app...).
+    Mỗi lần gọi mark() ghi lại thời gian trôi qua kể từ mốc trước đó.
+    """
+
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self._last = self.started
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    @property
+    def total(self):
+        return self._last - self.started
+
+    def as_dict(self):
+        """Thời gian (ms) của từng giai đoạn và tổng cộng."""
+        report = {phase: round(seconds * 1000, 2) for phase, seconds in self.phases}
+        report['total'] = round(self.total * 1000, 2)
+        return report
+
+    def report(self, extra=None):
+        """Chuỗi báo cáo ngắn gọn để in ra khi khởi động."""
+        lines = [f"  {phase:<16}{seconds * 1000:8.1f} ms" for phase, seconds in self.phases]
+        lines.append(f"  {'total':<16}{self.total * 1000:8.1f} ms")
+        if extra:
+            lines.extend(f"  {key:<16}{value}" for key, value in extra.items())
+        return "Startup report:\n" + "\n".join(lines)
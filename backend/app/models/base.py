@@ -0,0 +1,152 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+class ValidationError(ValueError):
+    """
+    Lỗi dữ liệu đầu vào của một model, chứa danh sách đầy đủ tất cả các lỗi
+    (không dừng lại ở lỗi đầu tiên) để người nhập liệu sửa một lần.
+    """
+
+    def __init__(self, errors: List[str], source: Optional[str] = None):
+        self.errors = list(errors)
+        self.source = source
+        prefix = f"{source}: " if source else ""
+        super().__init__(prefix + "; ".join(self.errors))
+
+
+class Field(NamedTuple):
+    """
+    Mô tả một trường của model: tên thuộc tính, khóa JSON, kiểu dữ liệu, bắt buộc hay không.
+    """
+    attr: str
+    key: str
+    types: Tuple[type, ...]
+    required: bool = True
+    default: Any = None
+
+
+_BOOL_STRINGS = {'true': True, 'false': False, '1': True, '0': False}
+
+
+def _coerce(field: Field, value: Any) -> Any:
+    """
+    Chuyển các dạng lỏng thường gặp khi dữ liệu được xuất từ bảng tính về đúng kiểu:
+    0/1 hoặc "true"/"false" cho trường bool, chuỗi số cho trường số. Giá trị không
+    chuyển được giữ nguyên để from_dict báo lỗi kiểu.
+    """
+    if field.types == (bool,):
+        if type(value) is int and value in (0, 1):
+            return bool(value)
+        if isinstance(value, str):
+            return _BOOL_STRINGS.get(value.strip().lower(), value)
+    elif isinstance(value, str) and field.types in ((int, float), (float,), (int,)):
+        try:
+            return int(value) if field.types == (int,) else float(value)
+        except ValueError:
+            return value
+    return value
+
+
+class Record:
+    """
+    Lớp cơ sở cho các model dữ liệu bất biến dùng __slots__.
+
+    Không có __dict__ cho từng instance nên tốn ít bộ nhớ hơn với danh mục lớn.
+    Dữ liệu được kiểm tra một lần khi tải (from_dict) và dạng dictionary để
+    serialize (to_dict) chỉ được tạo một lần rồi dùng lại.
+    Các khóa không khai báo trong FIELDS được giữ nguyên trong `extra`.
+    """
+    __slots__ = ('extra', '_dict')
+
+    FIELDS: Tuple[Field, ...] = ()
+
+    def __init__(self, extra: Optional[Dict[str, Any]] = None, **values):
+        for field in self.FIELDS:
+            object.__setattr__(self, field.attr, values.pop(field.attr, field.default))
+        if values:
+            raise TypeError(f"Unexpected fields for {type(self).__name__}: {', '.join(values)}")
+        object.__setattr__(self, 'extra', dict(extra or {}))
+        object.__setattr__(self, '_dict', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, field.attr) for field in self.FIELDS))
+
+    def __repr__(self):
+        values = ", ".join(f"{field.attr}={getattr(self, field.attr)!r}" for field in self.FIELDS)
+        return f"{type(self).__name__}({values})"
+
+    def replace(self, **changes):
+        """Tạo bản sao với một số trường được thay đổi (instance gốc không đổi)."""
+        values = {field.attr: getattr(self, field.attr) for field in self.FIELDS}
+        values.update(changes)
+        return type(self)(extra=self.extra, **values)
+
+    def to_dict(self) -> dict:
+        """
+        Chuyển đổi đối tượng thành dictionary để serialize thành JSON.
+        Kết quả được cache, không được sửa trực tiếp dictionary trả về.
+        """
+        if self._dict is None:
+            data = {}
+            for field in self.FIELDS:
+                value = getattr(self, field.attr)
+                if field.required or value is not None:
+                    data[field.key] = value
+            for key, value in self.extra.items():
+                data.setdefault(key, value)
+            object.__setattr__(self, '_dict', data)
+        return self._dict
+
+    @classmethod
+    def from_dict(cls, data: dict, source: Optional[str] = None):
+        """
+        Tạo đối tượng từ một dictionary.
+        Raise ValidationError liệt kê tất cả các trường thiếu hoặc sai kiểu, cùng các lỗi
+        do `validate_values` của lớp con trả về.
+        """
+        if not isinstance(data, dict):
+            raise ValidationError([f"expected an object, got {type(data).__name__}"], source)
+
+        errors = []
+        values = {}
+        for field in cls.FIELDS:
+            value = data.get(field.key)
+            if value is None:
+                if field.required:
+                    errors.append(f"missing required field '{field.key}'")
+                values[field.attr] = field.default
+                continue
+            value = _coerce(field, value)
+            # bool là lớp con của int nên phải loại trừ riêng
+            if not isinstance(value, field.types) or (isinstance(value, bool) and bool not in field.types):
+                expected = "/".join(t.__name__ for t in field.types)
+                errors.append(f"field '{field.key}' must be {expected}, got {type(value).__name__}")
+                continue
+            values[field.attr] = value
+
+        errors.extend(cls.validate_values(values))
+        if errors:
+            raise ValidationError(errors, source)
+
+        known_keys = {field.key for field in cls.FIELDS}
+        extra = {key: value for key, value in data.items() if key not in known_keys}
+        return cls(extra=extra, **values)
+
+    @classmethod
+    def validate_values(cls, values: Dict[str, Any]) -> List[str]:
+        """
+        Kiểm tra thêm giữa các trường (lớp con ghi đè). `values` chỉ chứa các trường
+        đã đúng kiểu (theo tên thuộc tính). Trả về danh sách lỗi.
+        """
+        return []
@@ -0,0 +1,96 @@
+from typing import List, Tuple
+
+from backend.app.models.base import ValidationError
+from backend.app.models.gallery import GalleryItem
+from backend.app.models.place import Place
+from backend.app.models.section import Section
+
+# Các danh sách trong content.json và model tương ứng
+_COLLECTIONS = (
+    ('sections', Section),
+    ('attractions', Place),
+    ('gallery', GalleryItem),
+)
+
+
+class ContentSnapshot:
+    """
+    Ảnh chụp bất biến của toàn bộ nội dung website sau khi đã kiểm tra dữ liệu.
+
+    Mọi danh sách đã được chuyển thành model và dạng dictionary dùng để trả về
+    API được tính sẵn một lần, request chỉ việc đọc lại.
+    """
+    __slots__ = (
+        'about', 'sections', 'attractions', 'gallery', 'extra', 'errors',
+        'sections_dicts', 'attractions_dicts', 'featured_dicts', 'gallery_dicts', 'full_dict',
+    )
+
+    def __init__(self, about: dict, sections: Tuple[Section, ...], attractions: Tuple[Place, ...],
+                 gallery: Tuple[GalleryItem, ...], extra: dict = None, errors: Tuple[str, ...] = ()):
+        self.about = about
+        self.sections = tuple(sections)
+        self.attractions = tuple(attractions)
+        self.gallery = tuple(gallery)
+        self.extra = dict(extra or {})
+        self.errors = tuple(errors)
+
+        self.sections_dicts = [item.to_dict() for item in self.sections]
+        self.attractions_dicts = [item.to_dict() for item in self.attractions]
+        self.featured_dicts = [item.to_dict() for item in self.attractions if item.featured]
+        self.gallery_dicts = [item.to_dict() for item in self.gallery]
+
+        full = dict(self.extra)
+        if about or 'about' in full:
+            full['about'] = about
+        full['sections'] = self.sections_dicts
+        full['attractions'] = self.attractions_dicts
+        full['gallery'] = self.gallery_dicts
+        self.full_dict = full
+
+    @classmethod
+    def empty(cls) -> 'ContentSnapshot':
+        return cls(about={}, sections=(), attractions=(), gallery=())
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ContentSnapshot':
+        """
+        Tạo snapshot từ dữ liệu content.json.
+
+        Mục không hợp lệ bị bỏ qua, lỗi của tất cả các mục được gom vào `errors`
+        (dùng validate() nếu muốn raise ValidationError).
+        """
+        if not isinstance(data, dict):
+            return cls(about={}, sections=(), attractions=(), gallery=(),
+                       errors=(f"content: expected an object, got {type(data).__name__}",))
+
+        errors: List[str] = []
+        collections = {}
+        for key, model in _COLLECTIONS:
+            items = []
+            raw_items = data.get(key, [])
+            if not isinstance(raw_items, list):
+                errors.append(f"{key}: expected a list, got {type(raw_items).__name__}")
+                raw_items = []
+            for index, raw in enumerate(raw_items):
+                try:
+                    items.append(model.from_dict(raw, source=f"{key}[{index}]"))
+                except ValidationError as e:
+                    errors.append(str(e))
+            collections[key] = items
+
+        about = data.get('about', {})
+        if not isinstance(about, dict):
+            errors.append(f"about: expected an object, got {type(about).__name__}")
+            about = {}
+
+        known_keys = {'about'} | {key for key, _ in _COLLECTIONS}
+        extra = {key: value for key, value in data.items() if key not in known_keys}
+        return cls(about=about, extra=extra, errors=errors, **collections)
+
+    @classmethod
+    def validate(cls, data: dict) -> 'ContentSnapshot':
+        """Như from_dict nhưng raise ValidationError chứa toàn bộ lỗi nếu có."""
+        snapshot = cls.from_dict(data)
+        if snapshot.errors:
+            raise ValidationError(list(snapshot.errors), source='content.json')
+        return snapshot
@@ -0,0 +1,19 @@
+from typing import Optional
+
+from backend.app.models.base import Field, Record
+
+
+class GalleryItem(Record):
+    """
+    Lớp đại diện cho một ảnh trong thư viện (Gallery).
+    """
+    __slots__ = ('url', 'alt', 'srcset')
+
+    FIELDS = (
+        Field('url', 'url', (str,)),
+        Field('alt', 'alt', (str,), required=False, default=''),
+        Field('srcset', 'srcset', (str,), required=False),
+    )
+
+    def __init__(self, url: str, alt: str = '', srcset: Optional[str] = None, extra: Optional[dict] = None):
+        super().__init__(extra=extra, url=url, alt=alt, srcset=srcset)
@@ -1,45 +1,87 @@
-from typing import Optional
+import math
+from typing import List, Optional, Tuple
 
-class Place:
+from backend.app.models.base import Field, Record
+
+
+class Place(Record):
     """
     Lớp đại diện cho một địa điểm du lịch (Attraction).
 
     Sử dụng lớp này giúp mã nguồn trở nên tường minh và dễ quản lý hơn
-    so với việc sử dụng dictionary trực tiếp.
+    so với việc sử dụng dictionary trực tiếp. Đối tượng là bất biến và
+    dùng __slots__ nên tiết kiệm bộ nhớ khi danh sách điểm đến lớn.
+
+    Tọa độ (lat/lon, độ), độ cao (elevation, mét) và quãng đường đi bộ (trailDistance, km)
+    là tùy chọn; chỉ điểm đến có đủ lat và lon mới xuất hiện trong /api/attractions/nearby.
     """
-    def __init__(self, id: int, name: str, summary: str, image_url: str, featured: bool = False):
-        self.id = id
-        self.name = name
-        self.summary = summary
-        self.image_url = image_url
-        self.featured = featured
-
-    def to_dict(self) -> dict:
-        """
-        Chuyển đổi đối tượng Place thành một dictionary để dễ dàng serialize thành JSON.
-        """
-        return {
-            "id": self.id,
-            "name": self.name,
-            "summary": self.summary,
-            "imageUrl": self.image_url,
-            "featured": self.featured
-        }
-
-    @staticmethod
-    def from_dict(data: dict) -> Optional['Place']:
-        """
-        Tạo một đối tượng Place từ một dictionary.
-        Trả về None nếu dữ liệu đầu vào không hợp lệ.
-        """
-        try:
-            return Place(
-                id=data['id'],
-                name=data['name'],
-                summary=data['summary'],
-                image_url=data['imageUrl'],
-                featured=data.get('featured', False)
-            )
-        except KeyError:
-            # Trả về None nếu thiếu trường thông tin quan trọng
+    __slots__ = (
+        'id', 'name', 'summary', 'image_url', 'featured', 'description', 'image_srcset',
+        'lat', 'lon', 'elevation', 'trail_distance',
+    )
+
+    FIELDS = (
+        Field('id', 'id', (int, str)),
+        Field('name', 'name', (str,)),
+        Field('summary', 'summary', (str,)),
+        Field('image_url', 'imageUrl', (str,)),
+        Field('featured', 'featured', (bool,), required=False, default=False),
+        Field('description', 'description', (str,), required=False),
+        Field('image_srcset', 'imageSrcset', (str,), required=False),
+        Field('lat', 'lat', (int, float), required=False),
+        Field('lon', 'lon', (int, float), required=False),
+        Field('elevation', 'elevation', (int, float), required=False),
+        Field('trail_distance', 'trailDistance', (int, float), required=False),
+    )
+
+    def __init__(self, id: int, name: str, summary: str, image_url: str, featured: bool = False,
+                 description: Optional[str] = None, image_srcset: Optional[str] = None,
+                 lat: Optional[float] = None, lon: Optional[float] = None, elevation: Optional[float] = None,
+                 trail_distance: Optional[float] = None, extra: Optional[dict] = None):
+        super().__init__(
+            extra=extra,
+            id=id,
+            name=name,
+            summary=summary,
+            image_url=image_url,
+            featured=featured,
+            description=description,
+            image_srcset=image_srcset,
+            lat=lat,
+            lon=lon,
+            elevation=elevation,
+            trail_distance=trail_distance,
+        )
+
+    @property
+    def location(self) -> Optional[Tuple[float, float]]:
+        """(lat, lon) nếu điểm đến có tọa độ, nếu không là None."""
+        if self.lat is None or self.lon is None:
             return None
+        return float(self.lat), float(self.lon)
+
+    @classmethod
+    def validate_values(cls, values: dict) -> List[str]:
+        """Kiểm tra các trường số (hữu hạn), tọa độ (đủ cặp, trong khoảng hợp lệ) và quãng đường đi bộ."""
+        errors = []
+        numbers = {}
+        for field in cls.FIELDS:
+            value = values.get(field.attr)
+            if field.types != (int, float) or value is None:
+                continue
+            # NaN và Infinity (json.load chấp nhận) không phải giá trị đo hợp lệ; NaN còn lọt qua mọi phép so sánh
+            if math.isfinite(value):
+                numbers[field.attr] = value
+            else:
+                errors.append(f"field '{field.key}' must be a finite number, got {value}")
+        if (values.get('lat') is None) != (values.get('lon') is None):
+            errors.append("fields 'lat' and 'lon' must be given together")
+        lat, lon, trail_distance = numbers.get('lat'), numbers.get('lon'), numbers.get('trail_distance')
+        if lat is not None and not -90 <= lat <= 90:
+            errors.append(f"field 'lat' must be between -90 and 90, got {lat}")
+        if lon is not None and not -180 <= lon <= 180:
+            errors.append(f"field 'lon' must be between -180 and 180, got {lon}")
+        if trail_distance is not None and trail_distance < 0:
+            errors.append(f"field 'trailDistance' must not be negative, got {trail_distance}")
+        return errors
+
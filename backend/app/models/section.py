@@ -0,0 +1,21 @@
+from typing import Optional
+
+from backend.app.models.base import Field, Record
+
+
+class Section(Record):
+    """
+    Lớp đại diện cho một phần nội dung trên trang chủ (Section).
+    """
+    __slots__ = ('title', 'content', 'image_url', 'image_srcset')
+
+    FIELDS = (
+        Field('title', 'title', (str,)),
+        Field('content', 'content', (str,)),
+        Field('image_url', 'imageUrl', (str,), required=False),
+        Field('image_srcset', 'imageSrcset', (str,), required=False),
+    )
+
+    def __init__(self, title: str, content: str, image_url: Optional[str] = None,
+                 image_srcset: Optional[str] = None, extra: Optional[dict] = None):
+        super().__init__(extra=extra, title=title, content=content, image_url=image_url, image_srcset=image_srcset)
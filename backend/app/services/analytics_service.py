@@ -0,0 +1,259 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, deque
+
+from backend.app.core.config import settings
+
+# Loại sự kiện được nhận và các trường tùy chọn (chuỗi, cắt bớt nếu quá dài)
+EVENT_TYPES = frozenset({'page_view', 'click'})
+_TEXT_FIELDS = ('page', 'target')
+_MAX_FIELD_CHARS = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    user_id TEXT,
+    type TEXT NOT NULL,
+    page TEXT,
+    target TEXT,
+    attraction_id TEXT
+);
+CREATE TABLE IF NOT EXISTS counters (
+    key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+"""
+
+
+def _text(value):
+    if value is None or isinstance(value, bool) or not isinstance(value, (str, int)):
+        return None
+    value = str(value).strip()
+    return value[:_MAX_FIELD_CHARS] or None
+
+
+def _counter_keys(event_type, page, attraction_id):
+    """Các bộ đếm tổng hợp sẵn mà một sự kiện làm tăng."""
+    keys = [f"type:{event_type}"]
+    if event_type == 'page_view' and page:
+        keys.append(f"page:{page}")
+    if attraction_id:
+        keys.append(f"attraction:{attraction_id}:{event_type}")
+    return keys
+
+
+def _group_counters(counts):
+    """{khóa: số} -> {'totals': ..., 'pages': ..., 'attractions': {id: {loại: số}}}."""
+    grouped = {'totals': {}, 'pages': {}, 'attractions': {}}
+    for key, count in counts.items():
+        kind, _, rest = key.partition(':')
+        if kind == 'type':
+            grouped['totals'][rest] = count
+        elif kind == 'page':
+            grouped['pages'][rest] = count
+        elif kind == 'attraction':
+            attraction_id, _, event_type = rest.rpartition(':')
+            grouped['attractions'].setdefault(attraction_id, {})[event_type] = count
+    return grouped
+
+
+class AnalyticsService:
+    """
+    Thu thập sự kiện của khách mà không chặn request: request chỉ thêm sự kiện vào ring buffer
+    trong RAM và cộng bộ đếm; một thread nền định kỳ ghi cả lô xuống SQLite (bảng events chỉ
+    ghi thêm, bảng counters được cộng dồn trong cùng một transaction).
+    Khi buffer đầy, sự kiện cũ nhất bị ghi đè nhưng bộ đếm vẫn chính xác.
+    """
+
+    def __init__(self, db_path=settings.ANALYTICS_DB_FILE, capacity=settings.ANALYTICS_BUFFER_SIZE,
+                 flush_interval=settings.ANALYTICS_FLUSH_INTERVAL, flush_batch=settings.ANALYTICS_FLUSH_BATCH,
+                 max_batch_events=settings.ANALYTICS_MAX_BATCH_EVENTS,
+                 max_backoff=settings.ANALYTICS_FLUSH_MAX_BACKOFF, max_failures=settings.ANALYTICS_FLUSH_MAX_FAILURES):
+        self.db_path = db_path
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.max_batch_events = max_batch_events
+        self.max_backoff = max_backoff
+        self.max_failures = max_failures
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer = deque(maxlen=capacity)
+        # Bộ đếm chưa ghi xuống đĩa / đang được ghi
+        self._pending = Counter()
+        self._inflight = Counter()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._pid = None
+        self._db_ready = False
+        # Số lần ghi thất bại liên tiếp và thời điểm (monotonic) được thử lại
+        self._failures = 0
+        self._retry_at = 0.0
+        self._observers = []
+        self.stats = {'accepted': 0, 'rejected': 0, 'dropped': 0, 'flushed': 0, 'write_errors': 0,
+                      'discarded_counts': 0}
+        atexit.register(self.close)
+
+    # --- Ingestion (đường đi của request, không chạm tới đĩa) ---
+    def record(self, user_id, events, is_attraction=None):
+        """
+        Nhận một lô sự kiện. Trả về (số sự kiện nhận, số sự kiện bị loại).
+        `is_attraction(id)` (nếu có) kiểm tra attraction_id: sự kiện gắn với id không tồn tại
+        bị loại, để khách không tạo được bộ đếm tùy ý.
+        """
+        now = time.time()
+        rows, counts = [], Counter()
+        for event in events[:self.max_batch_events]:
+            if not isinstance(event, dict) or event.get('type') not in EVENT_TYPES:
+                continue
+            page, target = (_text(event.get(field)) for field in _TEXT_FIELDS)
+            attraction_id = _text(event.get('attraction_id'))
+            if attraction_id and is_attraction is not None and not is_attraction(attraction_id):
+                continue
+            rows.append((now, user_id, event['type'], page, target, attraction_id))
+            counts.update(_counter_keys(event['type'], page, attraction_id))
+        rejected = len(events) - len(rows)
+
+        with self._lock:
+            dropped = max(0, len(self._buffer) + len(rows) - self.capacity)
+            self._buffer.extend(rows)
+            self._pending.update(counts)
+            self.stats['accepted'] += len(rows)
+            self.stats['rejected'] += rejected
+            self.stats['dropped'] += dropped
+            buffered = len(self._buffer)
+
+        for observer in self._observers:
+            for row in rows:
+                if row[5]:
+                    observer(row[2], row[5])
+
+        if rows:
+            self._ensure_thread()
+            if buffered >= self.flush_batch:
+                self._wakeup.set()
+        return len(rows), rejected
+
+    def add_observer(self, observer):
+        """Đăng ký hàm observer(loại sự kiện, id điểm đến), gọi cho mỗi sự kiện gắn với một điểm đến."""
+        self._observers.append(observer)
+
+    def _ensure_thread(self):
+        # Thread không tồn tại qua fork: mỗi worker tự khởi động thread ghi của mình
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='analytics-flush', daemon=True)
+            self._thread.start()
+
+    # --- Ghi xuống đĩa (thread nền) ---
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        if not self._db_ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+            self._db_ready = True
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            # Sau các lần ghi lỗi liên tiếp, chờ hết thời gian backoff rồi mới thử lại
+            if self._failures and time.monotonic() < self._retry_at and not self._stopping:
+                continue
+            self.flush()
+
+    def flush(self):
+        """Ghi toàn bộ buffer xuống SQLite. Trả về số sự kiện đã ghi."""
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self):
+        with self._lock:
+            if not self._buffer and not self._pending:
+                return 0
+            rows = list(self._buffer)
+            self._buffer.clear()
+            self._inflight, self._pending = self._pending, Counter()
+
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        'INSERT INTO events (ts, user_id, type, page, target, attraction_id) VALUES (?, ?, ?, ?, ?, ?)',
+                        rows,
+                    )
+                    conn.executemany(
+                        'INSERT INTO counters (key, count) VALUES (?, ?) '
+                        'ON CONFLICT(key) DO UPDATE SET count = count + excluded.count',
+                        self._inflight.items(),
+                    )
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            with self._lock:
+                self._failures += 1
+                self._retry_at = time.monotonic() + min(self.flush_interval * 2 ** self._failures, self.max_backoff)
+                self.stats['write_errors'] += 1
+                # Bỏ lô sự kiện thô nhưng giữ lại bộ đếm cho lần ghi sau, trừ khi đã lỗi quá nhiều lần
+                # liên tiếp (ví dụ đĩa chỉ đọc): khi đó bỏ luôn để bộ nhớ không tăng mãi
+                if self._failures < self.max_failures:
+                    self._pending.update(self._inflight)
+                else:
+                    self.stats['discarded_counts'] += sum(self._inflight.values())
+                self._inflight = Counter()
+                failures = self._failures
+            print(f"Warning: Could not write {len(rows)} analytics events to {self.db_path} "
+                  f"(attempt {failures}) - {e}")
+            return 0
+
+        with self._lock:
+            self._inflight = Counter()
+            self._failures = 0
+            self.stats['flushed'] += len(rows)
+        return len(rows)
+
+    def close(self):
+        """Dừng thread nền và ghi nốt phần còn lại trong buffer."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=5)
+        self.flush()
+
+    # --- Đọc số liệu ---
+    def counters(self):
+        """Bộ đếm tổng hợp: phần đã ghi trong SQLite cộng phần còn trong RAM."""
+        counts = Counter()
+        if os.path.exists(self.db_path):
+            try:
+                conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=10)
+                try:
+                    counts.update(dict(conn.execute('SELECT key, count FROM counters')))
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"Warning: Could not read analytics counters from {self.db_path} - {e}")
+        with self._lock:
+            counts.update(self._pending)
+            counts.update(self._inflight)
+            buffered = len(self._buffer)
+            stats = dict(self.stats, buffered=buffered)
+        grouped = _group_counters(counts)
+        grouped['ingestion'] = stats
+        return grouped
+
+
+analytics_service = AnalyticsService()
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from backend.app.core.json_stream import encode_json
+
+# Khóa nhận diện từng mục khi so sánh hai phiên bản: dùng `id` nếu có, nếu không dùng trường này
+DIFF_KEYS = {
+    'sections': 'title',
+    'attractions': 'id',
+    'gallery': 'url',
+}
+
+
+def _digest(obj):
+    return hashlib.sha256(encode_json(obj)).hexdigest()[:16]
+
+
+def _item_key(collection, item):
+    return item.get('id', item.get(DIFF_KEYS[collection]))
+
+
+def content_digests(content):
+    """
+    Dấu vân tay gọn của một phiên bản nội dung: hash của phần giới thiệu và danh sách
+    [khóa, hash] (giữ thứ tự) của từng mục. Chỉ cần chừng này để tính diff về sau,
+    không phải giữ lại toàn bộ nội dung cũ.
+    """
+    digests = {'about': _digest(content.get('about', {}))}
+    for collection in DIFF_KEYS:
+        digests[collection] = [
+            [_item_key(collection, item), _digest(item)] for item in content.get(collection, [])
+        ]
+    return digests
+
+
+def diff_content(old_digests, content):
+    """
+    Diff cấu trúc giữa phiên bản cũ (dấu vân tay) và nội dung hiện tại.
+    Với mỗi danh sách có thay đổi: `added`, `modified` (mục đầy đủ), `removed` (khóa)
+    và `order` (thứ tự khóa mới, chỉ khi thứ tự thay đổi).
+    """
+    changes = {}
+    about = content.get('about', {})
+    if old_digests.get('about') != _digest(about):
+        changes['about'] = about
+
+    for collection in DIFF_KEYS:
+        old_entries = old_digests.get(collection, [])
+        old = {json.dumps(key): digest for key, digest in old_entries}
+        items = content.get(collection, [])
+        keys = [_item_key(collection, item) for item in items]
+
+        added, modified = [], []
+        for key, item in zip(keys, items):
+            previous = old.pop(json.dumps(key), None)
+            if previous is None:
+                added.append(item)
+            elif previous != _digest(item):
+                modified.append(item)
+        removed = [json.loads(key) for key in old]
+
+        delta = {}
+        if added:
+            delta['added'] = added
+        if modified:
+            delta['modified'] = modified
+        if removed:
+            delta['removed'] = removed
+        if keys != [key for key, _ in old_entries]:
+            delta['order'] = keys
+        if delta:
+            changes[collection] = delta
+    return changes
+
+
+class ContentHistory:
+    """
+    Lịch sử ngắn các phiên bản nội dung (phiên bản -> dấu vân tay), cũ nhất bị loại trước.
+    Được lưu ra file (nếu có đường dẫn) để các tiến trình và lần khởi động sau dùng chung.
+    """
+
+    def __init__(self, path, max_versions):
+        self.path = path
+        self.max_versions = max_versions
+        self._versions = None
+        # mtime của file lúc đọc gần nhất: chỉ đọc lại khi tiến trình khác đã ghi thêm
+        self._loaded_mtime = None
+        self._lock = threading.Lock()
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self):
+        versions = OrderedDict()
+        if self.path:
+            self._loaded_mtime = self._file_mtime()
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for entry in json.load(f):
+                        versions[entry['version']] = entry['digests']
+            except FileNotFoundError:
+                pass
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Warning: Ignoring content history file {self.path} - {e}")
+        return versions
+
+    def _save(self):
+        if not self.path:
+            return
+        entries = [{'version': v, 'digests': d} for v, d in self._versions.items()]
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp, self.path)
+            self._loaded_mtime = self._file_mtime()
+        except OSError as e:
+            print(f"Warning: Could not save content history - {e}")
+
+    def get(self, version):
+        """Dấu vân tay của một phiên bản, None nếu phiên bản đã quá cũ hoặc không biết."""
+        with self._lock:
+            if self._versions is None:
+                self._versions = self._load()
+            digests = self._versions.get(version)
+            # Chưa biết phiên bản này: có thể tiến trình khác vừa ghi thêm vào file
+            if digests is None and self.path and self._file_mtime() != self._loaded_mtime:
+                merged = self._load()
+                for v, d in self._versions.items():
+                    merged.setdefault(v, d)
+                self._versions = merged
+                digests = merged.get(version)
+            return digests
+
+    def remember(self, version, digests_factory):
+        """Ghi nhận một phiên bản (digests_factory chỉ được gọi nếu phiên bản còn chưa có)."""
+        with self._lock:
+            if self._versions is None:
+                self._versions = self._load()
+            if version in self._versions:
+                return
+            # Đọc lại file để không ghi đè phiên bản do tiến trình khác vừa thêm
+            merged = self._load()
+            for v, d in self._versions.items():
+                merged.setdefault(v, d)
+            merged[version] = digests_factory()
+            self._versions = merged
+            while len(self._versions) > self.max_versions:
+                self._versions.popitem(last=False)
+            self._save()
@@ -1,60 +1,587 @@
+import hashlib
 import json
 import os
+import threading
+import time
 
-# Xác định đường dẫn tuyệt đối đến file content.json
+from werkzeug.datastructures import LanguageAccept
+from werkzeug.http import parse_accept_header
+
+from backend.app.core.config import settings
+from backend.app.core.json_stream import encode_json, iter_bytes_chunks, iter_json_chunks
+from backend.app.models.content import ContentSnapshot
+from backend.app.services.content_history import ContentHistory, content_digests, diff_content
+from backend.app.services.geo_index import GridIndex
+from backend.app.services.image_variant_service import image_variant_service
+from backend.app.services.popularity_ranking import popularity_ranking
+from backend.app.services.related_service import RelatedIndex, related_documents
+from backend.app.services.snapshot_file import (
+    CompiledSnapshot, SnapshotFormatError, snapshot_is_current, snapshot_lock, source_matches, source_signature,
+    write_snapshot,
+)
+
+# Đường dẫn tuyệt đối đến file content.json (mặc định backend/data/content.json)
 # Điều này đảm bảo service có thể chạy từ bất kỳ đâu
-_current_dir = os.path.dirname(os.path.abspath(__file__))
-_data_file = os.path.join(_current_dir, '..', '..', 'data', 'content.json')
+_data_file = settings.CONTENT_FILE
+_snapshot_file = settings.CONTENT_SNAPSHOT_FILE
+
+# Dữ liệu mỗi trang cần: (tên trường trong JSON, tên payload)
+PAGE_PAYLOADS = {
+    'home': (('about', 'about'), ('sections', 'sections'), ('attractions', 'featured')),
+    'attractions': (('attractions', 'attractions'),),
+    'gallery': (('gallery', 'gallery'),),
+}
+
+# Các payload được mã hóa sẵn và lưu trong snapshot biên dịch
+PAYLOAD_NAMES = ('content', 'about', 'sections', 'attractions', 'featured', 'gallery')
+
+# Payload phụ thuộc bảng xếp hạng phổ biến (FEATURED_MODE=popular): tên thực sự có dạng
+# '<tên>@<hash danh sách id>' nên ETag đổi khi thứ tự top thay đổi và giống nhau ở mọi worker
+RANKED_PAYLOADS = ('featured', 'page:home')
 
 class ContentService:
     """
     Lớp dịch vụ để xử lý tất cả các logic liên quan đến nội dung.
     """
 
-    def __init__(self, data_path=_data_file):
+    def __init__(self, data_path=_data_file, variants=image_variant_service,
+                 precompute_payloads=settings.CONTENT_PRECOMPUTE_PAYLOADS, snapshot_path=_snapshot_file,
+                 shared=settings.CONTENT_SHARED_SNAPSHOT, reload_interval=settings.CONTENT_RELOAD_INTERVAL,
+                 history=None, ranking=popularity_ranking, related=None, static_srcset=False):
+        """
+        Khởi tạo service và tải dữ liệu.
+        Ưu tiên snapshot đã biên dịch (mmap, rất nhanh) nếu nó còn khớp với content.json,
+        nếu không thì tải và kiểm tra dữ liệu từ file JSON.
+        Ở chế độ chia sẻ (`shared`), snapshot luôn được biên dịch nếu thiếu hoặc cũ để mọi
+        payload nằm trong một file mmap dùng chung giữa các worker.
+        `static_srcset` (bản xuất tĩnh): srcset trỏ tới file phiên bản ảnh thay vì query ?w=.
+        """
+        self._variants = variants
+        self._static_srcset = static_srcset
+        self._precompute_payloads = precompute_payloads
+        self._data_path = data_path
+        self._snapshot_path = snapshot_path
+        self._shared = bool(shared and snapshot_path)
+        self._reload_interval = reload_interval
+        self._reload_lock = threading.Lock()
+        self._last_reload_check = time.monotonic()
+        self._history = history or ContentHistory(settings.CONTENT_HISTORY_FILE, settings.CONTENT_HISTORY_SIZE)
+        self.ranking = ranking
+        self._ranked_featured = None
+        # Chỉ mục TF-IDF được giữ qua các lần tải lại để chỉ tính lại các mục thay đổi
+        self._related = related or RelatedIndex()
+        self._related_table = None
+        self._geo_index = None
+        self._attractions_by_id = None
+        self._payloads = {}
+        self._compiled = None
+        self._snapshot = None
+
+        started = time.perf_counter()
+        self._load()
+        self.load_seconds = time.perf_counter() - started
+
+    def _load(self):
+        compiled = self._open_compiled() if self._snapshot_path else None
+        if compiled is not None:
+            version, snapshot, load_source = compiled.version, None, 'snapshot'
+            source_digest = (compiled.source or {}).get('sha256')
+        else:
+            source_digest, snapshot = self._read_json()
+            version, load_source = source_digest[:16], 'json'
+        # Thay toàn bộ trạng thái cùng lúc; request đang chạy vẫn đọc được mmap cũ cho tới khi xong
+        self._compiled, self._snapshot, self._payloads = compiled, snapshot, {}
+        self._ranked_featured = None
+        self._related_table = None
+        self._geo_index = None
+        self._attractions_by_id = None
+        self._version = version
+        # sha256 đầy đủ của content.json đã tải, ghi vào header khi biên dịch snapshot
+        self._source_digest = source_digest
+        self.load_source = load_source
+        self._signature = self._files_signature()
+        # Mỗi phiên bản được ghi vào lịch sử ngay khi tải, để client đang giữ nó nhận được diff
+        # kể cả khi phiên bản bị thay thế trước khi có ai gọi /api/changes
+        self.remember_version()
+
+    def _open_compiled(self):
+        """Mở snapshot biên dịch nếu có. Trả về None nếu không có, hỏng hoặc đã cũ."""
+        if self._shared:
+            self._ensure_compiled()
+        if not os.path.exists(self._snapshot_path):
+            return None
+        try:
+            compiled = CompiledSnapshot(self._snapshot_path)
+        except (OSError, SnapshotFormatError) as e:
+            print(f"Warning: Ignoring content snapshot - {e}")
+            return None
+
+        if not source_matches(compiled.source, self._data_path):
+            print(f"Warning: Content snapshot {self._snapshot_path} was compiled from different content than {self._data_path}, loading JSON instead")
+            compiled.close()
+            return None
+        return compiled
+
+    def _ensure_compiled(self):
         """
-        Khởi tạo service và tải dữ liệu từ file JSON.
+        Chế độ chia sẻ: biên dịch lại snapshot nếu thiếu hoặc cũ hơn content.json.
+        Khóa file đảm bảo chỉ một tiến trình biên dịch, các tiến trình khác chờ rồi dùng kết quả.
         """
+        if snapshot_is_current(self._snapshot_path, self._data_path):
+            return
+        with snapshot_lock(self._snapshot_path):
+            if snapshot_is_current(self._snapshot_path, self._data_path):
+                return
+            try:
+                builder = ContentService(self._data_path, variants=self._variants, snapshot_path=None, shared=False,
+                                         history=self._history, ranking=None, related=self._related)
+                builder.compile_snapshot(self._snapshot_path, self._data_path)
+            except OSError as e:
+                print(f"Warning: Could not compile content snapshot - {e}")
+
+    def _read_json(self):
+        raw = b''
         try:
-            with open(data_path, 'r', encoding='utf-8') as f:
-                self._data = json.load(f)
+            with open(self._data_path, 'rb') as f:
+                raw = f.read()
+            data = json.loads(raw.decode('utf-8'))
         except FileNotFoundError:
-            print(f"Error: Data file not found at {data_path}")
-            self._data = {}
-        except json.JSONDecodeError:
-            print(f"Error: Could not decode JSON from {data_path}")
-            self._data = {}
+            print(f"Error: Data file not found at {self._data_path}")
+            data = {}
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            print(f"Error: Could not decode JSON from {self._data_path}")
+            data = {}
+        # Phiên bản nội dung (16 ký tự đầu): hash của file nguồn, dùng làm ETag và khóa cache
+        return hashlib.sha256(raw).hexdigest(), self._build_snapshot(data)
+
+    # --- Reloading ---
+    def _files_signature(self):
+        """Dấu hiệu thay đổi của content.json và file snapshot (inode, mtime, kích thước)."""
+        snapshot_id = None
+        if self._snapshot_path:
+            try:
+                st = os.stat(self._snapshot_path)
+                snapshot_id = (st.st_ino, st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                pass
+        return source_signature(self._data_path), snapshot_id
+
+    def reload(self):
+        """
+        Tải lại nội dung nếu content.json hoặc file snapshot đã thay đổi.
+        Trả về True nếu đã tải lại.
+        """
+        with self._reload_lock:
+            if self._files_signature() == self._signature:
+                return False
+            self._load()
+            return True
+
+    def maybe_reload(self):
+        """
+        Gọi ở mỗi request: kiểm tra thay đổi tối đa một lần mỗi `reload_interval` giây,
+        nên chi phí chỉ là hai lệnh stat. Mỗi worker tự ánh xạ lại snapshot mới.
+        """
+        now = time.monotonic()
+        if now - self._last_reload_check < self._reload_interval:
+            return False
+        self._last_reload_check = now
+        return self.reload()
+
+    def reload_due(self):
+        """True nếu lần gọi maybe_reload() tiếp theo sẽ thực sự kiểm tra file (có thể tải lại)."""
+        return time.monotonic() - self._last_reload_check >= self._reload_interval
+
+    def _build_snapshot(self, data):
+        """
+        Kiểm tra dữ liệu và chuyển thành ContentSnapshot ngay khi tải,
+        để request không phải xử lý lại dictionary thô.
+        """
+        self._attach_srcsets(data)
+        snapshot = ContentSnapshot.from_dict(data)
+        for error in snapshot.errors:
+            print(f"Warning: Invalid content skipped - {error}")
+        if snapshot.errors:
+            print(f"Warning: {len(snapshot.errors)} invalid content item(s) skipped in {self._data_path}")
+        return snapshot
+
+    def _attach_srcsets(self, data):
+        """
+        Gắn sẵn chuỗi srcset (các phiên bản ảnh thu nhỏ) vào từng mục khi tải dữ liệu,
+        để frontend chọn ảnh vừa với màn hình mà không phải tính lại ở mỗi request.
+        """
+        if not isinstance(data, dict):
+            return
+        for key, url_field, srcset_field in (
+            ('sections', 'imageUrl', 'imageSrcset'),
+            ('attractions', 'imageUrl', 'imageSrcset'),
+            ('gallery', 'url', 'srcset'),
+        ):
+            items = data.get(key)
+            for item in items if isinstance(items, list) else []:
+                if not isinstance(item, dict) or not isinstance(item.get(url_field), str):
+                    continue
+                srcset = self.get_srcset(item[url_field])
+                if srcset:
+                    item[srcset_field] = srcset
+
+    @property
+    def snapshot(self):
+        """
+        Snapshot nội dung hiện tại (các model bất biến đã kiểm tra).
+        Khi tải từ snapshot biên dịch, các model chỉ được dựng ở lần truy cập đầu tiên.
+        """
+        if self._snapshot is None:
+            data = json.loads(bytes(self._compiled.blob('data')))
+            self._snapshot = ContentSnapshot.from_dict(data)
+        return self._snapshot
+
+    @property
+    def version(self):
+        """Phiên bản của nội dung hiện tại (hash ngắn của content.json)."""
+        return self._version
+
+    # --- Encoded Payloads ---
+    def _payload_source(self, name):
+        snapshot = self.snapshot
+        return {
+            'content': snapshot.full_dict,
+            'about': snapshot.about,
+            'sections': snapshot.sections_dicts,
+            'attractions': snapshot.attractions_dicts,
+            'featured': snapshot.featured_dicts,
+            'gallery': snapshot.gallery_dicts,
+        }[name]
+
+    def _payload_buffer(self, name):
+        """Payload dạng bytes-like: memoryview trên mmap nếu có snapshot biên dịch, nếu không là bytes."""
+        if self._compiled is not None and name in self._compiled:
+            return self._compiled.blob(name)
+        payload = self._payloads.get(name)
+        if payload is None:
+            if '@' in name:
+                payload = self._compose_ranked_payload(name)
+            elif name.startswith('page:'):
+                payload = self._compose_page_payload(name[len('page:'):])
+            elif name.startswith('changes:'):
+                payload = self._compose_changes_payload(name[len('changes:'):])
+            elif name.startswith('related:'):
+                payload = encode_json(self.related_table()[name[len('related:'):]])
+            else:
+                payload = encode_json(self._payload_source(name))
+            self._payloads[name] = payload
+        return payload
+
+    def get_payload(self, name):
+        """
+        Lấy JSON đã mã hóa sẵn (bytes) của một endpoint: content, about, sections,
+        attractions, featured hoặc gallery. Chỉ mã hóa một lần cho mỗi phiên bản nội dung.
+        """
+        return bytes(self._payload_buffer(name))
+
+    def payload_length(self, name):
+        """Độ dài payload nếu đã được mã hóa sẵn, None nếu đang ở chế độ mã hóa từng phần."""
+        if self._compiled is None and not self._precompute_payloads:
+            return None
+        return len(self._payload_buffer(name))
+
+    def iter_payload_chunks(self, name, chunk_size):
+        """
+        Trả về payload JSON theo từng khối để response được stream ngay lập tức.
+        Mặc định phát lại các khối của payload đã mã hóa sẵn (hoặc đọc thẳng từ mmap);
+        khi tắt CONTENT_PRECOMPUTE_PAYLOADS thì mã hóa từng phần ở mỗi request.
+        """
+        # Payload của trang và diff được ghép sẵn dạng bytes, luôn phát lại từ bộ nhớ
+        if self._compiled is not None or self._precompute_payloads or name.startswith(('page:', 'changes:', 'related:')):
+            return iter_bytes_chunks(self._payload_buffer(name), chunk_size)
+        return iter_json_chunks(self._payload_source(name), chunk_size)
+
+    def _compose_page_payload(self, page, ranking_key=None):
+        parts = [
+            encode_json(field) + b':' + self.get_payload(
+                f"{name}@{ranking_key}" if ranking_key is not None and name in RANKED_PAYLOADS else name
+            )
+            for field, name in PAGE_PAYLOADS[page]
+        ]
+        return b'{' + b','.join(parts) + b'}'
+
+    def get_page_payload(self, page):
+        """
+        JSON chứa đúng những phần dữ liệu một trang cần (xem PAGE_PAYLOADS), được ghép
+        trực tiếp từ các payload đã mã hóa sẵn, không serialize lại.
+        """
+        return self.get_payload(self.payload_name(f"page:{page}"))
+
+    # --- Popularity Ranking ---
+    def payload_name(self, name):
+        """
+        Tên payload thực sự phục vụ cho một endpoint. Khi bật xếp hạng phổ biến, payload
+        featured và trang chủ gắn thêm hash của danh sách id đang được phục vụ (và do đó cả ETag):
+        cùng một danh sách luôn có cùng ETag, ở mọi worker và sau khi khởi động lại.
+        """
+        if self.ranking is None or name not in RANKED_PAYLOADS:
+            return name
+        return f"{name}@{self._popular_attractions()[1]}"
+
+    def _compose_ranked_payload(self, name):
+        base, _, ranking_key = name.partition('@')
+        # Chỉ giữ payload của bảng xếp hạng mới nhất
+        for old in [key for key in list(self._payloads) if '@' in key and not key.endswith(f"@{ranking_key}")]:
+            self._payloads.pop(old, None)
+        if base == 'featured':
+            return encode_json(self.get_featured_attractions())
+        return self._compose_page_payload(base[len('page:'):], ranking_key)
+
+    def _popular_attractions(self):
+        """
+        (top điểm đến theo bảng xếp hạng, hash ngắn của danh sách id), tính lại một lần cho mỗi
+        (phiên bản nội dung, thế hệ). Khi chưa đủ dữ liệu, bổ sung bằng các điểm có cờ featured
+        rồi tới các điểm còn lại.
+        """
+        generation, ids = self.ranking.current
+        cached = self._ranked_featured
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+
+        attractions = self.snapshot.attractions_dicts
+        by_id = {str(item['id']): item for item in attractions}
+        ranked = [by_id[key] for key in ids if key in by_id]
+        chosen = {str(item['id']) for item in ranked}
+        for item in self.snapshot.featured_dicts + attractions:
+            if len(ranked) >= self.ranking.top_n:
+                break
+            if str(item['id']) not in chosen:
+                ranked.append(item)
+                chosen.add(str(item['id']))
+        ranked = ranked[:self.ranking.top_n]
+        key = hashlib.sha256('\x1f'.join(str(item['id']) for item in ranked).encode('utf-8')).hexdigest()[:12]
+        self._ranked_featured = (generation, (ranked, key))
+        return ranked, key
+
+    # --- Related Places ---
+    def _compute_related_table(self):
+        documents = related_documents(self.snapshot)
+        self._related.update([(key, text) for key, _, text in documents])
+        summaries = {key: summary for key, summary, _ in documents}
+        attraction_keys = [key for key in summaries if key[0] == 'attraction']
+        neighbors = self._related.neighbors(attraction_keys)
+        return {
+            key[1]: [dict(summaries[other], score=score) for other, score in neighbors.get(key, [])]
+            for key in attraction_keys
+        }
+
+    def related_table(self):
+        """
+        {id điểm đến: [mục liên quan kèm điểm tương đồng]}, tính một lần cho mỗi phiên bản nội dung:
+        đọc sẵn từ snapshot biên dịch nếu có, nếu không thì tính từ chỉ mục TF-IDF (cần NumPy).
+        """
+        table = self._related_table
+        if table is None:
+            if self._compiled is not None and 'related' in self._compiled:
+                table = json.loads(bytes(self._compiled.blob('related')))
+            else:
+                table = self._compute_related_table()
+            self._related_table = table
+        return table
+
+    def related_payload_name(self, attraction_id):
+        """Tên payload của /api/attractions/<id>/related, None nếu không có điểm đến này."""
+        if str(attraction_id) not in self.related_table():
+            return None
+        return f"related:{attraction_id}"
+
+    # --- Nearby Places ---
+    @property
+    def geo_index(self):
+        """Chỉ mục lưới của các điểm đến có tọa độ, dựng một lần cho mỗi phiên bản nội dung."""
+        index = self._geo_index
+        if index is None:
+            snapshot = self.snapshot
+            index = GridIndex(
+                (place.location[0], place.location[1], item)
+                for place, item in zip(snapshot.attractions, snapshot.attractions_dicts)
+                if place.location is not None
+            )
+            self._geo_index = index
+        return index
+
+    def get_attraction(self, attraction_id):
+        """Điểm đến theo id (so sánh dạng chuỗi), None nếu không có."""
+        by_id = self._attractions_by_id
+        if by_id is None:
+            by_id = {str(item['id']): item for item in self.snapshot.attractions_dicts}
+            self._attractions_by_id = by_id
+        return by_id.get(str(attraction_id))
+
+    def nearby_attractions(self, lat, lon, radius_km, limit, exclude_id=None):
+        """Tối đa `limit` điểm đến trong bán kính `radius_km`, gần nhất trước, mỗi mục kèm distanceKm."""
+        exclude = self.get_attraction(exclude_id) if exclude_id is not None else None
+        return [
+            dict(item, distanceKm=round(distance, 3))
+            for distance, item in self.geo_index.nearby(lat, lon, radius_km, limit, exclude)
+        ]
+
+    # --- Version History ---
+    def remember_version(self):
+        """Ghi phiên bản hiện tại vào lịch sử (để sau này tính diff từ phiên bản này)."""
+        self._history.remember(self._version, lambda: content_digests(self.snapshot.full_dict))
+
+    def changes_payload_name(self, since):
+        """
+        Tên payload cho /api/changes?since=<since>: diff nếu phiên bản `since` còn trong
+        lịch sử, nếu không là 'changes:*' (toàn bộ nội dung).
+        """
+        if since and (since == self._version or self._history.get(since) is not None):
+            return f"changes:{since}"
+        return 'changes:*'
+
+    def _compose_changes_payload(self, since):
+        old = None if since == '*' else self._history.get(since)
+        if old is None:
+            # Lịch sử không còn phiên bản này: gửi toàn bộ nội dung, ghép từ payload đã mã hóa
+            head = encode_json({'version': self._version, 'full': True})
+            return head[:-1] + b',"content":' + self.get_payload('content') + b'}'
+        changes = {} if since == self._version else diff_content(old, self.snapshot.full_dict)
+        return encode_json({'version': self._version, 'since': since, 'full': False, 'changes': changes})
+
+    # --- Compiled Snapshot ---
+    def compile_snapshot(self, path=_snapshot_file, data_path=_data_file):
+        """
+        Biên dịch nội dung hiện tại thành file snapshot nhị phân: dữ liệu đã kiểm tra
+        (kèm srcset) và toàn bộ payload JSON đã mã hóa sẵn của API và các trang.
+        """
+        blobs = {'data': encode_json(self.snapshot.full_dict)}
+        for name in PAYLOAD_NAMES:
+            blobs[name] = self.get_payload(name)
+        for page in PAGE_PAYLOADS:
+            blobs[f"page:{page}"] = self.get_payload(f"page:{page}")
+        # Bảng gợi ý chỉ được lưu khi tính được (có NumPy); nếu không, server tự tính khi cần
+        if self._related.available:
+            blobs['related'] = encode_json(self.related_table())
+        source = source_signature(data_path)
+        if source is not None and self._source_digest:
+            source['sha256'] = self._source_digest
+        write_snapshot(path, self.version, blobs, source=source)
+        return path
+
+    def get_srcset(self, image_url):
+        """
+        Lấy chuỗi srcset cho một ảnh trong thư mục data (None nếu không có phiên bản).
+        """
+        return self._variants.srcset(image_url, static=self._static_srcset)
 
     def get_about_content(self):
         """
         Lấy nội dung giới thiệu.
         """
-        return self._data.get('about', {})
+        return self.snapshot.about
 
     def get_full_content(self):
         """
         Lấy toàn bộ dữ liệu.
         """
-        return self._data
+        return self.snapshot.full_dict
 
     def get_all_attractions(self):
         """
         Lấy tất cả các điểm đến.
         """
-        return self._data.get('attractions', [])
+        return self.snapshot.attractions_dicts
 
     def get_featured_attractions(self):
         """
-        Lọc và lấy các điểm đến được đánh dấu là nổi bật (featured).
+        Lấy các điểm đến được đánh dấu là nổi bật (featured), đã lọc sẵn khi tải dữ liệu.
+        Khi bật FEATURED_MODE=popular: top điểm đến theo lượt xem/click gần đây.
         """
-        all_attractions = self.get_all_attractions()
-        return [attr for attr in all_attractions if attr.get('featured', False)]
+        if self.ranking is not None:
+            return self._popular_attractions()[0]
+        return self.snapshot.featured_dicts
 
     def get_gallery_items(self):
         """
         Lấy tất cả các mục trong thư viện ảnh.
         """
-        return self._data.get('gallery', [])
+        return self.snapshot.gallery_dicts
+
+def locale_file(path, locale):
+    """Đường dẫn file của một ngôn ngữ: content.json -> content.en.json (ngôn ngữ mặc định giữ nguyên)."""
+    if not path or locale == settings.DEFAULT_LOCALE:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{locale}{ext}"
+
+
+class LocalizedContent:
+    """
+    Một ContentService cho mỗi ngôn ngữ có bản dịch (content.<ngôn ngữ>.json), mỗi service
+    có snapshot biên dịch và payload mã hóa sẵn riêng. Service của một ngôn ngữ chỉ được
+    tạo ở request đầu tiên cần nó; ngôn ngữ chưa có bản dịch dùng nội dung mặc định.
+    """
+
+    def __init__(self, default_service, data_path=_data_file, snapshot_path=_snapshot_file,
+                 locales=settings.CONTENT_LOCALES, default_locale=settings.DEFAULT_LOCALE):
+        self._data_path = data_path
+        self._snapshot_path = snapshot_path
+        self.locales = tuple(locales)
+        self.default_locale = default_locale
+        self._default = default_service
+        self._services = {default_locale: default_service}
+        self._lock = threading.Lock()
+
+    def negotiate(self, lang=None, accept_language=None):
+        """Chọn ngôn ngữ: ?lang= nếu được hỗ trợ, nếu không theo header Accept-Language."""
+        if lang in self.locales:
+            return lang
+        if accept_language:
+            accept = parse_accept_header(accept_language, LanguageAccept)
+            return accept.best_match(self.locales, default=self.default_locale)
+        return self.default_locale
+
+    def get(self, locale):
+        """Trả về (ngôn ngữ thực sự được phục vụ, ContentService)."""
+        service = self._services.get(locale)
+        if service is not None:
+            return locale, service
+        data_path = locale_file(self._data_path, locale)
+        if locale not in self.locales or not os.path.exists(data_path):
+            return self.default_locale, self._default
+        with self._lock:
+            service = self._services.get(locale)
+            if service is None:
+                # Mỗi ngôn ngữ có lịch sử phiên bản riêng: diff của /api/changes không lẫn giữa các bản dịch
+                history = ContentHistory(locale_file(settings.CONTENT_HISTORY_FILE, locale), settings.CONTENT_HISTORY_SIZE)
+                service = ContentService(data_path, snapshot_path=locale_file(self._snapshot_path, locale),
+                                         history=history, ranking=self._default.ranking)
+                self._services[locale] = service
+        return locale, service
+
+    def resolve(self, lang=None, accept_language=None):
+        return self.get(self.negotiate(lang, accept_language))
+
+    def preload(self):
+        """Tải trước mọi ngôn ngữ có bản dịch (chế độ pre-fork: dùng chung bộ nhớ giữa các worker)."""
+        for locale in self.locales:
+            service = self.get(locale)[1]
+            service.snapshot
+            service.related_table()
+            service.geo_index
+
+    def maybe_reload(self):
+        for service in list(self._services.values()):
+            service.maybe_reload()
+
+    def reload_due(self):
+        return any(service.reload_due() for service in list(self._services.values()))
+
 
 # Tạo một instance của service để có thể import và sử dụng ở nơi khác
 content_service = ContentService()
+localized_content = LocalizedContent(content_service)
+
+if __name__ == '__main__':
+    # Biên dịch snapshot: python -m backend.app.services.content_service
+    service = ContentService(snapshot_path=None)
+    started = time.perf_counter()
+    output = service.compile_snapshot()
+    print(f"Đã biên dịch snapshot nội dung (phiên bản {service.version}) vào {output} "
+          f"trong {(time.perf_counter() - started) * 1000:.1f} ms")
@@ -0,0 +1,71 @@
+import heapq
+import math
+
+from backend.app.core.config import settings
+
+EARTH_RADIUS_KM = 6371.0088
+# Số km trên một độ vĩ (gần như không đổi)
+_KM_PER_DEG_LAT = 110.574
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Khoảng cách đường tròn lớn (km) giữa hai tọa độ."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex:
+    """
+    Chỉ mục lưới không gian của các điểm (lat, lon, giá trị), dựng một lần cho mỗi phiên bản nội dung.
+
+    Tọa độ được chiếu phẳng (equirectangular) quanh vĩ độ trung bình rồi chia vào các ô
+    `cell_km` x `cell_km`; một truy vấn chỉ duyệt các ô giao với hình vuông bao quanh bán kính
+    và tính khoảng cách thật (haversine) cho các điểm trong đó.
+    """
+
+    def __init__(self, points, cell_km=settings.NEARBY_GRID_CELL_KM):
+        self.cell_km = cell_km
+        self._points = list(points)
+        ref_lat = sum(lat for lat, _, _ in self._points) / len(self._points) if self._points else 0.0
+        self._km_per_deg_lon = max(111.320 * math.cos(math.radians(ref_lat)), 1e-6)
+        self._cells = {}
+        for point in self._points:
+            self._cells.setdefault(self._cell(point[0], point[1]), []).append(point)
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cell(self, lat, lon):
+        return (math.floor(lon * self._km_per_deg_lon / self.cell_km),
+                math.floor(lat * _KM_PER_DEG_LAT / self.cell_km))
+
+    def _candidates(self, lat, lon, radius_km):
+        cx, cy = self._cell(lat, lon)
+        # Thêm một ô dự phòng cho sai số của phép chiếu phẳng
+        span = math.ceil(radius_km / self.cell_km) + 1
+        if (2 * span + 1) ** 2 >= len(self._cells):
+            return self._points
+        candidates = []
+        for x in range(cx - span, cx + span + 1):
+            for y in range(cy - span, cy + span + 1):
+                cell = self._cells.get((x, y))
+                if cell:
+                    candidates.extend(cell)
+        return candidates
+
+    def nearby(self, lat, lon, radius_km, limit, exclude=None):
+        """
+        Tối đa `limit` điểm gần nhất trong bán kính `radius_km`: [(khoảng cách km, giá trị)],
+        sắp xếp theo khoảng cách tăng dần. Bỏ qua điểm có giá trị là chính `exclude` (ví dụ điểm tâm).
+        """
+        found = []
+        for point_lat, point_lon, value in self._candidates(lat, lon, radius_km):
+            if value is exclude:
+                continue
+            distance = haversine_km(lat, lon, point_lat, point_lon)
+            if distance <= radius_km:
+                found.append((distance, value))
+        return heapq.nsmallest(limit, found, key=lambda item: item[0])
@@ -0,0 +1,306 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from backend.app.core.config import settings
+
+# Pillow là thư viện tùy chọn: nếu chưa cài, mọi ảnh được phục vụ ở kích thước gốc.
+# Pillow chỉ được import ở lần dùng đầu tiên để không làm chậm lúc khởi động
+# (khi tải từ snapshot biên dịch, srcset đã có sẵn nên không cần Pillow).
+_pillow = None
+
+
+def _load_pillow():
+    """Trả về (Image, ImageOps, features) của Pillow, hoặc None nếu chưa cài."""
+    global _pillow
+    if _pillow is None:
+        try:
+            from PIL import Image, ImageOps, features
+            _pillow = (Image, ImageOps, features)
+        except ImportError:  # pragma: no cover - phụ thuộc môi trường
+            _pillow = False
+    return _pillow or None
+
+
+def _image_errors():
+    """Lỗi khi đọc một ảnh hỏng hoặc quá lớn (DecompressionBombError của Pillow không phải OSError)."""
+    pillow = _load_pillow()
+    return (OSError, pillow[0].DecompressionBombError) if pillow else (OSError,)
+
+# Định dạng đầu ra theo thứ tự ưu tiên (nén tốt nhất trước)
+_FORMATS = {
+    'avif': ('AVIF', 'image/avif', '.avif'),
+    'webp': ('WEBP', 'image/webp', '.webp'),
+    'jpeg': ('JPEG', 'image/jpeg', '.jpg'),
+}
+
+_SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+# Thư mục (trong data/) chứa các phiên bản ảnh của bản xuất tĩnh: host tĩnh bỏ qua query ?w=,
+# nên mỗi phiên bản phải có URL riêng theo đường dẫn
+STATIC_VARIANT_DIR = 'variants'
+
+
+def _format_available(fmt):
+    pillow = _load_pillow()
+    if pillow is None:
+        return False
+    if fmt == 'jpeg':
+        return True
+    try:
+        return bool(pillow[2].check(fmt))
+    except (ValueError, AttributeError):
+        return False
+
+
+class ImageVariantService:
+    """
+    Dịch vụ tạo các phiên bản ảnh đã thu nhỏ và nén lại (JPEG/WebP/AVIF).
+
+    Mỗi phiên bản được tạo một lần (khi build hoặc ở request đầu tiên) rồi lưu vào
+    thư mục cache trên đĩa. Cache hoạt động theo LRU: khi tổng dung lượng vượt
+    ngưỡng, các phiên bản ít được dùng nhất sẽ bị xóa.
+    """
+
+    def __init__(self, data_dir, cache_dir, widths, quality, max_cache_bytes):
+        self.data_dir = os.path.abspath(data_dir)
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.widths = tuple(sorted(widths))
+        self.quality = quality
+        self.max_cache_bytes = max_cache_bytes
+        self._formats = None
+        self._lru = OrderedDict()
+        self._cache_bytes = 0
+        self._dimensions = {}
+        self._lock = threading.Lock()
+        self._load_cache_state()
+
+    @property
+    def enabled(self):
+        return _load_pillow() is not None
+
+    @property
+    def formats(self):
+        """Các định dạng đầu ra mà bản Pillow hiện tại hỗ trợ (kiểm tra ở lần dùng đầu)."""
+        if self._formats is None:
+            self._formats = [fmt for fmt in _FORMATS if _format_available(fmt)]
+        return self._formats
+
+    # --- Cache bookkeeping ---
+    def _load_cache_state(self):
+        """Nạp danh sách phiên bản đã có trên đĩa, cũ nhất đứng đầu hàng đợi LRU."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            st = os.stat(path)
+            entries.append((st.st_mtime, name, st.st_size))
+        for _, name, size in sorted(entries):
+            self._lru[name] = size
+            self._cache_bytes += size
+
+    def _touch(self, name, size=None):
+        with self._lock:
+            if size is not None:
+                self._cache_bytes += size - self._lru.get(name, 0)
+                self._lru[name] = size
+            self._lru.move_to_end(name)
+            while self._cache_bytes > self.max_cache_bytes and len(self._lru) > 1:
+                old_name, old_size = self._lru.popitem(last=False)
+                self._cache_bytes -= old_size
+                try:
+                    os.remove(os.path.join(self.cache_dir, old_name))
+                except FileNotFoundError:
+                    pass
+
+    # --- Helpers ---
+    def source_path(self, image_url):
+        """
+        Chuyển imageUrl trong content.json (images/x.jpg hoặc /data/images/x.jpg)
+        thành đường dẫn tương đối trong thư mục data. Trả về None với data URI / URL ngoài.
+        """
+        if not image_url or image_url.startswith(('data:', 'http://', 'https://')):
+            return None
+        rel_path = image_url.lstrip('/')
+        if rel_path.startswith('data/'):
+            rel_path = rel_path[len('data/'):]
+        if not rel_path.lower().endswith(_SOURCE_EXTENSIONS):
+            return None
+        return rel_path
+
+    def dimensions(self, rel_path):
+        """
+        Kích thước (rộng, cao) của ảnh gốc, chỉ đọc header của file. Cache theo (kích thước
+        file, mtime) nên ảnh bị thay bằng file khác cùng tên được đọc lại.
+        """
+        path = os.path.join(self.data_dir, rel_path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._dimensions.pop(rel_path, None)
+            return None
+        stamp = (st.st_size, st.st_mtime_ns)
+        cached = self._dimensions.get(rel_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        pillow = _load_pillow()
+        size = None
+        if pillow is not None:
+            try:
+                with pillow[0].open(path) as im:
+                    size = im.size
+            except _image_errors():
+                size = None
+        self._dimensions[rel_path] = (stamp, size)
+        return size
+
+    def widths_for(self, rel_path):
+        """Các mức chiều rộng nhỏ hơn ảnh gốc (không bao giờ phóng to ảnh)."""
+        size = self.dimensions(rel_path) if self.enabled else None
+        if size is None:
+            return []
+        return [w for w in self.widths if w < size[0]]
+
+    def snap_width(self, width):
+        """Làm tròn chiều rộng yêu cầu lên mức gần nhất được hỗ trợ, tránh tạo vô số phiên bản."""
+        for w in self.widths:
+            if width <= w:
+                return w
+        return self.widths[-1]
+
+    def negotiate_format(self, accept_mimetypes, requested=None):
+        """Chọn định dạng: theo tham số `fm` nếu có, nếu không thì theo header Accept."""
+        if requested in self.formats:
+            return requested
+        for fmt in self.formats:
+            if fmt == 'jpeg' or accept_mimetypes[_FORMATS[fmt][1]]:
+                return fmt
+        return 'jpeg'
+
+    def srcset_widths(self, rel_path):
+        """Các chiều rộng xuất hiện trong srcset của một ảnh ([] nếu không có phiên bản nào)."""
+        widths = self.widths_for(rel_path)
+        if not widths:
+            return []
+        # Thêm mức cuối bằng chiều rộng gốc (ảnh gốc được nén lại, không phóng to), nhưng không vượt
+        # mức lớn nhất: phiên bản lớn nhất được tạo chỉ rộng tới đó, không được khai báo rộng hơn
+        last = min(self.dimensions(rel_path)[0], self.widths[-1])
+        if last not in widths:
+            widths.append(last)
+        return widths
+
+    @property
+    def static_format(self):
+        """Định dạng phiên bản ảnh của bản xuất tĩnh (host tĩnh không chọn theo header Accept)."""
+        return 'webp' if 'webp' in self.formats else 'jpeg'
+
+    def static_variant_path(self, rel_path, width):
+        """Đường dẫn (trong data/) của một phiên bản ở bản xuất tĩnh: variants/images/x-320.webp."""
+        stem = os.path.splitext(rel_path)[0]
+        return f"{STATIC_VARIANT_DIR}/{stem}-{width}{_FORMATS[self.static_format][2]}"
+
+    def srcset(self, image_url, static=False):
+        """
+        Chuỗi srcset cho một ảnh, ví dụ: "/data/images/x.jpg?w=320 320w, ...", hoặc với
+        `static` (bản xuất tĩnh): "/data/variants/images/x-320.webp 320w, ...".
+        Trả về None nếu ảnh không có phiên bản nào.
+        """
+        rel_path = self.source_path(image_url)
+        if rel_path is None:
+            return None
+        widths = self.srcset_widths(rel_path)
+        if not widths:
+            return None
+        if static:
+            return ', '.join(f"/data/{self.static_variant_path(rel_path, w)} {w}w" for w in widths)
+        return ', '.join(f"/data/{rel_path}?w={w} {w}w" for w in widths)
+
+    # --- Generation ---
+    def _variant_name(self, rel_path, width, fmt):
+        st = os.stat(os.path.join(self.data_dir, rel_path))
+        key = f"{rel_path}|{st.st_size}|{st.st_mtime_ns}|{width}|{fmt}|{self.quality[fmt]}"
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+        stem = os.path.splitext(os.path.basename(rel_path))[0]
+        return f"{stem}.{width}w.{digest}{_FORMATS[fmt][2]}"
+
+    def get_variant(self, rel_path, width, fmt):
+        """
+        Trả về (đường dẫn file, mimetype, tên phiên bản) của phiên bản ảnh, tạo mới nếu chưa có.
+        Trả về None nếu không thể tạo (thiếu Pillow, ảnh lỗi, thư mục chỉ đọc...).
+        """
+        if not self.enabled or fmt not in self.formats:
+            return None
+        try:
+            name = self._variant_name(rel_path, width, fmt)
+        except FileNotFoundError:
+            return None
+
+        path = os.path.join(self.cache_dir, name)
+        if name in self._lru and os.path.exists(path):
+            self._touch(name)
+            return path, _FORMATS[fmt][1], name
+
+        try:
+            size = self._render(os.path.join(self.data_dir, rel_path), path, width, fmt)
+        except _image_errors() as e:
+            print(f"Warning: Could not create image variant for {rel_path}: {e}")
+            return None
+        self._touch(name, size)
+        return path, _FORMATS[fmt][1], name
+
+    def _render(self, source, target, width, fmt):
+        Image, ImageOps, _ = _load_pillow()
+        pil_format = _FORMATS[fmt][0]
+        with Image.open(source) as im:
+            im = ImageOps.exif_transpose(im)
+            if im.width > width:
+                im = im.resize((width, round(im.height * width / im.width)), Image.LANCZOS)
+            if pil_format == 'JPEG' and im.mode not in ('RGB', 'L'):
+                im = im.convert('RGB')
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+            im.save(tmp, pil_format, quality=self.quality[fmt], optimize=pil_format == 'JPEG')
+        os.replace(tmp, target)
+        return os.path.getsize(target)
+
+    def build_all(self, subdir='images'):
+        """
+        Tạo trước toàn bộ phiên bản cho mọi ảnh trong thư mục data (dùng khi build).
+        Trả về số phiên bản đã tạo hoặc đã có sẵn.
+        """
+        count = 0
+        root = os.path.join(self.data_dir, subdir)
+        for dirpath, _, filenames in os.walk(root):
+            for name in sorted(filenames):
+                if not name.lower().endswith(_SOURCE_EXTENSIONS):
+                    continue
+                rel_path = os.path.relpath(os.path.join(dirpath, name), self.data_dir).replace(os.sep, '/')
+                count += self.build_image(rel_path)
+        return count
+
+    def build_image(self, rel_path):
+        """Tạo trước mọi phiên bản (chiều rộng x định dạng) của một ảnh. Trả về số phiên bản."""
+        count = 0
+        for width in self.widths_for(rel_path):
+            for fmt in self.formats:
+                if self.get_variant(rel_path, width, fmt):
+                    count += 1
+        return count
+
+
+# Tạo một instance của service để có thể import và sử dụng ở nơi khác
+image_variant_service = ImageVariantService(
+    data_dir=settings.DATA_DIR,
+    cache_dir=settings.IMAGE_VARIANT_CACHE_DIR,
+    widths=settings.IMAGE_VARIANT_WIDTHS,
+    quality=settings.IMAGE_VARIANT_QUALITY,
+    max_cache_bytes=settings.IMAGE_VARIANT_CACHE_MAX_BYTES,
+)
+
+if __name__ == '__main__':
+    # Tạo trước các phiên bản ảnh: python -m backend.app.services.image_variant_service
+    total = image_variant_service.build_all()
+    print(f"Đã chuẩn bị {total} phiên bản ảnh trong {image_variant_service.cache_dir}")
@@ -0,0 +1,202 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from backend.app.core.config import settings
+from backend.app.services.analytics_service import analytics_service
+from backend.app.services.snapshot_file import snapshot_lock
+
+# Điểm nhỏ hơn ngưỡng này (sau khi suy giảm) bị bỏ khỏi bảng điểm
+_MIN_SCORE = 0.01
+
+
+class PopularityRanking:
+    """
+    Điểm phổ biến của từng điểm đến, suy giảm theo thời gian (chu kỳ bán rã `half_life`).
+
+    Đường đi của request chỉ thêm (id, trọng số) vào một deque (append an toàn giữa các thread,
+    không cần khóa). Một thread nền định kỳ cộng các sự kiện đó vào bảng điểm, áp dụng suy giảm,
+    tính lại top và tăng `generation` khi thứ tự top_n điểm đầu thay đổi. Mỗi worker chỉ cộng phần điểm
+    mới của mình vào file snapshot (dưới khóa file) rồi nhận lại bảng điểm đã gộp, nên các worker
+    không ghi đè điểm của nhau và khởi động lại không mất bảng xếp hạng.
+    """
+
+    def __init__(self, snapshot_path=settings.POPULARITY_SNAPSHOT_FILE, top_n=settings.FEATURED_TOP_N,
+                 weights=settings.POPULARITY_WEIGHTS, half_life=settings.POPULARITY_HALF_LIFE,
+                 refresh_interval=settings.POPULARITY_REFRESH_INTERVAL,
+                 snapshot_interval=settings.POPULARITY_SNAPSHOT_INTERVAL):
+        self.snapshot_path = snapshot_path
+        self.top_n = top_n
+        self.weights = dict(weights)
+        self.half_life = half_life
+        self.refresh_interval = refresh_interval
+        self.snapshot_interval = snapshot_interval
+
+        self._events = deque()
+        self._scores = {}
+        # Điểm cộng thêm từ lần ghi snapshot gần nhất (suy giảm cùng bảng điểm), chờ gộp vào file
+        self._delta = {}
+        self._updated = time.time()
+        # (thế hệ, id của các điểm đứng đầu): thay cả tuple cùng lúc nên người đọc không cần khóa
+        self._current = (0, ())
+        self._refresh_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._pid = None
+
+        self._load()
+        self.refresh()
+        atexit.register(self.close)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    # --- Request path ---
+    def observe(self, event_type, attraction_id):
+        """Ghi nhận một sự kiện của điểm đến (được tính vào bảng điểm ở lần refresh sau)."""
+        weight = self.weights.get(event_type)
+        if weight:
+            self._events.append((str(attraction_id), weight))
+        self._ensure_thread()
+
+    @property
+    def current(self):
+        """
+        (thế hệ, tuple id) của bảng xếp hạng hiện tại; thế hệ chỉ tăng khi thứ tự top thay đổi.
+
+        Chỉ đọc, không khởi động thread nền: app được dựng (và render sẵn trang) trong master
+        trước khi fork, thread chỉ được tạo ở sự kiện đầu tiên mà worker nhận.
+        """
+        return self._current
+
+    @property
+    def generation(self):
+        return self.current[0]
+
+    # --- Background refresh ---
+    def _after_fork(self):
+        # Khóa có thể đang bị thread của tiến trình cha giữ lúc fork: worker dùng khóa mới
+        self._refresh_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # Thread không tồn tại qua fork: mỗi worker tự khởi động thread của mình
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        if self._pid is not None and self._pid != os.getpid():
+            self._after_fork()
+        with self._refresh_lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='popularity-refresh', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        last_saved = time.monotonic()
+        while not self._stopping:
+            self._wakeup.wait(self.refresh_interval)
+            self.refresh()
+            if time.monotonic() - last_saved >= self.snapshot_interval:
+                self.save()
+                last_saved = time.monotonic()
+
+    def refresh(self, now=None):
+        """Cộng các sự kiện đang chờ, áp dụng suy giảm và tính lại top. Trả về True nếu top thay đổi."""
+        with self._refresh_lock:
+            now = time.time() if now is None else now
+            decay = 0.5 ** (max(0.0, now - self._updated) / self.half_life)
+            scores = {key: score * decay for key, score in self._scores.items() if score * decay >= _MIN_SCORE}
+            delta = {key: score * decay for key, score in self._delta.items() if score * decay >= _MIN_SCORE}
+            while True:
+                try:
+                    attraction_id, weight = self._events.popleft()
+                except IndexError:
+                    break
+                scores[attraction_id] = scores.get(attraction_id, 0.0) + weight
+                delta[attraction_id] = delta.get(attraction_id, 0.0) + weight
+            self._scores, self._delta, self._updated = scores, delta, now
+            return self._rank()
+
+    def _rank(self):
+        # Gọi khi đang giữ _refresh_lock
+        scores = self._scores
+        # Giữ dư gấp đôi để vẫn đủ top_n khi có id không còn trong nội dung
+        ranked = tuple(sorted(scores, key=lambda key: (-scores[key], key))[:self.top_n * 2])
+        generation, previous = self._current
+        # Chỉ thay đổi ở các vị trí sau top_n (không hiển thị) thì giữ nguyên thế hệ
+        if ranked[:self.top_n] == previous[:self.top_n]:
+            return False
+        self._current = (generation + 1, ranked)
+        return True
+
+    def scores(self):
+        """Bảng điểm hiện tại (đã suy giảm tới lần refresh gần nhất), sắp xếp giảm dần."""
+        scores = self._scores
+        return dict(sorted(scores.items(), key=lambda item: -item[1]))
+
+    # --- Snapshot ---
+    def _read_snapshot(self):
+        """(bảng điểm, thời điểm cập nhật) trong file snapshot, hoặc None nếu chưa có hay bị hỏng."""
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return {str(key): float(score) for key, score in data['scores'].items()}, float(data['updated'])
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Warning: Ignoring popularity snapshot {self.snapshot_path} - {e}")
+            return None
+
+    def _load(self):
+        if not self.snapshot_path:
+            return
+        saved = self._read_snapshot()
+        if saved is not None:
+            self._scores, self._updated = saved
+
+    def save(self):
+        """
+        Gộp phần điểm mới của worker này vào file snapshot (đọc - cộng - ghi dưới khóa file,
+        ghi nguyên tử) rồi nhận lại bảng điểm đã gộp với các worker khác.
+        """
+        if not self.snapshot_path:
+            return
+        with self._refresh_lock, snapshot_lock(self.snapshot_path):
+            saved = self._read_snapshot()
+            if saved is None:
+                scores = dict(self._scores)
+            else:
+                saved_scores, saved_updated = saved
+                decay = 0.5 ** (max(0.0, self._updated - saved_updated) / self.half_life)
+                scores = {key: score * decay for key, score in saved_scores.items() if score * decay >= _MIN_SCORE}
+                for key, score in self._delta.items():
+                    scores[key] = scores.get(key, 0.0) + score
+            tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump({'updated': self._updated, 'scores': scores}, f)
+                os.replace(tmp, self.snapshot_path)
+            except OSError as e:
+                # Giữ lại phần điểm chưa gộp để lần ghi sau thử lại
+                print(f"Warning: Could not save popularity snapshot {self.snapshot_path} - {e}")
+                return
+            self._scores, self._delta = scores, {}
+            self._rank()
+
+    def close(self):
+        self._stopping = True
+        self._wakeup.set()
+        self.refresh()
+        self.save()
+
+
+# Chỉ tạo khi bật chế độ xếp hạng; sự kiện từ /api/events được chuyển thẳng vào bảng điểm
+popularity_ranking = PopularityRanking() if settings.FEATURED_MODE == 'popular' else None
+if popularity_ranking is not None:
+    analytics_service.add_observer(popularity_ranking.observe)
@@ -0,0 +1,246 @@
+import hashlib
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+from backend.app.core.config import settings
+
+# NumPy là thư viện tùy chọn: nếu chưa cài, /api/attractions/<id>/related trả về danh sách rỗng.
+# Chỉ import ở lần dùng đầu tiên (khi tải từ snapshot biên dịch, bảng gợi ý đã có sẵn).
+_numpy = None
+
+
+def _load_numpy():
+    """Trả về module numpy, hoặc None nếu chưa cài."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:  # pragma: no cover - phụ thuộc môi trường
+            _numpy = False
+    return _numpy or None
+
+
+# --- Tokenizer ---
+# Hư từ tiếng Việt phổ biến, không mang nghĩa khi so sánh nội dung
+STOPWORDS = frozenset("""
+và của là có các những được với cho trong một này đó đến từ không khi ở để thì như đã sẽ
+rất cũng nhiều lại ra vào về theo trên tại nơi nên mà hay hoặc nhưng bởi vì do nếu đây
+cùng qua sau trước giữa ai gì nào đều chỉ còn đang vẫn luôn lên xuống bị thế vậy
+""".split())
+
+_CLAUSE_RE = re.compile(r"[.,;:!?()\[\]\"“”–—\n]+")
+_SYLLABLE_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    """
+    Các term của một văn bản: âm tiết (chữ thường, chuẩn hóa NFC) và cặp âm tiết liền nhau
+    trong cùng một mệnh đề. Tiếng Việt viết tách từng âm tiết nên từ ghép như
+    "ruộng bậc thang" hay "thác bảy tầng" chỉ được nhận ra qua các cặp này.
+    """
+    terms = []
+    for clause in _CLAUSE_RE.split(unicodedata.normalize('NFC', text or '').lower()):
+        syllables = _SYLLABLE_RE.findall(clause)
+        terms.extend(s for s in syllables if len(s) > 1 and s not in STOPWORDS)
+        terms.extend(
+            f"{a}_{b}" for a, b in zip(syllables, syllables[1:])
+            if a not in STOPWORDS and b not in STOPWORDS
+        )
+    return terms
+
+
+# --- Documents ---
+def related_documents(snapshot):
+    """
+    Mọi mục có thể được gợi ý: [(khóa, mô tả ngắn, văn bản)] cho điểm đến (tên, tóm tắt, mô tả),
+    section (tiêu đề, nội dung) và ảnh thư viện (alt, chú thích). Khóa là (loại, id).
+    """
+    documents = []
+    for item in snapshot.attractions_dicts:
+        text = ' '.join(filter(None, (item['name'], item.get('summary'), item.get('description'))))
+        summary = {'kind': 'attraction', 'id': item['id'], 'title': item['name'], 'imageUrl': item.get('imageUrl')}
+        documents.append((('attraction', str(item['id'])), summary, text))
+    for item in snapshot.sections_dicts:
+        key = item.get('id', item['title'])
+        text = ' '.join(filter(None, (item['title'], item.get('subtitle'), item.get('content'))))
+        summary = {'kind': 'section', 'id': key, 'title': item['title'], 'imageUrl': item.get('imageUrl')}
+        documents.append((('section', str(key)), summary, text))
+    for item in snapshot.gallery_dicts:
+        text = ' '.join(filter(None, (item.get('alt'), item.get('title'), item.get('caption'))))
+        if text:
+            summary = {'kind': 'gallery', 'id': item['url'], 'title': item.get('alt', ''), 'imageUrl': item['url']}
+            documents.append((('gallery', item['url']), summary, text))
+    # Mỗi khóa chỉ một mục (ví dụ cùng một ảnh xuất hiện hai lần trong thư viện)
+    unique, seen = [], set()
+    for document in documents:
+        if document[0] not in seen:
+            seen.add(document[0])
+            unique.append(document)
+    return unique
+
+
+# --- Index ---
+class RelatedIndex:
+    """
+    Chỉ mục TF-IDF (NumPy) của các mục nội dung và bảng top-k mục tương đồng nhất (cosine)
+    của từng mục. Giữ trạng thái giữa các lần tải lại nội dung: khi chỉ một số ít mục thay đổi,
+    chỉ tokenize lại các mục đó và chỉ tính lại các hàng/cột tương ứng của ma trận tương đồng
+    (IDF của các term cũ được giữ nguyên cho tới lần tính lại toàn bộ tiếp theo).
+    """
+
+    def __init__(self, top_k=settings.RELATED_TOP_K, min_score=settings.RELATED_MIN_SCORE,
+                 max_changed=settings.RELATED_INCREMENTAL_MAX_CHANGED):
+        self.top_k = top_k
+        self.min_score = min_score
+        self.max_changed = max_changed
+        self._lock = threading.Lock()
+        self._warned = False
+        self._reset()
+
+    def _reset(self):
+        self._keys = []
+        self._digests = {}
+        self._counts = {}
+        self._df = Counter()
+        self._vocab = {}
+        self._idf = None
+        self._matrix = None
+        self._similarity = None
+        # Số mục đã thay đổi kể từ lần tính lại toàn bộ (IDF càng cũ càng lệch)
+        self._drift = 0
+        self.last_update = None
+
+    @property
+    def available(self):
+        """True nếu đã cài NumPy (tính được chỉ mục)."""
+        return _load_numpy() is not None
+
+    @staticmethod
+    def _digest(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+    def _vectors(self, np, keys):
+        """Vector TF-IDF (tf log, chuẩn hóa L2) của các mục, theo từ vựng hiện tại."""
+        matrix = np.zeros((len(keys), len(self._vocab)), dtype=np.float32)
+        for row, key in enumerate(keys):
+            counts = self._counts[key]
+            if not counts:
+                continue
+            columns = np.fromiter((self._vocab[term] for term in counts), dtype=np.int64, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            matrix[row, columns] = (1.0 + np.log(tf)) * self._idf[columns]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def _extend_vocab(self, np, terms):
+        """Thêm term mới vào từ vựng; IDF của term mới theo số tài liệu hiện tại."""
+        new_terms = [term for term in terms if term not in self._vocab]
+        if not new_terms:
+            return
+        total = len(self._keys)
+        for term in new_terms:
+            self._vocab[term] = len(self._vocab)
+        idf = np.array([math.log((1 + total) / (1 + self._df[term])) + 1.0 for term in new_terms], dtype=np.float32)
+        self._idf = idf if self._idf is None else np.concatenate([self._idf, idf])
+
+    def _full_rebuild(self, np):
+        total = len(self._keys)
+        self._vocab = {term: index for index, term in enumerate(sorted(self._df))}
+        self._idf = np.array(
+            [math.log((1 + total) / (1 + self._df[term])) + 1.0 for term in sorted(self._df)], dtype=np.float32,
+        )
+        self._matrix = self._vectors(np, self._keys)
+        self._similarity = self._matrix @ self._matrix.T
+        self._drift = 0
+        self.last_update = 'full'
+
+    def update(self, documents):
+        """Cập nhật chỉ mục theo danh sách [(khóa, văn bản)]. Trả về False nếu chưa cài NumPy."""
+        np = _load_numpy()
+        if np is None:
+            if not self._warned:
+                print("Warning: NumPy is not installed, related places are disabled")
+                self._warned = True
+            return False
+
+        with self._lock:
+            keys = [key for key, _ in documents]
+            digests = {key: self._digest(text) for key, text in documents}
+            old_index = {key: row for row, key in enumerate(self._keys)}
+            changed = [key for key in keys if self._digests.get(key) != digests[key]]
+            removed = [key for key in self._keys if key not in digests]
+            if not changed and not removed and keys == self._keys:
+                self.last_update = 'unchanged'
+                return True
+
+            # Cập nhật số tài liệu chứa từng term (df) chỉ cho các mục bị xóa/thay đổi
+            for key in removed + [key for key in changed if key in self._counts]:
+                self._df.subtract(self._counts.pop(key).keys())
+            texts = dict(documents)
+            new_terms = set()
+            for key in changed:
+                self._counts[key] = Counter(tokenize(texts[key]))
+                self._df.update(self._counts[key].keys())
+                new_terms.update(self._counts[key])
+            self._df = +self._df
+            self._digests = digests
+            self._keys = keys
+
+            self._drift += len(changed) + len(removed)
+            if self._similarity is None or self._drift > self.max_changed * max(len(keys), 1):
+                self._full_rebuild(np)
+                return True
+
+            # Incremental: giữ lại vector và độ tương đồng của các mục không đổi
+            self._extend_vocab(np, sorted(new_terms))
+            changed_keys = set(changed)
+            kept = [(row, old_index[key]) for row, key in enumerate(keys) if key not in changed_keys]
+            new_rows = [row for row, key in enumerate(keys) if key in changed_keys]
+            kept_new = np.array([row for row, _ in kept], dtype=np.int64)
+            kept_old = np.array([row for _, row in kept], dtype=np.int64)
+
+            matrix = np.zeros((len(keys), len(self._vocab)), dtype=np.float32)
+            matrix[kept_new, :self._matrix.shape[1]] = self._matrix[kept_old]
+            if new_rows:
+                matrix[new_rows] = self._vectors(np, [keys[row] for row in new_rows])
+
+            similarity = np.zeros((len(keys), len(keys)), dtype=np.float32)
+            similarity[np.ix_(kept_new, kept_new)] = self._similarity[np.ix_(kept_old, kept_old)]
+            if new_rows:
+                rows = matrix[new_rows] @ matrix.T
+                similarity[new_rows, :] = rows
+                similarity[:, new_rows] = rows.T
+            self._matrix, self._similarity = matrix, similarity
+            self.last_update = 'incremental'
+            return True
+
+    def neighbors(self, keys=None):
+        """{khóa: [(khóa, điểm)]} top-k mục tương đồng nhất (không gồm chính nó) của các khóa yêu cầu."""
+        np = _load_numpy()
+        with self._lock:
+            if np is None or self._similarity is None:
+                return {key: [] for key in keys or ()}
+            index = {key: row for row, key in enumerate(self._keys)}
+            rows = [index[key] for key in (keys if keys is not None else self._keys) if key in index]
+            if not rows:
+                return {}
+            scores = self._similarity[rows].copy()
+            scores[np.arange(len(rows)), rows] = -np.inf
+            k = min(self.top_k, len(self._keys) - 1)
+            if k <= 0:
+                return {self._keys[row]: [] for row in rows}
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+            result = {}
+            for i, row in enumerate(rows):
+                candidates = sorted(top[i], key=lambda column: -scores[i, column])
+                result[self._keys[row]] = [
+                    (self._keys[column], round(float(scores[i, column]), 4))
+                    for column in candidates if scores[i, column] >= self.min_score
+                ]
+            return result
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# Định dạng file snapshot đã biên dịch (không dùng pickle/marshal):
+#   MAGIC (8 byte) | độ dài header (uint32 little-endian) | header JSON (UTF-8) | các blob
+# Header chứa phiên bản nội dung, thông tin file nguồn và vị trí (offset, length) của từng blob.
+MAGIC = b'YHSNAP01'
+# Tăng khi dữ liệu được dẫn xuất lúc biên dịch (ví dụ srcset) đổi cách tính, để snapshot cũ bị biên dịch lại
+FORMAT_VERSION = 2
+_HEADER_LEN = struct.Struct('<I')
+
+
+class SnapshotFormatError(ValueError):
+    """File snapshot hỏng hoặc không đúng định dạng."""
+
+
+def source_signature(data_path):
+    """Kích thước và mtime của content.json, dùng để phát hiện snapshot đã cũ."""
+    try:
+        st = os.stat(data_path)
+    except FileNotFoundError:
+        return None
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def file_digest(path):
+    """sha256 (hex) của nội dung file, None nếu file không tồn tại."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def source_matches(source, data_path):
+    """
+    True nếu snapshot (thông tin nguồn `source` trong header) được biên dịch từ đúng nội dung
+    content.json hiện tại. So sánh sha256 của nội dung nên copy, checkout hay rsync (đổi mtime)
+    không làm snapshot bị coi là cũ; snapshot cũ chưa lưu hash thì so sánh kích thước và mtime.
+    """
+    if isinstance(source, dict) and source.get('sha256'):
+        current = file_digest(data_path)
+        return current is None or current == source['sha256']
+    current = source_signature(data_path)
+    return current is None or source == current
+
+
+def snapshot_is_current(path, data_path):
+    """True nếu file snapshot tồn tại, đọc được và được biên dịch từ đúng phiên bản content.json hiện tại."""
+    try:
+        compiled = CompiledSnapshot(path)
+    except (OSError, SnapshotFormatError):
+        return False
+    fresh = source_matches(compiled.source, data_path)
+    compiled.close()
+    return fresh
+
+
+@contextmanager
+def snapshot_lock(path):
+    """
+    Khóa độc quyền (flock) trên file `<snapshot>.lock`, dùng chung giữa các tiến trình
+    để chỉ một worker biên dịch lại snapshot. Trên hệ thống không có fcntl thì không khóa.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def write_snapshot(path, version, blobs, source=None):
+    """
+    Ghi các blob (dict tên -> bytes) vào file snapshot một cách nguyên tử.
+    File cũ được thay bằng os.replace, tiến trình đang mmap file cũ vẫn đọc được bình thường.
+    """
+    sections = {}
+    offset = 0
+    for name, data in blobs.items():
+        sections[name] = [offset, len(data)]
+        offset += len(data)
+
+    header = json.dumps({
+        'format': FORMAT_VERSION,
+        'version': version,
+        'source': source,
+        'created': time.time(),
+        'sections': sections,
+    }, separators=(',', ':')).encode('utf-8')
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(header)))
+        f.write(header)
+        for data in blobs.values():
+            f.write(data)
+    os.replace(tmp, path)
+
+
+class CompiledSnapshot:
+    """
+    Snapshot nội dung đã biên dịch, đọc qua mmap.
+
+    Mở file chỉ tốn vài mili-giây: chỉ header được phân tích, các payload JSON
+    được đọc trực tiếp từ vùng nhớ ánh xạ khi cần (page cache của hệ điều hành
+    được chia sẻ giữa các tiến trình cùng đọc một file).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        try:
+            if self._mmap[:len(MAGIC)] != MAGIC:
+                raise SnapshotFormatError(f"{path}: not a content snapshot")
+            (header_len,) = _HEADER_LEN.unpack_from(self._mmap, len(MAGIC))
+            header_start = len(MAGIC) + _HEADER_LEN.size
+            header = json.loads(bytes(self._mmap[header_start:header_start + header_len]))
+        except (struct.error, ValueError) as e:
+            self.close()
+            raise SnapshotFormatError(f"{path}: {e}") from e
+
+        if header.get('format') != FORMAT_VERSION:
+            self.close()
+            raise SnapshotFormatError(f"{path}: unsupported format {header.get('format')}")
+
+        self.version = header['version']
+        self.source = header.get('source')
+        self.created = header.get('created')
+        self._base = header_start + header_len
+        self._sections = header['sections']
+
+    def __contains__(self, name):
+        return name in self._sections
+
+    def blob(self, name):
+        """memoryview (không copy) của một blob trong file."""
+        offset, length = self._sections[name]
+        start = self._base + offset
+        return self._view[start:start + length]
+
+    def close(self):
+        """Đóng mmap. Nếu vẫn còn memoryview đang dùng, việc đóng được để lại cho GC."""
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            pass
@@ -0,0 +1,177 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.app.core.config import settings
+
+# Các trường văn bản được dịch (ở mọi cấp của about/sections/attractions/gallery);
+# id, đường dẫn ảnh, srcset, source... giữ nguyên
+TRANSLATABLE_KEYS = frozenset({'title', 'subtitle', 'text', 'content', 'name', 'summary', 'description', 'alt', 'caption'})
+_CONTENT_KEYS = ('about', 'sections', 'attractions', 'gallery')
+
+
+# --- Strings ---
+def translatable_strings(content):
+    """Danh sách (đường dẫn, chuỗi) của mọi trường cần dịch. Đường dẫn là tuple khóa/chỉ số."""
+    found = []
+
+    def walk(node, path):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if isinstance(value, str):
+                    if key in TRANSLATABLE_KEYS and value.strip():
+                        found.append((path + (key,), value))
+                else:
+                    walk(value, path + (key,))
+        elif isinstance(node, list):
+            for index, value in enumerate(node):
+                walk(value, path + (index,))
+
+    for key in _CONTENT_KEYS:
+        walk(content.get(key), (key,))
+    return found
+
+
+def apply_translations(content, translations):
+    """Bản sao của nội dung với các chuỗi được thay bằng bản dịch ({đường dẫn: bản dịch})."""
+    translated = copy.deepcopy(content)
+    for path, text in translations.items():
+        node = translated
+        for key in path[:-1]:
+            node = node[key]
+        node[path[-1]] = text
+    return translated
+
+
+def pack_batches(texts, max_items, max_chars):
+    """Chia các chuỗi thành nhóm, mỗi nhóm là một request (tối đa max_items chuỗi / max_chars ký tự)."""
+    batches, batch, size = [], [], 0
+    for text in texts:
+        if batch and (len(batch) >= max_items or size + len(text) > max_chars):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(text)
+        size += len(text)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+# --- Cache ---
+class TranslationCache:
+    """
+    Cache bản dịch trên đĩa, khóa theo (hash chuỗi nguồn, ngôn ngữ, model): chuỗi không đổi
+    thì không bao giờ phải dịch lại, đổi model thì dịch lại từ đầu.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text, locale, model):
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()[:24]
+        return f"{digest}:{locale}:{model}"
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            print(f"Warning: Ignoring translation cache {self.path} - {e}")
+
+    def get(self, text, locale, model):
+        with self._lock:
+            self._load()
+            return self._entries.get(self.key(text, locale, model))
+
+    def put(self, text, locale, model, translation):
+        with self._lock:
+            self._load()
+            self._entries[self.key(text, locale, model)] = translation
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=0, sort_keys=True)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+
+# --- Translator ---
+class ContentTranslator:
+    """
+    Dịch toàn bộ nội dung sang một ngôn ngữ với số request tối thiểu:
+    chỉ các chuỗi chưa có trong cache được dịch, chuỗi trùng nhau chỉ dịch một lần,
+    và nhiều chuỗi được gói vào cùng một request (client.translate_batch).
+    """
+
+    def __init__(self, client, cache, model=settings.TRANSLATION_MODEL,
+                 source_locale=settings.DEFAULT_LOCALE, batch_items=settings.TRANSLATION_BATCH_ITEMS,
+                 batch_chars=settings.TRANSLATION_BATCH_CHARS, max_workers=settings.TRANSLATION_MAX_WORKERS):
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.source_locale = source_locale
+        self.batch_items = batch_items
+        self.batch_chars = batch_chars
+        self.max_workers = max_workers
+
+    def _translate_batch(self, batch, locale):
+        try:
+            results = self.client.translate_batch(batch, locale, source_language=self.source_locale, model=self.model)
+        except Exception as e:
+            print(f"Warning: Translation request failed ({len(batch)} strings, {locale}) - {e}")
+            return 0
+        for text, translation in zip(batch, results):
+            if translation is not None:
+                self.cache.put(text, locale, self.model, translation)
+        return 1
+
+    def _translate_missing(self, texts, locale):
+        """Dịch các chuỗi theo nhóm, song song. Trả về số request đã gửi."""
+        batches = pack_batches(texts, self.batch_items, self.batch_chars)
+        if not batches:
+            return 0
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            return sum(executor.map(lambda batch: self._translate_batch(batch, locale), batches))
+
+    def translate_content(self, content, locale):
+        """
+        Trả về (nội dung đã dịch, thống kê). Chuỗi model bỏ sót được gửi lại một lần;
+        nếu vẫn thiếu thì giữ nguyên văn bản gốc và không ghi vào cache.
+        """
+        strings = translatable_strings(content)
+        unique = list(dict.fromkeys(text for _, text in strings))
+        missing = [text for text in unique if self.cache.get(text, locale, self.model) is None]
+        stats = {'strings': len(strings), 'unique': len(unique), 'cached': len(unique) - len(missing), 'requests': 0}
+
+        for _ in range(2):
+            if not missing:
+                break
+            stats['requests'] += self._translate_missing(missing, locale)
+            missing = [text for text in missing if self.cache.get(text, locale, self.model) is None]
+        stats['untranslated'] = len(missing)
+
+        translations = {}
+        for path, text in strings:
+            translation = self.cache.get(text, locale, self.model)
+            if translation is not None:
+                translations[path] = translation
+        return apply_translations(content, translations), stats
@@ -0,0 +1,336 @@
+"""
+Benchmark cho API và các đường xử lý nóng (create_app, tải ContentService, content_bp).
+
+Mỗi kịch bản (scale) sinh một file content.json tổng hợp, sau đó chạy một tiến trình
+con riêng với CONTENT_FILE trỏ tới file đó để đo:
+    - cold start: import app + create_app + request đầu tiên
+    - requests/sec, độ trễ p50/p99 cho từng endpoint
+    - bộ nhớ đỉnh (RSS) của tiến trình
+
+Cách dùng:
+    python benchmarks/bench_api.py                       # chạy tất cả scale, in bảng kết quả
+    python benchmarks/bench_api.py --scales small,medium-b64 --output run.json
+    python benchmarks/bench_api.py --server wsgi --concurrency 8
+    python benchmarks/bench_api.py --server asgi --concurrency 8   # cần cài uvicorn
+    python benchmarks/bench_api.py --compare base.json run.json
+"""
+import argparse
+import base64
+import http.client
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# (số section, số điểm đến, số ảnh thư viện, kích thước ảnh base64 nhúng hoặc 0)
+SCALES = {
+    'small': (5, 10, 10, 0),
+    'medium': (50, 200, 200, 0),
+    'large': (200, 2000, 2000, 0),
+    'small-b64': (5, 10, 10, 60 * 1024),
+    'medium-b64': (50, 200, 200, 60 * 1024),
+}
+
+ENDPOINTS = [
+    '/api/content',
+    '/api/about',
+    '/api/attractions',
+    '/api/attractions?featured=true',
+    '/api/gallery',
+    '/api/bootstrap?page=home',
+    '/',
+]
+
+_WORDS = (
+    'bản làng suối thác ruộng bậc thang nhà sàn người Thái dệt thổ cẩm cơm lam '
+    'rượu cần núi rừng sương mù lễ hội khèn múa xòe Mỹ Lý Nghệ An Nậm Nơn'
+).split()
+
+
+# --- Synthetic Content ---
+def _text(rng, words):
+    return ' '.join(rng.choice(_WORDS) for _ in range(words))
+
+
+def generate_content(sections, attractions, gallery, inline_image_bytes=0, seed=42):
+    """
+    Sinh dữ liệu content.json tổng hợp. Khi inline_image_bytes > 0, ảnh được nhúng
+    dưới dạng data URI base64 giống kết quả của convert_images_to_base64.py.
+    """
+    rng = random.Random(seed)
+
+    def image(index):
+        if not inline_image_bytes:
+            return f"images/synthetic_{index}.jpg"
+        payload = bytes(rng.getrandbits(8) for _ in range(64)) * (inline_image_bytes // 64)
+        return f"data:image/jpeg;base64,{base64.b64encode(payload).decode('ascii')}"
+
+    return {
+        'about': {'title': 'Bản Yên Hòa', 'text': _text(rng, 120)},
+        'sections': [
+            {'title': _text(rng, 6), 'content': _text(rng, 150), 'imageUrl': image(i)}
+            for i in range(sections)
+        ],
+        'attractions': [
+            {
+                'id': i + 1,
+                'name': _text(rng, 4),
+                'summary': _text(rng, 40),
+                'description': _text(rng, 200),
+                'imageUrl': image(i),
+                'featured': i % 7 == 0,
+            }
+            for i in range(attractions)
+        ],
+        'gallery': [{'url': image(i), 'alt': _text(rng, 8)} for i in range(gallery)],
+    }
+
+
+# --- Measurement helpers ---
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summarize(latencies, elapsed, errors=0):
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(_percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(_percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+    }
+
+
+def _max_rss_mb():
+    # Linux trả về KB, macOS trả về byte
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _bench_test_client(app, path, requests_count):
+    client = app.test_client()
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for _ in range(requests_count):
+        t0 = time.perf_counter()
+        response = client.get(path)
+        response.get_data()
+        latencies.append(time.perf_counter() - t0)
+        errors += response.status_code >= 400
+    return _summarize(latencies, time.perf_counter() - start, errors)
+
+
+def _bench_http(port, path, requests_count, concurrency):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    per_thread = max(1, requests_count // concurrency)
+
+    def worker():
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        local = []
+        for _ in range(per_thread):
+            t0 = time.perf_counter()
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            local.append(time.perf_counter() - t0)
+            if response.status >= 400:
+                with lock:
+                    errors[0] += 1
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return _summarize(latencies, time.perf_counter() - start, errors[0])
+
+
+def _start_wsgi_server(app):
+    """Chạy app trên một WSGI server đa luồng cục bộ (werkzeug), trả về (hàm dừng, port)."""
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.shutdown, server.server_port
+
+
+def _start_asgi_server(asgi_app):
+    """Chạy app ASGI (asgi.py) bằng uvicorn trong một thread, trả về (hàm dừng, port)."""
+    import socket
+    import uvicorn
+
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    server = uvicorn.Server(uvicorn.Config(asgi_app, log_level='warning', lifespan='off'))
+    threading.Thread(target=server.run, kwargs={'sockets': [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+
+    def stop():
+        server.should_exit = True
+    return stop, sock.getsockname()[1]
+
+
+# --- Worker (chạy trong tiến trình con) ---
+def run_worker(args):
+    """Đo một scale trong tiến trình riêng để cold start và RSS không bị ảnh hưởng lẫn nhau."""
+    sys.path.insert(0, PROJECT_ROOT)
+    t0 = time.perf_counter()
+    import app as app_module  # noqa: E402  (import là một phần của phép đo)
+    import_seconds = time.perf_counter() - t0
+
+    app = app_module.app
+    t1 = time.perf_counter()
+    app.test_client().get('/api/content').get_data()
+    first_request_seconds = time.perf_counter() - t1
+    startup_rss = _max_rss_mb()
+
+    stop = None
+    if args.server == 'wsgi':
+        stop, port = _start_wsgi_server(app)
+    elif args.server == 'asgi':
+        import asgi as asgi_module  # noqa: E402
+        stop, port = _start_asgi_server(asgi_module.app)
+
+    endpoints = {}
+    for path in ENDPOINTS:
+        if stop is not None:
+            endpoints[path] = _bench_http(port, path, args.requests, args.concurrency)
+        else:
+            endpoints[path] = _bench_test_client(app, path, args.requests)
+
+    if stop is not None:
+        stop()
+
+    result = {
+        'cold_start': {
+            'import_create_app_ms': round(import_seconds * 1000, 2),
+            'first_request_ms': round(first_request_seconds * 1000, 2),
+        },
+        'memory': {'startup_rss_mb': startup_rss, 'peak_rss_mb': _max_rss_mb()},
+        'endpoints': endpoints,
+    }
+    print(json.dumps(result))
+
+
+# --- Driver ---
+def run_scale(name, args):
+    sections, attractions, gallery, inline_bytes = SCALES[name]
+    content = generate_content(sections, attractions, gallery, inline_bytes)
+    with tempfile.TemporaryDirectory() as tmp:
+        content_path = os.path.join(tmp, 'content.json')
+        with open(content_path, 'w', encoding='utf-8') as f:
+            json.dump(content, f, ensure_ascii=False)
+        content_size = os.path.getsize(content_path)
+
+        # Mọi file mà server ghi (snapshot, lịch sử phiên bản, analytics, bảng xếp hạng) nằm trong thư mục tạm,
+        # để benchmark không đọc lại hay ghi đè dữ liệu thật trong backend/data
+        env = dict(
+            os.environ,
+            CONTENT_FILE=content_path,
+            CONTENT_SNAPSHOT_FILE=os.path.join(tmp, 'content.snapshot'),
+            CONTENT_HISTORY_FILE=os.path.join(tmp, '.content-history.json'),
+            ANALYTICS_DB_FILE=os.path.join(tmp, '.analytics.sqlite3'),
+            POPULARITY_SNAPSHOT_FILE=os.path.join(tmp, '.popularity.json'),
+            IMAGE_VARIANT_CACHE_DIR=os.path.join(tmp, 'variants'),
+        )
+        cmd = [
+            sys.executable, os.path.abspath(__file__), '--worker',
+            '--server', args.server, '--requests', str(args.requests), '--concurrency', str(args.concurrency),
+        ]
+        started = time.perf_counter()
+        proc = subprocess.run(cmd, env=env, cwd=PROJECT_ROOT, capture_output=True, text=True)
+        wall = time.perf_counter() - started
+
+    if proc.returncode != 0:
+        raise RuntimeError(f"Benchmark worker failed for scale '{name}':\n{proc.stderr}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['scale'] = name
+    result['content_bytes'] = content_size
+    result['worker_wall_s'] = round(wall, 2)
+    return result
+
+
+def print_report(results):
+    for result in results:
+        cold = result['cold_start']
+        print(f"\n== {result['scale']} ({result['content_bytes'] / 1024:.0f} KB content) ==")
+        print(f"cold start: import+create_app {cold['import_create_app_ms']} ms, "
+              f"first request {cold['first_request_ms']} ms; "
+              f"RSS startup {result['memory']['startup_rss_mb']} MB, peak {result['memory']['peak_rss_mb']} MB")
+        print(f"{'endpoint':34} {'rps':>10} {'p50 ms':>10} {'p99 ms':>10}")
+        for path, stats in result['endpoints'].items():
+            print(f"{path:34} {stats['rps']:>10} {stats['p50_ms']:>10} {stats['p99_ms']:>10}")
+
+
+def compare(base_path, new_path):
+    """In thay đổi (%) giữa hai lần chạy: rps, p99 và cold start."""
+    with open(base_path, encoding='utf-8') as f:
+        base = {r['scale']: r for r in json.load(f)['results']}
+    with open(new_path, encoding='utf-8') as f:
+        new = {r['scale']: r for r in json.load(f)['results']}
+
+    def delta(old, cur):
+        return f"{(cur - old) / old * 100:+.1f}%" if old else 'n/a'
+
+    for scale in sorted(base.keys() & new.keys()):
+        b, n = base[scale], new[scale]
+        print(f"\n== {scale} ==")
+        print(f"cold start {delta(b['cold_start']['import_create_app_ms'], n['cold_start']['import_create_app_ms'])}, "
+              f"peak RSS {delta(b['memory']['peak_rss_mb'], n['memory']['peak_rss_mb'])}")
+        for path in [p for p in b['endpoints'] if p in n['endpoints']]:
+            be, ne = b['endpoints'][path], n['endpoints'][path]
+            print(f"{path:34} rps {delta(be['rps'], ne['rps']):>8}  p99 {delta(be['p99_ms'], ne['p99_ms']):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API Du Lịch Yên Hòa')
+    parser.add_argument('--scales', default=','.join(SCALES), help='Danh sách scale, phân tách bằng dấu phẩy')
+    parser.add_argument('--server', choices=('testclient', 'wsgi', 'asgi'), default='testclient')
+    parser.add_argument('--requests', type=int, default=200, help='Số request cho mỗi endpoint')
+    parser.add_argument('--concurrency', type=int, default=4, help='Số luồng client khi dùng --server wsgi/asgi')
+    parser.add_argument('--output', help='Ghi kết quả ra file JSON để so sánh sau')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='So sánh hai file kết quả')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = [run_scale(name.strip(), args) for name in args.scales.split(',') if name.strip()]
+    print_report(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': sys.version.split()[0],
+                'server': args.server,
+                'requests_per_endpoint': args.requests,
+                'results': results,
+            }, f, indent=2)
+        print(f"\nĐã ghi kết quả vào {args.output}")
+
+
+if __name__ == '__main__':
+    main()
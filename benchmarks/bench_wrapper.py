@@ -0,0 +1,198 @@
+"""
+Benchmark phía client cho AIThucChienAPI, chạy với gateway giả lập (benchmarks/mock_gateway.py)
+nên không tốn phí và chạy được offline / trong CI.
+
+Đo throughput (request/giây) và độ trễ p50/p90/p99/max của một thao tác ở ba kiểu dùng:
+    - sequential: gọi lần lượt trong một thread
+    - threaded:   ThreadPoolExecutor với --concurrency thread
+    - async:      asyncio, mỗi lời gọi chạy qua asyncio.to_thread, giới hạn bởi Semaphore
+
+Cách dùng:
+    python benchmarks/bench_wrapper.py                                  # gateway nội bộ, thao tác text
+    python benchmarks/bench_wrapper.py --op image --latency 80 --jitter 40 --concurrency 16
+    python benchmarks/bench_wrapper.py --keys 4 --rate-limit 10         # pool nhiều key, gateway giới hạn tốc độ
+    python benchmarks/bench_wrapper.py --gateway http://127.0.0.1:8900  # dùng gateway đang chạy sẵn
+    python benchmarks/bench_wrapper.py --output run.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ai_thuc_chien_wrapper import AIThucChienAPI  # noqa: E402
+import mock_gateway  # noqa: E402
+
+# Thao tác được đo: tên -> hàm nhận (api, chỉ số lời gọi)
+OPERATIONS = {
+    'text': lambda api, i: api.generate_text(f"Giới thiệu Bản Yên Hòa #{i}", model='gemini-2.5-flash'),
+    'translate': lambda api, i: api.translate_batch([f"Bản Yên Hòa #{i}", 'Thác 7 tầng', 'Cơm lam'], 'en'),
+    'image': lambda api, i: api.generate_image(f"Ruộng bậc thang #{i}"),
+    'speech': lambda api, i: api.text_to_speech(f"Chào mừng đến Yên Hòa #{i}"),
+    'spending': lambda api, i: api.check_spending(),
+}
+MODES = ('sequential', 'threaded', 'async')
+
+
+# --- Measurement helpers ---
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summarize(latencies, elapsed, errors):
+    if not latencies:
+        return {'requests': 0, 'errors': errors, 'rps': 0.0}
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(_percentile(latencies, 50) * 1000, 2),
+        'p90_ms': round(_percentile(latencies, 90) * 1000, 2),
+        'p99_ms': round(_percentile(latencies, 99) * 1000, 2),
+        'max_ms': round(max(latencies) * 1000, 2),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+    }
+
+
+class _Recorder:
+    """Ghi độ trễ và số lỗi của từng lời gọi (an toàn giữa các thread)."""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def call(self, operation, api, index):
+        started = time.perf_counter()
+        try:
+            operation(api, index)
+            ok = True
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            if ok:
+                self.latencies.append(elapsed)
+            else:
+                self.errors += 1
+
+
+# --- Modes ---
+def run_sequential(api, operation, count, concurrency):
+    recorder = _Recorder()
+    for i in range(count):
+        recorder.call(operation, api, i)
+    return recorder
+
+
+def run_threaded(api, operation, count, concurrency):
+    recorder = _Recorder()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda i: recorder.call(operation, api, i), range(count)))
+    return recorder
+
+
+def run_async(api, operation, count, concurrency):
+    recorder = _Recorder()
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            async with semaphore:
+                await asyncio.to_thread(recorder.call, operation, api, i)
+
+        # Thread pool mặc định của asyncio có thể nhỏ hơn concurrency
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+        await asyncio.gather(*(one(i) for i in range(count)))
+
+    asyncio.run(main())
+    return recorder
+
+
+_RUNNERS = {'sequential': run_sequential, 'threaded': run_threaded, 'async': run_async}
+
+
+def bench(api, op, modes, count, concurrency):
+    results = {}
+    operation = OPERATIONS[op]
+    for mode in modes:
+        started = time.perf_counter()
+        recorder = _RUNNERS[mode](api, operation, count, concurrency)
+        results[mode] = _summarize(recorder.latencies, time.perf_counter() - started, recorder.errors)
+    return results
+
+
+def print_report(op, results, gateway_stats=None):
+    print(f"\n== {op} ==")
+    print(f"{'mode':12} {'rps':>8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for mode, stats in results.items():
+        print(f"{mode:12} {stats['rps']:>8} {stats.get('p50_ms', '-'):>9} {stats.get('p90_ms', '-'):>9} "
+              f"{stats.get('p99_ms', '-'):>9} {stats.get('max_ms', '-'):>9} {stats['errors']:>7}")
+    if gateway_stats:
+        print('gateway:', ', '.join(f"{k}={v}" for k, v in sorted(gateway_stats.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark client AIThucChienAPI với gateway giả lập')
+    parser.add_argument('--op', choices=sorted(OPERATIONS), default='text', help='Thao tác cần đo')
+    parser.add_argument('--modes', default=','.join(MODES), help='Các kiểu dùng, phân tách bằng dấu phẩy')
+    parser.add_argument('--requests', type=int, default=200, help='Số lời gọi cho mỗi kiểu dùng')
+    parser.add_argument('--concurrency', type=int, default=8, help='Số lời gọi song song (threaded/async)')
+    parser.add_argument('--keys', type=int, default=1, help='Số API key trong pool của client')
+    parser.add_argument('--gateway', help='URL gateway có sẵn (mặc định chạy mock_gateway trong tiến trình)')
+    parser.add_argument('--latency', type=float, default=20.0, help='Độ trễ của gateway nội bộ (ms)')
+    parser.add_argument('--jitter', type=float, default=10.0, help='Dao động độ trễ tối đa (ms)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Tỉ lệ lỗi 503 của gateway nội bộ')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='Giới hạn request/giây mỗi key của gateway nội bộ')
+    parser.add_argument('--output', help='Ghi kết quả ra file JSON')
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.gateway
+    if base_url is None:
+        server, base_url = mock_gateway.start_in_thread(
+            latency_ms=args.latency, jitter_ms=args.jitter, error_rate=args.error_rate,
+            rate_limit=args.rate_limit, seed=42,
+        )
+
+    pool = [{'api_key': f"bench-key-{i}", 'base_url': base_url} for i in range(args.keys)]
+    api = AIThucChienAPI(pool=pool, image_cache_dir=None)
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+
+    try:
+        results = bench(api, args.op, modes, args.requests, args.concurrency)
+        gateway_stats = dict(server.state.stats) if server is not None else None
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    print_report(args.op, results, gateway_stats)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': sys.version.split()[0],
+                'op': args.op,
+                'requests': args.requests,
+                'concurrency': args.concurrency,
+                'keys': args.keys,
+                'gateway': args.gateway or {'latency_ms': args.latency, 'jitter_ms': args.jitter,
+                                            'error_rate': args.error_rate, 'rate_limit': args.rate_limit},
+                'results': results,
+                'pool': api.pool.stats(),
+            }, f, indent=2)
+        print(f"\nĐã ghi kết quả vào {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+"""
+Gateway giả lập AI Thực Chiến chạy cục bộ (chỉ dùng thư viện chuẩn), để thử và benchmark
+AIThucChienAPI mà không gọi tới api.thucchien.ai (không tốn phí, chạy được trong CI).
+
+Hỗ trợ các endpoint mà wrapper dùng:
+    POST /chat/completions                                    (văn bản, JSON, ảnh qua modalities)
+    POST /images/generations
+    POST /audio/speech
+    POST /gemini/v1beta/models/<model>:generateContent        (TTS, ghép ảnh)
+    POST /gemini/v1beta/models/<model>:predictLongRunning     (bắt đầu tạo video)
+    GET  /gemini/v1beta/<operation>                           (trạng thái video)
+    GET  /gemini/download/v1beta/files/<id>:download          (tải video)
+    GET  /key/info                                            (chi tiêu của key)
+    GET  /_mock/stats                                         (số request theo endpoint/mã lỗi)
+
+Cấu hình được: độ trễ (+ dao động), tỉ lệ lỗi 5xx ngẫu nhiên, giới hạn request/giây
+cho mỗi key (vượt quá trả 429). Key bắt đầu bằng "invalid" luôn nhận 401.
+
+Cách dùng:
+    python benchmarks/mock_gateway.py --port 8900 --latency 50 --error-rate 0.02 --rate-limit 20
+    # rồi: AIThucChienAPI(api_key="test", base_url="http://127.0.0.1:8900")
+"""
+import argparse
+import base64
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# PNG 1x1 và vài byte giả cho audio/video: đủ để wrapper giải mã và lưu file
+_PNG = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=='
+)
+_AUDIO = b'ID3' + bytes(1021)
+_VIDEO = b'\x00\x00\x00\x18ftypmp42' + bytes(4084)
+
+# Chi phí giả lập (USD) của mỗi loại request, cộng dồn vào /key/info
+_COSTS = {'chat': 0.0005, 'image': 0.04, 'speech': 0.002, 'gemini': 0.002, 'video': 0.5}
+
+_GENERATE_CONTENT = re.compile(r'^/gemini/v1beta/models/(?P<model>[^/:]+):generateContent$')
+_PREDICT = re.compile(r'^/gemini/v1beta/models/(?P<model>[^/:]+):predictLongRunning$')
+_DOWNLOAD = re.compile(r'^/gemini/download/v1beta/files/(?P<id>[^/:]+):download$')
+_OPERATION = re.compile(r'^/gemini/v1beta/(?P<name>models/[^/]+/operations/[^/]+)$')
+
+
+class GatewayState:
+    """Trạng thái dùng chung giữa các thread của server: giới hạn tốc độ, chi tiêu, video, thống kê."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, rate_limit=0.0,
+                 max_budget=100.0, video_polls=2, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.max_budget = max_budget
+        self.video_polls = video_polls
+        self.rng = random.Random(seed)
+        self.stats = Counter()
+        self.spend = Counter()
+        self._buckets = {}
+        self._operations = {}
+        self._next_operation = 0
+        self._lock = threading.Lock()
+
+    def delay(self):
+        seconds = (self.latency_ms + self.rng.uniform(0, self.jitter_ms)) / 1000
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def inject_error(self):
+        with self._lock:
+            return self.error_rate > 0 and self.rng.random() < self.error_rate
+
+    def allow(self, key):
+        """Token bucket cho mỗi key: `rate_limit` request/giây, cho phép dồn tối đa một giây."""
+        if self.rate_limit <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.rate_limit, now))
+            tokens = min(self.rate_limit, tokens + (now - updated) * self.rate_limit)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            return allowed
+
+    def charge(self, key, kind):
+        with self._lock:
+            self.spend[key] += _COSTS[kind]
+
+    def start_operation(self, model):
+        with self._lock:
+            self._next_operation += 1
+            name = f"models/{model}/operations/op-{self._next_operation}"
+            self._operations[name] = 0
+            return name
+
+    def poll_operation(self, name):
+        """Trả về None nếu không có thao tác này, False nếu chưa xong, True nếu đã xong."""
+        with self._lock:
+            if name not in self._operations:
+                return None
+            self._operations[name] += 1
+            return self._operations[name] > self.video_polls
+
+    def record(self, route, status):
+        with self._lock:
+            self.stats[f"{route} {status}"] += 1
+
+
+class GatewayHandler(BaseHTTPRequestHandler):
+    """Xử lý request theo định dạng của gateway thật (OpenAI-compatible và Gemini)."""
+    protocol_version = 'HTTP/1.1'
+    server_version = 'MockGateway/1.0'
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        pass
+
+    # --- Response helpers ---
+    def _send(self, status, body, content_type='application/json', headers=()):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message, headers=()):
+        self._send(status, {'error': {'message': message, 'code': status}}, headers=headers)
+
+    def _api_key(self):
+        auth = self.headers.get('Authorization', '')
+        if auth.startswith('Bearer '):
+            return auth[len('Bearer '):]
+        return self.headers.get('x-goog-api-key')
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            return json.loads(raw or b'{}')
+        except ValueError:
+            return None
+
+    # --- Dispatch ---
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        path = self.path.split('?', 1)[0]
+        if path == '/_mock/stats':
+            self._send(200, {'requests': dict(self.state.stats), 'spend': dict(self.state.spend)})
+            return
+
+        route, handler = self._route(method, path)
+        body = self._read_json() if method == 'POST' else {}
+        status = self._handle(route, handler, body)
+        self.state.record(route, status)
+
+    def _route(self, method, path):
+        routes = {
+            ('POST', '/chat/completions'): ('chat', self._chat),
+            ('POST', '/images/generations'): ('images', self._images),
+            ('POST', '/audio/speech'): ('speech', self._speech),
+            ('GET', '/key/info'): ('key_info', self._key_info),
+        }
+        if (method, path) in routes:
+            return routes[(method, path)]
+        for pattern, name, handler, expected in (
+            (_GENERATE_CONTENT, 'generate_content', self._generate_content, 'POST'),
+            (_PREDICT, 'predict_long_running', self._predict, 'POST'),
+            (_DOWNLOAD, 'download', self._download, 'GET'),
+            (_OPERATION, 'operation', self._operation, 'GET'),
+        ):
+            match = pattern.match(path)
+            if match and method == expected:
+                return name, lambda key, body, match=match, handler=handler: handler(key, body, match)
+        return 'unknown', None
+
+    def _handle(self, route, handler, body):
+        if handler is None:
+            self._error(404, f"Unknown endpoint {self.path}")
+            return 404
+        key = self._api_key()
+        if not key or key.startswith('invalid'):
+            self._error(401, 'Invalid API key')
+            return 401
+        if body is None:
+            self._error(400, 'Invalid JSON body')
+            return 400
+        if not self.state.allow(key):
+            self._error(429, 'Rate limit exceeded', headers=(('Retry-After', '1'),))
+            return 429
+
+        self.state.delay()
+        if self.state.inject_error():
+            self._error(503, 'Injected upstream error')
+            return 503
+        return handler(key, body)
+
+    # --- Endpoints ---
+    def _chat(self, key, body):
+        messages = body.get('messages') or [{}]
+        prompt = messages[-1].get('content') or ''
+        self.state.charge(key, 'image' if 'image' in body.get('modalities', ()) else 'chat')
+
+        message = {'role': 'assistant', 'content': ''}
+        if 'image' in body.get('modalities', ()):
+            data_url = f"data:image/png;base64,{base64.b64encode(_PNG).decode('ascii')}"
+            message['images'] = [{'type': 'image_url', 'image_url': {'url': data_url}}]
+        elif (body.get('response_format') or {}).get('type') == 'json_object':
+            # Trả lại đúng các khóa của JSON đầu vào (như một bản dịch theo lô)
+            try:
+                packed = json.loads(prompt)
+            except ValueError:
+                packed = {}
+            reply = {k: f"[mock] {v}" for k, v in packed.items()} if isinstance(packed, dict) else {}
+            message['content'] = json.dumps(reply, ensure_ascii=False)
+        else:
+            message['content'] = f"[mock {body.get('model')}] {str(prompt)[:200]}"
+
+        prompt_tokens = len(str(prompt)) // 3 + 1
+        completion_tokens = len(message['content']) // 3 + 1
+        self._send(200, {
+            'id': f"chatcmpl-mock-{self.state.rng.getrandbits(32):08x}",
+            'object': 'chat.completion',
+            'model': body.get('model'),
+            'choices': [{'index': 0, 'message': message, 'finish_reason': 'stop'}],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        })
+        return 200
+
+    def _images(self, key, body):
+        n = max(1, int(body.get('n') or 1))
+        self.state.charge(key, 'image')
+        encoded = base64.b64encode(_PNG).decode('ascii')
+        self._send(200, {'created': int(time.time()), 'data': [{'b64_json': encoded} for _ in range(n)]})
+        return 200
+
+    def _speech(self, key, body):
+        self.state.charge(key, 'speech')
+        self._send(200, _AUDIO, content_type='audio/mpeg')
+        return 200
+
+    def _generate_content(self, key, body, match):
+        self.state.charge(key, 'gemini')
+        modalities = (body.get('generationConfig') or {}).get('responseModalities') or []
+        mime_type, data = ('audio/L16;codec=pcm;rate=24000', _AUDIO) if 'AUDIO' in modalities else ('image/png', _PNG)
+        self._send(200, {
+            'candidates': [{
+                'content': {'parts': [{'inlineData': {'mimeType': mime_type, 'data': base64.b64encode(data).decode('ascii')}}]},
+                'finishReason': 'STOP',
+            }],
+            'modelVersion': match.group('model'),
+        })
+        return 200
+
+    def _predict(self, key, body, match):
+        self.state.charge(key, 'video')
+        self._send(200, {'name': self.state.start_operation(match.group('model'))})
+        return 200
+
+    def _operation(self, key, body, match):
+        name = match.group('name')
+        done = self.state.poll_operation(name)
+        if done is None:
+            self._error(404, f"Operation {name} not found")
+            return 404
+        result = {'name': name, 'done': done}
+        if done:
+            file_id = name.rsplit('/', 1)[-1]
+            uri = f"https://generativelanguage.googleapis.com/v1beta/files/{file_id}:download?alt=media"
+            result['response'] = {'generateVideoResponse': {'generatedSamples': [{'video': {'uri': uri}}]}}
+        self._send(200, result)
+        return 200
+
+    def _download(self, key, body, match):
+        self._send(200, _VIDEO, content_type='video/mp4')
+        return 200
+
+    def _key_info(self, key, body):
+        self._send(200, {
+            'key': f"...{key[-4:]}",
+            'info': {'spend': round(self.state.spend[key], 6), 'max_budget': self.state.max_budget},
+        })
+        return 200
+
+
+def make_server(host='127.0.0.1', port=0, **options):
+    """Tạo server (chưa chạy). Các tham số khác được truyền cho GatewayState."""
+    server = ThreadingHTTPServer((host, port), GatewayHandler)
+    server.daemon_threads = True
+    server.state = GatewayState(**options)
+    return server
+
+
+def start_in_thread(**options):
+    """Chạy gateway trong một thread nền. Trả về (server, base_url); dừng bằng server.shutdown()."""
+    server = make_server(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gateway giả lập AI Thực Chiến')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.0, help='Độ trễ mỗi request (ms)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Độ trễ ngẫu nhiên thêm vào, tối đa (ms)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Tỉ lệ request trả lỗi 503 (0-1)')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='Số request/giây tối đa cho mỗi key (0: không giới hạn)')
+    parser.add_argument('--max-budget', type=float, default=100.0, help='Ngân sách (USD) báo về trong /key/info')
+    parser.add_argument('--video-polls', type=int, default=2, help='Số lần kiểm tra trước khi video "xong"')
+    args = parser.parse_args()
+
+    server = make_server(
+        args.host, args.port, latency_ms=args.latency, jitter_ms=args.jitter, error_rate=args.error_rate,
+        rate_limit=args.rate_limit, max_budget=args.max_budget, video_polls=args.video_polls,
+    )
+    print(f"Mock gateway đang chạy tại http://{args.host}:{server.server_address[1]} (Ctrl+C để dừng)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,376 @@
+"""
+Dựng backend/data/content.json từ các tài liệu nguồn (.txt) ở thư mục gốc dự án.
+
+    Tổng quan.txt                          -> about
+    Phong Cảnh, Địa Danh & Khí Hậu.txt     -> section
+    Phong Tục, Văn Hóa & Con Người.txt     -> section
+    Ẩm Thực.txt                            -> section
+
+Mỗi tài liệu có dạng: dòng tiêu đề, dòng "Tiêu đề: *...*", các đoạn văn và các mục
+"Nhãn: nội dung" (có thể có hoặc không có dấu __ bao quanh nhãn, có thể là gạch đầu
+dòng thuộc mục phía trên). Section và từng mục nhận id ổn định sinh từ tên file / nhãn.
+
+Build là incremental:
+    - chỉ phân tích lại file nguồn có hash thay đổi (kết quả được lưu trong .content-build.json)
+    - chỉ cập nhật các trường do build quản lý; ảnh, attractions, gallery... nhập tay được giữ nguyên
+    - content.json chỉ được ghi (nguyên tử) khi nội dung thực sự thay đổi
+    - các bước phía sau chỉ chạy cho mục bị ảnh hưởng: phiên bản ảnh của mục thay đổi,
+      snapshot biên dịch (payload mã hóa sẵn, lịch sử phiên bản) và tùy chọn bản xuất tĩnh
+
+Cách dùng:
+    python build_content.py
+    python build_content.py --static dist      # build luôn bản tĩnh (build_static.py)
+    python build_content.py --force            # phân tích lại mọi file nguồn
+    python build_content.py --output /tmp/content.json --snapshot /tmp/content.snapshot
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.app.core.config import settings
+from backend.app.models.content import ContentSnapshot
+from backend.app.services.content_history import content_digests, diff_content
+
+MANIFEST_FILENAME = '.content-build.json'
+
+# Phiên bản của bộ phân tích: tăng khi đổi cách phân tích để buộc phân tích lại mọi file
+PARSER_VERSION = '1'
+
+# File nguồn và vị trí của nó trong content.json
+SOURCES = (
+    ('Tổng quan.txt', 'about'),
+    ('Phong Cảnh, Địa Danh & Khí Hậu.txt', 'section'),
+    ('Phong Tục, Văn Hóa & Con Người.txt', 'section'),
+    ('Ẩm Thực.txt', 'section'),
+)
+
+# Các trường của section do build quản lý (các trường khác như imageUrl được giữ nguyên)
+SECTION_FIELDS = ('id', 'title', 'subtitle', 'content', 'items', 'source')
+
+_SUBTITLE_LABEL = 'tiêu đề'
+_NUMBERING = re.compile(r'^\d+\.\s*')
+_BULLET = re.compile(r'^[-*•]\s+')
+_LABEL = re.compile(r'^(?P<label>[^:]+?)\s*:\s*(?P<text>.*)$')
+_MAX_LABEL_WORDS = 10
+
+
+# --- Parsing ---
+def slugify(text):
+    """Id ổn định dạng ascii: 'Phong Cảnh, Địa Danh' -> 'phong-canh-dia-danh'."""
+    text = text.replace('đ', 'd').replace('Đ', 'D')
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def _clean(text):
+    """Bỏ đánh dấu __ và * còn sót, gộp khoảng trắng."""
+    return re.sub(r'\s+', ' ', text.replace('__', '').replace('*', '')).strip()
+
+
+def _split_label(line):
+    """
+    Tách dòng "Nhãn: nội dung" (các biến thể __Nhãn:__, Nhãn:__, Nhãn:).
+    Trả về (nhãn, nội dung) hoặc None nếu dòng chỉ là đoạn văn.
+    """
+    explicit = line.startswith('__') or re.match(r'^[^:]+:__', line) is not None
+    match = _LABEL.match(_clean(line))
+    if match is None:
+        return None
+    label, text = match.group('label'), match.group('text')
+    if not explicit and (len(label.split()) > _MAX_LABEL_WORDS or not label[:1].isupper()):
+        return None
+    return label, text
+
+
+def _unique_id(base, used):
+    candidate, n = base, 2
+    while candidate in used:
+        candidate = f"{base}-{n}"
+        n += 1
+    used.add(candidate)
+    return candidate
+
+
+def parse_document(text, doc_id):
+    """
+    Phân tích một tài liệu nguồn thành dict:
+    {id, title, subtitle, paragraphs, items: [{id, title, text, items}]}.
+    """
+    doc = {'id': doc_id, 'title': '', 'subtitle': '', 'paragraphs': [], 'items': []}
+    used_ids = set()
+    group = None
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if not doc['title']:
+            doc['title'] = _NUMBERING.sub('', _clean(line)).rstrip(':')
+            continue
+
+        bullet = _BULLET.match(line) is not None
+        line = _BULLET.sub('', line)
+        labelled = _split_label(line)
+        if labelled is None:
+            doc['paragraphs'].append(_clean(line))
+            continue
+
+        label, body = labelled
+        if label.lower() == _SUBTITLE_LABEL:
+            doc['subtitle'] = body
+            continue
+        item = {'id': _unique_id(f"{doc_id}--{slugify(label)}", used_ids), 'title': label, 'text': body, 'items': []}
+        if bullet and group is not None:
+            group['items'].append(item)
+        else:
+            doc['items'].append(item)
+            group = item
+    return doc
+
+
+def _items_text(items, depth=0):
+    lines = []
+    for item in items:
+        line = f"{item['title']}: {item['text']}" if item['text'] else item['title']
+        lines.append(f"- {line}" if depth else line)
+        lines.extend(_items_text(item['items'], depth + 1))
+    return lines
+
+
+def _export_items(items):
+    exported = []
+    for item in items:
+        entry = {'id': item['id'], 'title': item['title'], 'text': item['text']}
+        if item['items']:
+            entry['items'] = _export_items(item['items'])
+        exported.append(entry)
+    return exported
+
+
+def document_to_section(doc, source):
+    """Section trong content.json: `content` là văn bản đọc được, `items` giữ cấu trúc."""
+    content = '\n'.join(doc['paragraphs'] + _items_text(doc['items']))
+    section = {'id': doc['id'], 'title': doc['title'], 'content': content, 'source': source}
+    if doc['subtitle']:
+        section['subtitle'] = doc['subtitle']
+    if doc['items']:
+        section['items'] = _export_items(doc['items'])
+    return section
+
+
+def document_to_about(doc):
+    return {'title': doc['title'], 'text': '\n'.join(doc['paragraphs'])}
+
+
+# --- Incremental build ---
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def parse_sources(source_dir, manifest, force=False):
+    """
+    Phân tích các file nguồn, dùng lại kết quả cũ cho file có hash không đổi.
+    Trả về (danh sách (nguồn, đích, tài liệu), manifest mới, các file đã phân tích lại).
+    """
+    documents = []
+    new_manifest = {'parser': PARSER_VERSION, 'files': {}}
+    reparsed = []
+    previous = manifest.get('files', {}) if manifest.get('parser') == PARSER_VERSION else {}
+    for filename, target in SOURCES:
+        path = os.path.join(source_dir, filename)
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            print(f"Warning: Source file not found at {path}, skipping")
+            continue
+        digest = _sha256(raw)
+        cached = previous.get(filename)
+        if cached is not None and cached['sha256'] == digest and not force:
+            doc = cached['document']
+        else:
+            doc = parse_document(raw.decode('utf-8-sig'), slugify(os.path.splitext(filename)[0]))
+            reparsed.append(filename)
+        new_manifest['files'][filename] = {'sha256': digest, 'document': doc}
+        documents.append((filename, target, doc))
+    return documents, new_manifest, reparsed
+
+
+def merge_content(existing, documents):
+    """
+    Gộp kết quả phân tích vào content.json hiện có. Section sinh từ nguồn được cập nhật
+    theo id (giữ các trường không do build quản lý như imageUrl); section nhập tay,
+    attractions và gallery giữ nguyên.
+    """
+    content = dict(existing)
+    sections = list(content.get('sections', []))
+    positions = {s.get('id'): i for i, s in enumerate(sections) if isinstance(s, dict) and s.get('id')}
+    generated_ids = set()
+
+    for source, target, doc in documents:
+        if target == 'about':
+            content['about'] = {**content.get('about', {}), **document_to_about(doc)}
+            continue
+        section = document_to_section(doc, source)
+        generated_ids.add(section['id'])
+        index = positions.get(section['id'])
+        if index is None:
+            positions[section['id']] = len(sections)
+            sections.append(section)
+        else:
+            kept = {k: v for k, v in sections[index].items() if k not in SECTION_FIELDS}
+            sections[index] = {**section, **kept}
+
+    # Bỏ section sinh từ nguồn đã bị xóa (section nhập tay không có trường `source`)
+    content['sections'] = [
+        s for s in sections
+        if not (isinstance(s, dict) and 'source' in s and s.get('id') not in generated_ids)
+    ]
+    content.setdefault('attractions', [])
+    content.setdefault('gallery', [])
+    return content
+
+
+def _affected_images(changes):
+    """Ảnh của các mục được thêm hoặc sửa (cần tạo phiên bản thu nhỏ)."""
+    images = set()
+    for collection, field in (('sections', 'imageUrl'), ('attractions', 'imageUrl'), ('gallery', 'url')):
+        delta = changes.get(collection, {})
+        for item in delta.get('added', []) + delta.get('modified', []):
+            if isinstance(item.get(field), str):
+                images.add(item[field])
+    return images
+
+
+def snapshot_file_for(output):
+    """File snapshot đi kèm một content.json: CONTENT_SNAPSHOT_FILE cho file cấu hình, nếu không là <tên>.snapshot."""
+    if os.path.abspath(output) == os.path.abspath(settings.CONTENT_FILE):
+        return settings.CONTENT_SNAPSHOT_FILE
+    return f"{os.path.splitext(output)[0]}.snapshot"
+
+
+def build(source_dir=project_root, output=settings.CONTENT_FILE, force=False, snapshot=True, static_dir=None,
+          snapshot_path=None):
+    """
+    Chạy toàn bộ pipeline. Trả về dict thống kê: file phân tích lại, content có đổi không,
+    số mục thay đổi, các bước phía sau đã chạy và lỗi của các mục không hợp lệ (bị bỏ khi phục vụ).
+    """
+    snapshot_path = snapshot_path or snapshot_file_for(output)
+    manifest_path = os.path.join(os.path.dirname(output), MANIFEST_FILENAME)
+    documents, manifest, reparsed = parse_sources(source_dir, _load_json(manifest_path, {}), force)
+
+    existing = _load_json(output, {})
+    content = merge_content(existing, documents)
+    changes = diff_content(content_digests(existing), content)
+    stats = {'reparsed': reparsed, 'changed': bool(changes), 'changes': changes, 'steps': [],
+             'errors': list(ContentSnapshot.from_dict(content).errors)}
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    _write_atomic(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'))
+    if not changes and not force:
+        return stats
+
+    _write_atomic(output, json.dumps(content, ensure_ascii=False, indent=2).encode('utf-8'))
+    stats['steps'].append('content.json')
+
+    # Các import dưới đây tải ContentService/Pillow, chỉ cần khi nội dung thực sự thay đổi.
+    # Module content_service tạo sẵn một service từ CONTENT_FILE khi import: trỏ nó vào file vừa
+    # build để không đọc (và báo thiếu) file mặc định, và để bản xuất tĩnh dùng đúng nội dung này.
+    if os.path.abspath(output) != os.path.abspath(settings.CONTENT_FILE):
+        # Lịch sử phiên bản của nội dung khác cũng nằm cạnh file đó, không lẫn với lịch sử mặc định
+        settings.CONTENT_HISTORY_FILE = os.path.join(os.path.dirname(output), os.path.basename(settings.CONTENT_HISTORY_FILE))
+        if 'backend.app.services.content_service' not in sys.modules:
+            settings.CONTENT_FILE, settings.CONTENT_SNAPSHOT_FILE = output, snapshot_path
+    from backend.app.services.image_variant_service import image_variant_service
+    from backend.app.services.content_service import ContentService
+
+    variants = 0
+    for image_url in sorted(_affected_images(changes)):
+        rel_path = image_variant_service.source_path(image_url)
+        if rel_path is not None and os.path.exists(os.path.join(settings.DATA_DIR, rel_path)):
+            variants += image_variant_service.build_image(rel_path)
+    if variants:
+        stats['steps'].append(f"{variants} image variants")
+
+    if snapshot:
+        service = ContentService(output, snapshot_path=None, shared=False)
+        service.compile_snapshot(snapshot_path, output)
+        stats['steps'].append(os.path.basename(snapshot_path))
+
+    if static_dir:
+        import build_static
+        written, skipped, removed, _ = build_static.build(static_dir)
+        stats['steps'].append(f"static export ({written} written, {skipped} unchanged, {removed} removed)")
+    return stats
+
+
+def _exit_on_errors(errors):
+    """Mục không hợp lệ bị bỏ khi phục vụ: báo từng lỗi và thoát với mã lỗi để CI dừng lại."""
+    if not errors:
+        return
+    for error in errors:
+        print(f"Error: Invalid content - {error}")
+    print(f"❌ {len(errors)} mục nội dung không hợp lệ sẽ bị bỏ qua khi phục vụ, hãy sửa content.json.")
+    sys.exit(1)
+
+
+def _summary(changes):
+    parts = []
+    for key, delta in changes.items():
+        if key == 'about':
+            parts.append('about')
+            continue
+        counts = ', '.join(f"{len(delta[k])} {k}" for k in ('added', 'modified', 'removed') if k in delta)
+        parts.append(f"{key}: {counts or 'order'}")
+    return '; '.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dựng content.json từ các tài liệu nguồn .txt')
+    parser.add_argument('--sources', default=project_root, help='Thư mục chứa các file .txt nguồn')
+    parser.add_argument('--output', default=settings.CONTENT_FILE, help='File content.json đầu ra')
+    parser.add_argument('--force', action='store_true', help='Phân tích lại và ghi lại dù không có thay đổi')
+    parser.add_argument('--snapshot', metavar='FILE',
+                        help='File snapshot biên dịch (mặc định: CONTENT_SNAPSHOT_FILE, hoặc <output>.snapshot khi đổi --output)')
+    parser.add_argument('--no-snapshot', action='store_true', help='Không biên dịch lại content.snapshot')
+    parser.add_argument('--static', metavar='DIR', help='Build luôn bản xuất tĩnh vào thư mục này')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = build(args.sources, args.output, force=args.force, snapshot=not args.no_snapshot, static_dir=args.static,
+                  snapshot_path=args.snapshot)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"Phân tích lại: {', '.join(stats['reparsed']) or 'không có file nào'}")
+    if not stats['changed'] and not stats['steps']:
+        print(f"✅ Nội dung không đổi, không cần ghi lại ({elapsed:.0f} ms).")
+    else:
+        print(f"Thay đổi: {_summary(stats['changes']) or 'không có'}")
+        print(f"✅ Đã cập nhật {args.output}: {', '.join(stats['steps'])} ({elapsed:.0f} ms).")
+    _exit_on_errors(stats['errors'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,332 @@
+"""
+Xuất toàn bộ website thành một thư mục tĩnh (mặc định dist/) để host trên bất kỳ
+static host/CDN nào, Python chỉ còn chạy cho các request thực sự động.
+
+Thư mục đầu ra gồm:
+    - index.html, attractions.html, gallery.html đã render sẵn nội dung
+    - assets/ với tên file gắn fingerprint (cache 1 năm) và bản gốc
+    - api/*.json: payload JSON của các endpoint trong content_bp
+    - data/: ảnh/video/audio từ backend/data, cùng các phiên bản ảnh thu nhỏ trong data/variants/
+      (srcset trỏ thẳng tới từng file vì host tĩnh bỏ qua query ?w=)
+    - bản nén sẵn .gz (và .br nếu có thư viện brotli) cho file văn bản
+    - vercel.json, _headers, _redirects: cấu hình header/rewrite cho Vercel, Netlify, Cloudflare Pages
+
+Build là incremental: mỗi file đầu ra được ghi lại cùng hash đầu vào trong
+.build-manifest.json, lần build sau chỉ ghi lại các file có đầu vào thay đổi.
+
+Cách dùng:
+    python build_static.py
+    python build_static.py --output dist --api-origin https://yen-hoa-api.vercel.app
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.app.core.config import settings
+from backend.app.core.json_stream import encode_json
+from backend.app.services.content_history import ContentHistory
+from backend.app.services.content_service import PAGE_PAYLOADS, ContentService, LocalizedContent, locale_file
+from backend.app.services.image_variant_service import image_variant_service
+from api.static.asset_cache import FrontendAssetCache
+from api.static.prerender import PAGES, PageRenderer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_FILENAME = '.build-manifest.json'
+
+# Phiên bản định dạng build: tăng khi thay đổi cách sinh file để buộc build lại toàn bộ
+BUILD_FORMAT_VERSION = '2'
+
+# Payload JSON của từng endpoint: (file đầu ra, tên payload trong ContentService)
+API_PAYLOADS = (
+    ('api/content.json', 'content'),
+    ('api/about.json', 'about'),
+    ('api/attractions.json', 'attractions'),
+    ('api/attractions-featured.json', 'featured'),
+    ('api/gallery.json', 'gallery'),
+)
+
+_COMPRESSIBLE = ('.html', '.css', '.js', '.json', '.svg', '.txt')
+
+
+def _sha256_file(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _key(*parts):
+    return hashlib.sha256('|'.join((BUILD_FORMAT_VERSION,) + parts).encode('utf-8')).hexdigest()
+
+
+def _bootstrap_path(page):
+    """File tĩnh tương ứng với /api/bootstrap?page=<page>."""
+    return f"api/bootstrap-{page}.json"
+
+
+class StaticExporter:
+    """
+    Ghi các file đầu ra vào thư mục build, bỏ qua file có hash đầu vào không đổi.
+    """
+
+    def __init__(self, output_dir, compress=True):
+        self.output_dir = os.path.abspath(output_dir)
+        self.compress = compress
+        self.manifest_path = os.path.join(self.output_dir, MANIFEST_FILENAME)
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.previous = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.previous = {}
+        self.manifest = {}
+        self.written = 0
+        self.skipped = 0
+
+    def _up_to_date(self, rel_path, input_key):
+        return (
+            self.previous.get(rel_path) == input_key
+            and os.path.exists(os.path.join(self.output_dir, rel_path))
+        )
+
+    def _write_atomic(self, rel_path, data):
+        path = os.path.join(self.output_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _precompress(self, rel_path, data):
+        if not self.compress or not rel_path.endswith(_COMPRESSIBLE):
+            return
+        self._write_atomic(rel_path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            self._write_atomic(rel_path + '.br', brotli.compress(data))
+
+    def emit(self, rel_path, input_key, produce):
+        """
+        Ghi file rel_path với nội dung do produce() sinh ra, chỉ khi input_key thay đổi.
+        """
+        self.manifest[rel_path] = input_key
+        if self._up_to_date(rel_path, input_key):
+            self.skipped += 1
+            return
+        data = produce()
+        self._write_atomic(rel_path, data)
+        self._precompress(rel_path, data)
+        self.written += 1
+
+    def copy(self, rel_path, source_path, source_hash=None):
+        """Sao chép một file nguồn vào thư mục build (chỉ khi nội dung nguồn thay đổi)."""
+        input_key = _key('copy', source_hash or _sha256_file(source_path))
+        self.manifest[rel_path] = input_key
+        if self._up_to_date(rel_path, input_key):
+            self.skipped += 1
+            return
+        path = os.path.join(self.output_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copy2(source_path, path)
+        if rel_path.endswith(_COMPRESSIBLE):
+            with open(source_path, 'rb') as f:
+                self._precompress(rel_path, f.read())
+        self.written += 1
+
+    def finish(self):
+        """Xóa file cũ không còn được sinh ra và lưu manifest mới."""
+        removed = 0
+        for rel_path in set(self.previous) - set(self.manifest):
+            for suffix in ('', '.gz', '.br'):
+                try:
+                    os.remove(os.path.join(self.output_dir, rel_path + suffix))
+                    removed += suffix == ''
+                except FileNotFoundError:
+                    pass
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        return removed
+
+
+# --- Host configuration ---
+def _host_headers(assets):
+    """Danh sách (pattern, header) dùng chung cho các định dạng cấu hình host."""
+    immutable = f"public, max-age={settings.STATIC_IMMUTABLE_MAX_AGE}, immutable"
+    rules = [
+        (f"/{asset.fingerprinted_path}", {'Cache-Control': immutable})
+        for asset in assets.fingerprinted_assets()
+    ]
+    rules.append(('/api/*', {'Content-Type': 'application/json; charset=utf-8', 'Cache-Control': 'no-cache'}))
+    rules.append(('/data/*', {'Cache-Control': f"public, max-age={settings.MEDIA_MAX_AGE}"}))
+    rules.append(('/*.html', {'Cache-Control': 'no-cache'}))
+    return rules
+
+
+def _vercel_config(assets, api_origin):
+    rewrites = [
+        {
+            'source': '/api/attractions',
+            'has': [{'type': 'query', 'key': 'featured', 'value': 'true'}],
+            'destination': '/api/attractions-featured.json',
+        },
+    ]
+    rewrites += [
+        {
+            'source': '/api/bootstrap',
+            'has': [{'type': 'query', 'key': 'page', 'value': page}],
+            'destination': f"/{_bootstrap_path(page)}",
+        }
+        for page in PAGE_PAYLOADS
+    ]
+    rewrites.append({'source': '/api/bootstrap', 'destination': f"/{_bootstrap_path('home')}"})
+    rewrites += [
+        {'source': f"/api/{name}", 'destination': f"/{rel_path}"}
+        for rel_path, name in API_PAYLOADS if name != 'featured'
+    ]
+    if api_origin:
+        # Các API động (không có bản tĩnh) được chuyển tiếp sang deployment Python
+        rewrites.append({'source': '/api/:path*', 'destination': f"{api_origin.rstrip('/')}/api/:path*"})
+    headers = [
+        {
+            'source': pattern.replace('*', ':path*'),
+            'headers': [{'key': key, 'value': value} for key, value in values.items()],
+        }
+        for pattern, values in _host_headers(assets)
+    ]
+    return {'cleanUrls': False, 'trailingSlash': False, 'rewrites': rewrites, 'headers': headers}
+
+
+def _netlify_headers(assets):
+    lines = []
+    for pattern, values in _host_headers(assets):
+        lines.append(pattern)
+        lines.extend(f"  {key}: {value}" for key, value in values.items())
+    return '\n'.join(lines) + '\n'
+
+
+def _netlify_redirects(api_origin):
+    lines = ['/api/attractions featured=true /api/attractions-featured.json 200']
+    lines += [f"/api/bootstrap page={page} /{_bootstrap_path(page)} 200" for page in PAGE_PAYLOADS]
+    lines.append(f"/api/bootstrap /{_bootstrap_path('home')} 200")
+    lines += [f"/api/{name} /{rel_path} 200" for rel_path, name in API_PAYLOADS if name != 'featured']
+    if api_origin:
+        lines.append(f"/api/* {api_origin.rstrip('/')}/api/:splat 200")
+    return '\n'.join(lines) + '\n'
+
+
+def _export_images(exporter, content_service):
+    """Ghi các phiên bản ảnh mà srcset của bản xuất tĩnh trỏ tới (data/variants/...)."""
+    snapshot = content_service.snapshot
+    urls = {item.get('imageUrl') for item in snapshot.sections_dicts + snapshot.attractions_dicts}
+    urls.update(item.get('url') for item in snapshot.gallery_dicts)
+    fmt = image_variant_service.static_format
+    for url in sorted(filter(None, urls)):
+        rel_path = image_variant_service.source_path(url)
+        if rel_path is None:
+            continue
+        for width in image_variant_service.srcset_widths(rel_path):
+            variant = image_variant_service.get_variant(rel_path, image_variant_service.snap_width(width), fmt)
+            if variant is not None:
+                exporter.copy(f"data/{image_variant_service.static_variant_path(rel_path, width)}", variant[0], variant[2])
+
+
+# --- Build ---
+def build(output_dir='dist', api_origin=None, compress=True):
+    """
+    Build toàn bộ website vào output_dir. Trả về thống kê (đã ghi, bỏ qua, đã xóa) cùng
+    lỗi của các mục nội dung không hợp lệ (bị bỏ khỏi bản xuất).
+    """
+    exporter = StaticExporter(output_dir, compress=compress)
+    assets = FrontendAssetCache(
+        settings.FRONTEND_DIR,
+        inline_max_bytes=settings.STATIC_INLINE_MAX_BYTES,
+        immutable_max_age=settings.STATIC_IMMUTABLE_MAX_AGE,
+    )
+    # Nội dung riêng cho bản xuất: srcset trỏ tới file phiên bản ảnh; lịch sử phiên bản không được ghi
+    content_service = ContentService(settings.CONTENT_FILE, snapshot_path=None, shared=False,
+                                     history=ContentHistory(None, 1), static_srcset=True)
+    # Host tĩnh không chọn được ngôn ngữ theo Accept-Language: chỉ xuất trang của ngôn ngữ mặc định
+    renderer = PageRenderer(assets, LocalizedContent(content_service, locales=(settings.DEFAULT_LOCALE,)))
+    version = content_service.version
+    # srcset trong trang và payload trỏ tới file phiên bản ảnh: đổi bộ độ rộng hay định dạng thì phải ghi lại
+    variants_key = (image_variant_service.static_format, ','.join(map(str, image_variant_service.widths)))
+
+    # Trang HTML render sẵn
+    for path in PAGES:
+        template_hash = hashlib.sha256(assets.html_body(path).encode('utf-8')).hexdigest()
+        exporter.emit(path, _key('page', path, version, template_hash, *variants_key),
+                      lambda p=path: renderer.render(p)[0])
+
+    # Asset frontend: bản gắn fingerprint và bản gốc
+    for asset in assets.all_assets():
+        if asset.path in PAGES:
+            continue
+        if asset.mimetype == 'text/html':
+            exporter.emit(asset.path, _key('html', asset.digest), lambda a=asset: a.body)
+            continue
+        exporter.copy(asset.path, asset.abs_path, asset.digest)
+        exporter.copy(asset.fingerprinted_path, asset.abs_path, asset.digest)
+
+    # Payload JSON của API
+    for rel_path, name in API_PAYLOADS:
+        exporter.emit(rel_path, _key('api', name, version, *variants_key), lambda n=name: content_service.get_payload(n))
+    for page in PAGE_PAYLOADS:
+        exporter.emit(_bootstrap_path(page), _key('api', f"page:{page}", version, *variants_key),
+                      lambda p=page: content_service.get_page_payload(p))
+
+    # Media trong thư mục data (bỏ qua file nội dung và snapshot biên dịch của mọi ngôn ngữ)
+    content_files = set()
+    for locale in settings.CONTENT_LOCALES:
+        snapshot_name = os.path.basename(locale_file(settings.CONTENT_SNAPSHOT_FILE, locale))
+        content_files.update((os.path.basename(locale_file(settings.CONTENT_FILE, locale)),
+                              snapshot_name, f"{snapshot_name}.lock"))
+    for dirpath, dirnames, filenames in os.walk(settings.DATA_DIR):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for name in filenames:
+            if name.startswith('.') or name in content_files:
+                continue
+            source = os.path.join(dirpath, name)
+            rel_path = os.path.relpath(source, settings.DATA_DIR).replace(os.sep, '/')
+            exporter.copy(f"data/{rel_path}", source)
+    _export_images(exporter, content_service)
+
+    # Cấu hình host
+    exporter.emit('vercel.json', _key('vercel', api_origin or '', *assets.fingerprinted_paths()),
+                  lambda: encode_json(_vercel_config(assets, api_origin)))
+    exporter.emit('_headers', _key('headers', *assets.fingerprinted_paths()),
+                  lambda: _netlify_headers(assets).encode('utf-8'))
+    exporter.emit('_redirects', _key('redirects', api_origin or ''),
+                  lambda: _netlify_redirects(api_origin).encode('utf-8'))
+
+    removed = exporter.finish()
+    return exporter.written, exporter.skipped, removed, list(content_service.snapshot.errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Xuất website Du Lịch Yên Hòa thành thư mục tĩnh')
+    parser.add_argument('--output', default=os.path.join(project_root, 'dist'), help='Thư mục đầu ra')
+    parser.add_argument('--api-origin', help='URL deployment Python xử lý các API động')
+    parser.add_argument('--no-compress', action='store_true', help='Không tạo bản nén sẵn .gz/.br')
+    args = parser.parse_args()
+
+    written, skipped, removed, errors = build(args.output, args.api_origin, compress=not args.no_compress)
+    print(f"✅ Build xong vào {args.output}: {written} file ghi mới, {skipped} file không đổi, {removed} file cũ đã xóa.")
+    if errors:
+        print(f"❌ {len(errors)} mục nội dung không hợp lệ đã bị bỏ khỏi bản xuất, hãy sửa content.json.")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
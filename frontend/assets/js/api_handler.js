@@ -57,3 +57,90 @@ function getFeaturedAttractions() {
 function getGalleryItems() {
     return fetchData('/gallery');
 }
+
+/**
+ * Lấy trong một request toàn bộ dữ liệu một trang cần
+ * @param {string} page - Tên trang: 'home', 'attractions' hoặc 'gallery'
+ * @returns {Promise<object|null>} - Ví dụ trang chủ: { about, sections, attractions }
+ */
+function getBootstrap(page) {
+    return fetchData(`/bootstrap?page=${encodeURIComponent(page)}`);
+}
+
+/**
+ * Lấy các thay đổi của nội dung kể từ một phiên bản đã có
+ * @param {string} since - Phiên bản client đang giữ (trường `version` của lần gọi trước)
+ * @returns {Promise<object|null>} - { version, full: false, changes } hoặc { version, full: true, content }
+ */
+function getChanges(since) {
+    return fetchData(`/changes?since=${encodeURIComponent(since || '')}`);
+}
+
+/**
+ * Lấy các mục liên quan tới một điểm đến ("xem thêm"), đã được server tính sẵn
+ * @param {string|number} attractionId - id của điểm đến
+ * @returns {Promise<Array|null>} - [{ kind: 'attraction'|'section'|'gallery', id, title, imageUrl, score }]
+ */
+function getRelatedPlaces(attractionId) {
+    return fetchData(`/attractions/${encodeURIComponent(attractionId)}/related`);
+}
+
+/**
+ * Lấy các điểm đến gần một vị trí, gần nhất trước
+ * @param {number} lat - Vĩ độ
+ * @param {number} lon - Kinh độ
+ * @param {number} [radius] - Bán kính (km), mặc định theo server
+ * @returns {Promise<object|null>} - { lat, lon, radius, results: [{ ...điểm đến, distanceKm }] }
+ */
+function getNearbyPlaces(lat, lon, radius) {
+    const params = new URLSearchParams({ lat, lon });
+    if (radius !== undefined) params.set('radius', radius);
+    return fetchData(`/attractions/nearby?${params}`);
+}
+
+// --- Analytics ---
+const EVENT_FLUSH_DELAY_MS = 5000; // Gom sự kiện trong khoảng này rồi gửi một lần
+const EVENT_MAX_BATCH = 50;
+let pendingEvents = [];
+let eventFlushTimer = null;
+
+/**
+ * Gửi các sự kiện đang chờ trong một request (POST /api/events).
+ * Dùng navigator.sendBeacon nếu có để request vẫn được gửi khi người dùng rời trang.
+ */
+function flushEvents() {
+    clearTimeout(eventFlushTimer);
+    eventFlushTimer = null;
+    if (pendingEvents.length === 0) return;
+
+    const body = JSON.stringify({ events: pendingEvents });
+    pendingEvents = [];
+    if (navigator.sendBeacon && navigator.sendBeacon(`${API_BASE_URL}/events`, body)) {
+        return;
+    }
+    fetch(`${API_BASE_URL}/events`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body,
+        keepalive: true,
+    }).catch(() => {}); // Analytics không bao giờ được làm hỏng trang
+}
+
+/**
+ * Ghi nhận một sự kiện; sự kiện được gom theo lô thay vì mỗi sự kiện một request
+ * @param {object} event - Ví dụ { type: 'page_view', page: '/attractions.html' }
+ *                         hoặc { type: 'click', target: 'attraction-card', attraction_id: '3' }
+ */
+function trackEvent(event) {
+    pendingEvents.push(event);
+    if (pendingEvents.length >= EVENT_MAX_BATCH) {
+        flushEvents();
+    } else if (eventFlushTimer === null) {
+        eventFlushTimer = setTimeout(flushEvents, EVENT_FLUSH_DELAY_MS);
+    }
+}
+
+// Gửi nốt các sự kiện còn lại khi trang bị ẩn hoặc đóng
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') flushEvents();
+});
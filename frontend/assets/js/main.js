@@ -9,28 +9,64 @@ document.addEventListener('DOMContentLoaded', () => {
     } else if (path.endsWith('gallery.html')) {
         loadGalleryPage();
     }
+
+    trackEvent({ type: 'page_view', page: path });
+    trackAttractionClicks();
 });
 
+/**
+ * Ghi nhận click vào card điểm đến (một listener cho cả trang, áp dụng cả cho card render sau)
+ */
+function trackAttractionClicks() {
+    document.addEventListener('click', (event) => {
+        const card = event.target.closest('.attraction-card[data-attraction-id]');
+        if (!card) return;
+        trackEvent({
+            type: 'click',
+            page: window.location.pathname,
+            target: 'attraction-card',
+            attraction_id: card.dataset.attractionId,
+        });
+    });
+}
+
+/**
+ * Lấy dữ liệu ban đầu do server nhúng sẵn vào trang (window.__INITIAL_DATA__)
+ * @returns {object|null} - Dữ liệu của trang, hoặc null nếu trang không được render sẵn
+ */
+function getInitialData() {
+    return window.__INITIAL_DATA__ || null;
+}
+
+/**
+ * Kiểm tra một phần tử đã được server render sẵn nội dung hay chưa
+ * @param {HTMLElement|null} element - Phần tử cần kiểm tra
+ * @returns {boolean}
+ */
+function isPrerendered(element) {
+    return Boolean(element && element.dataset.prerendered === 'true');
+}
+
 /**
  * Tải dữ liệu cho trang chủ
  */
 async function loadHomePage() {
-    // Tải và hiển thị phần giới thiệu
-    const contentData = await getContent(); // Giả sử có hàm getContent trả về toàn bộ JSON
+    // Dùng dữ liệu nhúng sẵn nếu có, nếu không mới gọi API (một request cho cả trang)
+    const contentData = getInitialData() || await getBootstrap('home');
     if (!contentData) return;
 
     const { about, sections, attractions } = contentData;
 
     const aboutTitle = document.getElementById('about-title');
     const aboutContent = document.getElementById('about-content');
-    if (about && aboutTitle && aboutContent) {
+    if (about && aboutTitle && aboutContent && !isPrerendered(aboutTitle)) {
         aboutTitle.textContent = about.title;
         aboutContent.textContent = about.text;
     }
 
     // Tải và hiển thị các sections
     const sectionsContainer = document.getElementById('content-sections');
-    if (sections && sectionsContainer) {
+    if (sections && sectionsContainer && !isPrerendered(sectionsContainer)) {
         sectionsContainer.innerHTML = '';
         sections.forEach((section, index) => {
             const sectionElement = createContentSection(section, index);
@@ -39,9 +75,10 @@ async function loadHomePage() {
     }
 
     // Tải và hiển thị các điểm đến nổi bật
-    const featuredAttractions = attractions.filter(a => a.featured);
+    // Server đã chọn sẵn các điểm nổi bật (theo cờ featured hoặc theo lượt xem, xem FEATURED_MODE)
+    const featuredAttractions = attractions || [];
     const attractionsGrid = document.getElementById('attractions-grid');
-    if (featuredAttractions && attractionsGrid) {
+    if (featuredAttractions && attractionsGrid && !isPrerendered(attractionsGrid)) {
         attractionsGrid.innerHTML = '';
         featuredAttractions.forEach(attraction => {
             const card = createAttractionCard(attraction);
@@ -54,8 +91,11 @@ async function loadHomePage() {
  * Tải dữ liệu cho trang điểm đến
  */
 async function loadAttractionsPage() {
-    const allAttractions = await getAllAttractions();
     const attractionsList = document.getElementById('attractions-list');
+    if (isPrerendered(attractionsList)) return;
+
+    const pageData = getInitialData() || await getBootstrap('attractions');
+    const allAttractions = pageData && pageData.attractions;
     if (allAttractions && attractionsList) {
         attractionsList.innerHTML = '';
         allAttractions.forEach(attraction => {
@@ -69,23 +109,40 @@ async function loadAttractionsPage() {
  * Tải dữ liệu cho trang thư viện
  */
 async function loadGalleryPage() {
-    const galleryItems = await getGalleryItems();
+    const pageData = getInitialData() || await getBootstrap('gallery');
+    const galleryItems = pageData && pageData.gallery;
     const galleryGrid = document.getElementById('gallery-grid');
     if (galleryItems && galleryGrid) {
-        galleryGrid.innerHTML = '';
-        galleryItems.forEach(item => {
-            const galleryElement = document.createElement('div');
-            galleryElement.className = 'gallery-item';
-            
-            const img = document.createElement('img');
-            img.src = item.url;
-            img.alt = item.alt;
-            // Thêm sự kiện click để mở modal
-            img.onclick = () => openModal(item.url, item.alt);
-
-            galleryElement.appendChild(img);
-            galleryGrid.appendChild(galleryElement);
-        });
+        if (isPrerendered(galleryGrid)) {
+            // Ảnh đã có sẵn trong HTML, chỉ cần gắn sự kiện click để mở modal
+            galleryGrid.querySelectorAll('.gallery-item img').forEach((img, index) => {
+                const item = galleryItems[index];
+                if (item) {
+                    img.onclick = () => openModal(item.url, item.alt);
+                }
+            });
+        } else {
+            galleryGrid.innerHTML = '';
+            galleryItems.forEach(item => {
+                const galleryElement = document.createElement('div');
+                galleryElement.className = 'gallery-item';
+
+                const img = document.createElement('img');
+                img.src = item.url;
+                img.alt = item.alt;
+                if (item.srcset) {
+                    // Trình duyệt tự chọn phiên bản ảnh vừa với màn hình
+                    img.srcset = item.srcset;
+                    img.sizes = '(max-width: 768px) 50vw, 25vw';
+                }
+                img.loading = 'lazy';
+                // Thêm sự kiện click để mở modal
+                img.onclick = () => openModal(item.url, item.alt);
+
+                galleryElement.appendChild(img);
+                galleryGrid.appendChild(galleryElement);
+            });
+        }
 
         // Thêm sự kiện cho nút đóng modal
         const modal = document.getElementById('image-modal');
@@ -121,6 +178,10 @@ function openModal(src, alt) {
 function createAttractionCard(attraction) {
     const card = document.createElement('div');
     card.className = 'attraction-card';
+    // Dùng để ghi nhận lượt click vào từng điểm đến (xem trackAttractionClicks)
+    if (attraction.id !== undefined && attraction.id !== null) {
+        card.dataset.attractionId = attraction.id;
+    }
 
     const isAttractionsPage = window.location.pathname.endsWith('attractions.html');
     
@@ -130,7 +191,7 @@ function createAttractionCard(attraction) {
     }
 
     card.innerHTML = `
-        <img src="${attraction.imageUrl}" alt="${attraction.name}">
+        <img src="${attraction.imageUrl}" alt="${attraction.name}"${srcsetAttributes(attraction.imageSrcset, '(max-width: 768px) 100vw, 33vw')} loading="lazy">
         <div class="attraction-card-content">
             <h3>${attraction.name}</h3>
             ${detailsHtml}
@@ -155,7 +216,7 @@ function createContentSection(section, index) {
 
     sectionElement.innerHTML = `
         <div class="section-image">
-            <img src="${section.imageUrl}" alt="${section.title}">
+            <img src="${section.imageUrl}" alt="${section.title}"${srcsetAttributes(section.imageSrcset, '(max-width: 768px) 100vw, 50vw')} loading="lazy">
         </div>
         <div class="section-text">
             <h3>${section.title}</h3>
@@ -164,3 +225,13 @@ function createContentSection(section, index) {
     `;
     return sectionElement;
 }
+
+/**
+ * Helper function: Tạo thuộc tính srcset/sizes cho thẻ img (nếu server có phiên bản ảnh thu nhỏ)
+ * @param {string|undefined} srcset - Chuỗi srcset từ API
+ * @param {string} sizes - Kích thước hiển thị dự kiến của ảnh
+ * @returns {string} - Chuỗi thuộc tính HTML (rỗng nếu không có srcset)
+ */
+function srcsetAttributes(srcset, sizes) {
+    return srcset ? ` srcset="${srcset}" sizes="${sizes}"` : '';
+}
@@ -0,0 +1,27 @@
+"""
+Cấu hình gunicorn khi chạy nhiều worker ngoài Vercel (server riêng, Docker...).
+
+    CONTENT_SHARED_SNAPSHOT=1 gunicorn app:app
+
+App được tải một lần trong tiến trình master (preload_app) rồi mới fork các worker:
+payload nội dung nằm trong file snapshot mmap và HTML render sẵn được tạo trước khi
+fork, nên các worker dùng chung cùng một vùng nhớ thay vì mỗi worker giữ một bản.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+preload_app = True
+
+# Bật chế độ snapshot dùng chung nếu chưa đặt (phải có trước khi app được import)
+os.environ.setdefault('CONTENT_SHARED_SNAPSHOT', '1')
+
+
+def pre_fork(server, worker):
+    # Chuyển mọi object đã tạo sang thế hệ "vĩnh viễn" để GC của worker không chạm vào
+    # (GC ghi vào header của object sẽ làm copy-on-write nhân bản các trang bộ nhớ)
+    gc.collect()
+    gc.freeze()
+
@@ -0,0 +1,100 @@
+"""
+Dịch content.json sang các ngôn ngữ khác (settings.CONTENT_LOCALES) bằng AI Thực Chiến API.
+
+Mỗi ngôn ngữ được ghi ra content.<ngôn ngữ>.json cạnh content.json và biên dịch thành
+content.<ngôn ngữ>.snapshot; API chọn bản dịch theo ?lang= hoặc header Accept-Language.
+
+Số request được giữ ở mức tối thiểu:
+    - nhiều chuỗi được gói vào một request chat_completion (AIThucChienAPI.translate_batch)
+    - bản dịch được cache theo (hash chuỗi nguồn, ngôn ngữ, model): lần chạy sau chỉ dịch
+      các chuỗi mới hoặc đã sửa
+    - file bản dịch chỉ được ghi (nguyên tử) khi nội dung thay đổi
+
+Cách dùng:
+    export THUCCHIEN_API_KEY=sk-...
+    python translate_content.py                # mọi ngôn ngữ
+    python translate_content.py --locale en    # một ngôn ngữ
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+project_root = os.path.abspath(os.path.dirname(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.app.core.config import settings
+from backend.app.services.translation_service import ContentTranslator, TranslationCache
+
+
+def _write_if_changed(path, data):
+    """Ghi file nguyên tử nếu nội dung khác file hiện có. Trả về True nếu đã ghi."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+
+def translate(translator, source=settings.CONTENT_FILE, locales=None, snapshot=True):
+    """Dịch nội dung sang từng ngôn ngữ. Trả về {ngôn ngữ: thống kê}."""
+    # Import ở đây để chỉ tải ContentService (và Pillow) khi thực sự dùng
+    from backend.app.services.content_service import ContentService, locale_file
+
+    with open(source, 'r', encoding='utf-8') as f:
+        content = json.load(f)
+
+    results = {}
+    for locale in locales or settings.CONTENT_LOCALES:
+        if locale == settings.DEFAULT_LOCALE:
+            continue
+        translated, stats = translator.translate_content(content, locale)
+        translator.cache.save()
+
+        output = locale_file(source, locale)
+        data = json.dumps(translated, ensure_ascii=False, indent=2).encode('utf-8')
+        stats['written'] = _write_if_changed(output, data)
+        if snapshot and stats['written']:
+            service = ContentService(output, snapshot_path=None, shared=False)
+            service.compile_snapshot(locale_file(settings.CONTENT_SNAPSHOT_FILE, locale), output)
+        results[locale] = stats
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dịch content.json sang các ngôn ngữ khác')
+    parser.add_argument('--locale', action='append', choices=settings.CONTENT_LOCALES,
+                        help='Ngôn ngữ cần dịch (lặp lại được), mặc định là tất cả')
+    parser.add_argument('--source', default=settings.CONTENT_FILE, help='File content.json nguồn')
+    parser.add_argument('--model', default=settings.TRANSLATION_MODEL, help='Model dùng để dịch')
+    parser.add_argument('--no-snapshot', action='store_true', help='Không biên dịch snapshot cho bản dịch')
+    args = parser.parse_args()
+
+    api_key = os.environ.get('THUCCHIEN_API_KEY', '')
+    if not api_key:
+        print("Error: THUCCHIEN_API_KEY is not set")
+        sys.exit(1)
+
+    from ai_thuc_chien_wrapper import AIThucChienAPI
+    translator = ContentTranslator(AIThucChienAPI(api_key=api_key), TranslationCache(settings.TRANSLATION_CACHE_FILE),
+                                   model=args.model)
+
+    started = time.perf_counter()
+    results = translate(translator, args.source, args.locale, snapshot=not args.no_snapshot)
+    for locale, stats in results.items():
+        state = 'đã cập nhật' if stats['written'] else 'không đổi'
+        print(f"[{locale}] {stats['unique']} chuỗi ({stats['cached']} từ cache), "
+              f"{stats['requests']} request, {stats['untranslated']} chưa dịch được - {state}")
+    print(f"✅ Hoàn thành trong {time.perf_counter() - started:.1f} s.")
+
+
+if __name__ == '__main__':
+    main()